@@ -0,0 +1,457 @@
+# accounts/analytics.py
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import combinations
+
+import numpy as np
+from django.core.exceptions import EmptyResultSet
+from django.db import connection, transaction
+from django.db.models import FloatField, Value
+from django.db.models.functions import Cast
+from django.utils.dateparse import parse_date
+
+from .caching import HEADCOUNT, SALARY, bump_version
+from .dimensions import EMPLOYEE_DIMENSIONS
+
+
+CENT = Decimal("0.01")
+
+# ==========================
+# HEADCOUNT / PAYROLL CUBE
+# ==========================
+# API name -> Employee column
+CUBE_DIMENSIONS = {
+    "department": "department_id",
+    "location": "location_id",
+    "employee_type": "employee_type",
+    "work_shift": "work_shift",
+    "status": "status",
+    "designation": "designation",
+}
+
+SALARY_COLUMNS = ["annual_ctc", "basic_pay", "allowances", "bonus"]
+AGGREGATES = {"sum": "SUM", "avg": "AVG", "min": "MIN", "max": "MAX"}
+
+# API name -> (SQL aggregate, column)
+CUBE_MEASURES = {"headcount": ("COUNT", None)}
+CUBE_MEASURES.update({
+    f"{column}_{name}": (function, column)
+    for column in SALARY_COLUMNS
+    for name, function in AGGREGATES.items()
+})
+
+# which subtotals come with the requested breakdown
+CUBE_TOTALS = {
+    "cube": "every combination of the dimensions, down to the grand total",
+    "rollup": "subtotals along the dimensions in the order given",
+    "none": "only the full breakdown",
+}
+
+
+def grouping_sets(columns, totals):
+    """Column subsets to aggregate over, most detailed first."""
+    if totals == "cube":
+        return [
+            list(subset)
+            for size in range(len(columns), -1, -1)
+            for subset in combinations(columns, size)
+        ]
+    if totals == "rollup":
+        return [columns[:size] for size in range(len(columns), -1, -1)]
+    return [list(columns)]
+
+
+def _cube_sql(extract_sql, columns, sets, measures):
+    """
+    One statement for every grouping set. Postgres runs GROUPING SETS, the
+    others get one GROUP BY per set glued with UNION ALL. Each row carries
+    a bitmask of the columns it is *not* grouped by (GROUPING() order).
+    """
+    qn = connection.ops.quote_name
+    aggregates = ", ".join(
+        f"{function}({qn(column) if column else '*'}) AS {qn(name)}"
+        for name, (function, column) in measures.items()
+    )
+
+    def mask(grouped):
+        return sum(
+            1 << (len(columns) - 1 - i) for i, column in enumerate(columns) if column not in grouped
+        )
+
+    if connection.vendor == "postgresql":
+        select = ", ".join([qn(c) for c in columns] + [
+            f"GROUPING({', '.join(qn(c) for c in columns)})" if columns else "0",
+        ])
+        sets_sql = ", ".join(f"({', '.join(qn(c) for c in grouped)})" for grouped in sets)
+        return (
+            f"SELECT {select}, {aggregates} FROM ({extract_sql}) employees "
+            f"GROUP BY GROUPING SETS ({sets_sql})"
+        )
+
+    branches = []
+    for grouped in sets:
+        select = ", ".join(
+            [qn(c) if c in grouped else f"NULL AS {qn(c)}" for c in columns] + [str(mask(grouped))]
+        )
+        group_by = f" GROUP BY {', '.join(qn(c) for c in grouped)}" if grouped else ""
+        branches.append(f"SELECT {select}, {aggregates} FROM employees{group_by}")
+    return f"WITH employees AS ({extract_sql}) " + " UNION ALL ".join(branches)
+
+
+def _measure_value(name, value):
+    if name == "headcount":
+        return value
+    if value is None:
+        return None
+    return Decimal(str(value)).quantize(CENT)
+
+
+def employee_cube(queryset, dimensions, measures, totals="cube"):
+    """
+    Headcount and salary aggregates of `queryset` broken down by every
+    grouping of `dimensions` that `totals` asks for, in one query.
+
+    Each cell holds the dimensions it is grouped by (a missing key means
+    "all", a None value means the employee has none) and the measures.
+    """
+    columns = [CUBE_DIMENSIONS[name] for name in dimensions]
+    chosen = {name: CUBE_MEASURES[name] for name in measures}
+    needed = list(dict.fromkeys(
+        columns + [column for _, column in chosen.values() if column]
+    )) or ["id"]
+
+    sets = grouping_sets(columns, totals)
+    try:
+        extract_sql, params = queryset.order_by().values(*needed).query.sql_with_params()
+    except EmptyResultSet:
+        # a filter that can match nothing (an unknown department) has no
+        # SQL; over no rows only the grand total set yields a row
+        rows = []
+        if [] in sets:
+            keys = (None,) * len(columns) + ((1 << len(columns)) - 1,)
+            values = tuple(0 if function == "COUNT" else None for function, _ in chosen.values())
+            rows.append(keys + values)
+    else:
+        with connection.cursor() as cursor:
+            cursor.execute(_cube_sql(extract_sql, columns, sets, chosen), params)
+            rows = cursor.fetchall()
+
+    cells = []
+    for row in rows:
+        keys, grouping, values = row[:len(columns)], row[len(columns)], row[len(columns) + 1:]
+        cell = {}
+        for i, (name, column) in enumerate(zip(dimensions, columns)):
+            if grouping & (1 << (len(columns) - 1 - i)):
+                continue
+            lookup = EMPLOYEE_DIMENSIONS.get(column)
+            cell[name] = lookup.name(keys[i]) if lookup else keys[i]
+        cell.update(
+            (name, _measure_value(name, value)) for name, value in zip(chosen, values)
+        )
+        cells.append((grouping, cell))
+
+    # most detailed cells first, then by dimension values (None last)
+    cells.sort(key=lambda item: (
+        bin(item[0]).count("1"),
+        item[0],
+        [(item[1].get(name) is None, str(item[1].get(name))) for name in dimensions],
+    ))
+    return [cell for _, cell in cells]
+
+
+# ==========================
+# HEADCOUNT SERIES
+# ==========================
+INTERVALS = ("month", "week")
+
+
+def period_start(day, interval):
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def next_period(start, interval):
+    if interval == "week":
+        return start + timedelta(days=7)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def previous_period(start, interval):
+    return period_start(start - timedelta(days=1), interval)
+
+
+def period_starts(first, last, interval):
+    """Starts of the periods from the one holding `first` to the one holding `last`."""
+    starts, start = [], period_start(first, interval)
+    while start <= last:
+        starts.append(start)
+        start = next_period(start, interval)
+    return starts
+
+
+def _as_date(value):
+    return parse_date(value) if isinstance(value, str) else value
+
+
+def invalidate_headcount(*dates):
+    """
+    Forget the memoized closed periods once the transaction commits, if a
+    join or exit date that was added, moved or removed falls in one (None:
+    no event). Dates in the current week / month only touch periods that
+    are recomputed anyway. Called without dates (not known) it always does.
+    """
+    boundary = min(period_start(date.today(), interval) for interval in INTERVALS)
+    if not dates or any(day is not None and _as_date(day) < boundary for day in dates):
+        transaction.on_commit(lambda: bump_version(HEADCOUNT))
+
+
+def _events(employees, offboardings, since, until):
+    """(date, department id, +1 join / -1 exit) in date order, one query."""
+    joins = employees.filter(date_of_joining__lt=until)
+    exits = offboardings.filter(last_working_date__lt=until)
+    if since is not None:
+        joins = joins.filter(date_of_joining__gte=since)
+        exits = exits.filter(last_working_date__gte=since)
+    joins = joins.annotate(delta=Value(1)).values_list("date_of_joining", "department_id", "delta")
+    exits = exits.annotate(delta=Value(-1)).values_list(
+        "last_working_date", "employee__department_id", "delta"
+    )
+    return joins.order_by().union(exits.order_by(), all=True).order_by("date_of_joining")
+
+
+def _sweep(events, starts, end, opening):
+    """
+    One pass over date ordered events: per period, {department id:
+    [closing headcount, joiners, leavers]}. `opening` is the headcount
+    before starts[0]; earlier events are folded into it.
+    """
+    headcount = defaultdict(int, opening)
+    events = iter(events)
+    pending = next(events, None)
+    while pending is not None and pending[0] < starts[0]:
+        headcount[pending[1]] += pending[2]
+        pending = next(events, None)
+
+    periods = []
+    for boundary in starts[1:] + [end]:
+        moves = defaultdict(lambda: [0, 0])
+        while pending is not None and pending[0] < boundary:
+            day, department, delta = pending
+            headcount[department] += delta
+            moves[department][0 if delta > 0 else 1] += 1
+            pending = next(events, None)
+        periods.append({
+            department: [headcount[department], *moves.get(department, (0, 0))]
+            for department in set(headcount) | set(moves)
+            if headcount[department] or department in moves
+        })
+    return periods
+
+
+def headcount_series(employees, offboardings, starts, interval, memo, today=None):
+    """
+    Closing headcount, joiners and leavers per department id for each
+    period in `starts`, from join dates and offboarding last working dates
+    (an exit counts in the period of the last working day).
+
+    `memo` maps the start of closed periods (isoformat) to their figures
+    and is updated in place. The sweep begins at the first period missing
+    from it, opening with the headcount memoized for the period before,
+    so once history is memoized only events of the open periods are read.
+    """
+    today = today or date.today()
+    end = next_period(starts[-1], interval)
+
+    first = next((i for i, start in enumerate(starts) if start.isoformat() not in memo), None)
+    if first is None:
+        return [memo[start.isoformat()] for start in starts]
+
+    before = memo.get(previous_period(starts[first], interval).isoformat())
+    if before is None:
+        # nothing to open with: sweep from the first join
+        since, opening = None, {}
+    else:
+        since = starts[first]
+        opening = {department: values[0] for department, values in before.items()}
+
+    swept = _sweep(
+        _events(employees, offboardings, since, end),
+        starts[first:], end, opening,
+    )
+    for start, figures in zip(starts[first:], swept):
+        if next_period(start, interval) <= today:
+            memo[start.isoformat()] = figures
+
+    return [memo[start.isoformat()] for start in starts[:first]] + swept
+
+
+def series_payload(starts, interval, figures, today=None):
+    """Periods, total and per department columns of headcount_series() output."""
+    today = today or date.today()
+    names = EMPLOYEE_DIMENSIONS["department_id"]
+    departments = sorted(
+        set().union(*figures),
+        key=lambda pk: (pk is None, names.name(pk) or ""),
+    )
+
+    def columns(rows):
+        return {
+            measure: [row[i] for row in rows]
+            for i, measure in enumerate(("headcount", "joiners", "leavers"))
+        }
+
+    return {
+        "interval": interval,
+        "periods": [
+            {
+                "start": start,
+                "end": next_period(start, interval) - timedelta(days=1),
+                "closed": next_period(start, interval) <= today,
+            }
+            for start in starts
+        ],
+        "total": columns([
+            [sum(values[i] for values in period.values()) for i in range(3)]
+            for period in figures
+        ]),
+        "departments": [
+            {
+                "department": names.name(pk),
+                **columns([period.get(pk, (0, 0, 0)) for period in figures]),
+            }
+            for pk in departments
+        ],
+    }
+
+
+# ==========================
+# SALARY DISTRIBUTION
+# ==========================
+DEFAULT_PERCENTILES = [10, 25, 50, 75, 90]
+
+
+def invalidate_salaries():
+    """Drop cached salary distributions once the transaction commits."""
+    transaction.on_commit(lambda: bump_version(SALARY))
+
+
+def _factorize(values):
+    """(integer code per value, distinct values in code order), None included."""
+    index = {}
+    codes = np.fromiter(
+        (index.setdefault(value, len(index)) for value in values),
+        dtype=np.intp, count=len(values),
+    )
+    return codes, list(index)
+
+
+def _quantiles(ordered, offsets, counts, percentiles):
+    """
+    Linear interpolation percentiles (numpy's default method) of every
+    group at once: group g holds ordered[offsets[g]:offsets[g] + counts[g]].
+    """
+    position = offsets[:, None] + (counts[:, None] - 1) * np.asarray(percentiles) / 100
+    lower = np.floor(position).astype(np.intp)
+    upper = np.ceil(position).astype(np.intp)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _group_stats(values, codes, groups, percentiles, edges):
+    """Count, min, max, mean, median, percentiles and histogram per group code."""
+    order = np.lexsort((values, codes))
+    ordered = values[order]
+    counts = np.bincount(codes, minlength=groups)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    bins = len(edges) - 1
+    # the top edge belongs to the last bin, as with np.histogram
+    slots = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, bins - 1)
+
+    quantiles = _quantiles(ordered, offsets, counts, [*percentiles, 50])
+    return {
+        "count": counts,
+        "min": ordered[offsets],
+        "max": ordered[offsets + counts - 1],
+        "mean": np.bincount(codes, weights=values, minlength=groups) / counts,
+        "median": quantiles[:, -1],
+        "percentiles": quantiles[:, :-1],
+        "histogram": np.bincount(
+            codes * bins + slots, minlength=groups * bins
+        ).reshape(groups, bins),
+    }
+
+
+def _money(value):
+    return round(float(value), 2)
+
+
+def _stats_rows(stats, percentiles):
+    return [
+        {
+            "count": int(stats["count"][g]),
+            "min": _money(stats["min"][g]),
+            "max": _money(stats["max"][g]),
+            "mean": _money(stats["mean"][g]),
+            "median": _money(stats["median"][g]),
+            "percentiles": {
+                f"p{p:g}": _money(q) for p, q in zip(percentiles, stats["percentiles"][g])
+            },
+            "histogram": stats["histogram"][g].tolist(),
+        }
+        for g in range(len(stats["count"]))
+    ]
+
+
+def salary_distribution(queryset, field, group_by, percentiles=DEFAULT_PERCENTILES, bins=20):
+    """
+    Percentiles, median and histogram of the salary column `field` over
+    `queryset`, in total and per group of the `group_by` dimensions.
+
+    The columns are read once with values_list and everything else is
+    array arithmetic: one sort orders each group's salaries, so every
+    percentile of every group is an index into it, and the histograms are
+    one bincount. All histograms share the bin edges of the total, so the
+    groups can be compared bar by bar.
+    """
+    columns = [CUBE_DIMENSIONS[name] for name in group_by]
+    rows = list(
+        queryset.order_by().values_list(*columns, Cast(field, FloatField()))
+    )
+    payload = {"bin_edges": [], "total": {"count": 0}, "groups": []}
+    if not rows:
+        return payload
+
+    extract = list(zip(*rows))
+    values = np.array(extract[-1], dtype=np.float64)
+    edges = np.histogram_bin_edges(values, bins)
+    payload["bin_edges"] = [_money(edge) for edge in edges]
+
+    total = _group_stats(values, np.zeros(len(values), dtype=np.intp), 1, percentiles, edges)
+    payload["total"] = _stats_rows(total, percentiles)[0]
+
+    # one code per distinct combination of the group_by columns
+    codes = np.zeros(len(values), dtype=np.intp)
+    distinct = []
+    for column in extract[:-1]:
+        column_codes, column_values = _factorize(column)
+        codes = codes * len(column_values) + column_codes
+        distinct.append(column_values)
+    used, codes = np.unique(codes, return_inverse=True)
+
+    stats = _group_stats(values, codes.ravel(), len(used), percentiles, edges)
+    groups = []
+    for combined, row in zip(used.tolist(), _stats_rows(stats, percentiles)):
+        keys = {}
+        for name, column, column_values in reversed(list(zip(group_by, columns, distinct))):
+            combined, code = divmod(combined, len(column_values))
+            lookup = EMPLOYEE_DIMENSIONS.get(column)
+            keys[name] = lookup.name(column_values[code]) if lookup else column_values[code]
+        groups.append({name: keys[name] for name in group_by} | row)
+
+    groups.sort(key=lambda group: [
+        (group[name] is None, str(group[name])) for name in group_by
+    ])
+    payload["groups"] = groups
+    return payload
@@ -3,6 +3,10 @@ from django.apps import AppConfig
 
 class AccountsConfig(AppConfig):
     name = 'accounts'
+    default = True
+
+    def ready(self):
+        from . import signals  # noqa: F401
 
 
 # ==========================
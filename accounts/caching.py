@@ -0,0 +1,200 @@
+# accounts/caching.py
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .invalidation import InvalidationBus
+
+
+# ==========================
+# CACHE NAMESPACES
+# ==========================
+# Every cached result is stored under a namespace version. Writers bump the
+# version instead of hunting down individual keys, old entries simply expire.
+HIERARCHY = "hierarchy"
+SETTLEMENT = "settlement"
+EMPLOYEE = "employee"
+DIMENSIONS = "dimensions"
+
+# any write to employee rows, for results computed over the whole table
+EMPLOYEE_TABLE = "employee-table"
+
+# join / exit dates behind the headcount series, only bumped by changes
+# reaching into periods that are already over
+HEADCOUNT = "headcount"
+
+# salary columns and the columns salary distributions are grouped / filtered by
+SALARY = "salary"
+
+# results cached per manager scope, stale once reportee trees change shape
+SCOPED_NAMESPACES = (SETTLEMENT, HEADCOUNT, SALARY)
+
+# every other namespace hangs off one of these, bumping them all drops
+# everything this cache holds
+ROOT_NAMESPACES = (HIERARCHY, SETTLEMENT, EMPLOYEE, DIMENSIONS, EMPLOYEE_TABLE, HEADCOUNT, SALARY)
+
+
+def _version_key(namespace):
+    return f"version:{namespace}"
+
+
+def get_version(namespace):
+    if not bus.healthy():
+        # possibly missed a bump from another process: a key nobody has used
+        return time.time_ns()
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # time based so a lost version never collides with an older one
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key, 0)
+    return version
+
+
+def _bump_local(*namespaces):
+    now = time.time_ns()
+    cache.set_many({_version_key(ns): now for ns in namespaces}, None)
+
+
+def bump_version(*namespaces):
+    """Bump here now, and in every other process once the transaction commits."""
+    _bump_local(*namespaces)
+    bus.publish(namespaces)
+
+
+def _reset():
+    _bump_local(*ROOT_NAMESPACES)
+
+
+# bumps made by other worker processes / machines reach this one through it
+bus = InvalidationBus(on_bump=lambda namespaces: _bump_local(*namespaces), on_reset=_reset)
+
+
+def versioned_key(namespace, *parts):
+    return ":".join([namespace, str(get_version(namespace)), *map(str, parts)])
+
+
+# ==========================
+# PER-EMPLOYEE REPRESENTATIONS
+# ==========================
+# Serialized employee payloads, one entry per (employee, view). Each
+# employee has its own version next to the global EMPLOYEE one: writes to
+# a few rows bump theirs, bulk writes that touch everyone bump the global.
+EMPLOYEE_CACHE_TIMEOUT = 60 * 30
+
+# a rebuild holding the lock longer than this is presumed dead
+REBUILD_LOCK_TIMEOUT = 10
+REBUILD_WAIT_SECONDS = 2
+REBUILD_POLL_SECONDS = 0.05
+
+METRICS_PREFIX = "metrics:employee-cache"
+METRIC_OUTCOMES = ("hits", "misses", "coalesced", "bypassed")
+
+# views served from the cache, reported by cache_metrics()
+EMPLOYEE_CACHE_VIEWS = ("detail", "overview", "job", "salary")
+
+
+def _employee_namespace(employee_id):
+    return f"{EMPLOYEE}:{employee_id}"
+
+
+def employee_key(employee_id, view):
+    namespace = _employee_namespace(employee_id)
+    keys = [_version_key(EMPLOYEE), _version_key(namespace)]
+    found = cache.get_many(keys)
+    versions = [
+        found[key] if key in found else get_version(ns)
+        for key, ns in zip(keys, (EMPLOYEE, namespace))
+    ]
+    return ":".join([namespace, *map(str, versions), view])
+
+
+def _count(view, outcome):
+    key = f"{METRICS_PREFIX}:{view}:{outcome}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def cached_employee(view, employee_id, build):
+    """
+    Serialized representation of one employee for `view`, produced by
+    build() on a miss (None when the employee does not exist, which is not
+    cached). Concurrent misses on the same entry wait for the first one to
+    fill it rather than all going to the database.
+    """
+    if not bus.healthy():
+        _count(view, "bypassed")
+        return build()
+
+    key = employee_key(employee_id, view)
+    data = cache.get(key)
+    if data is not None:
+        _count(view, "hits")
+        return data
+
+    lock = f"{key}:lock"
+    if not cache.add(lock, 1, REBUILD_LOCK_TIMEOUT):
+        deadline = time.monotonic() + REBUILD_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(REBUILD_POLL_SECONDS)
+            data = cache.get(key)
+            if data is not None:
+                _count(view, "coalesced")
+                return data
+            if cache.get(lock) is None:
+                break
+        # the other rebuild failed or is too slow, do our own
+        _count(view, "misses")
+        return build()
+
+    _count(view, "misses")
+    try:
+        data = build()
+        if data is not None:
+            cache.set(key, data, EMPLOYEE_CACHE_TIMEOUT)
+    finally:
+        cache.delete(lock)
+    return data
+
+
+def invalidate_employees(employee_ids):
+    """
+    Drop the cached representations of these employees, and everything
+    computed over the employee table, once the current transaction
+    commits, so a concurrent rebuild cannot store the rows as they were
+    before it.
+    """
+    namespaces = [_employee_namespace(employee_id) for employee_id in employee_ids]
+    if namespaces:
+        transaction.on_commit(lambda: bump_version(*namespaces, EMPLOYEE_TABLE))
+
+
+def invalidate_all_employees():
+    transaction.on_commit(lambda: bump_version(EMPLOYEE, EMPLOYEE_TABLE))
+
+
+def cache_metrics():
+    """
+    Hits, misses, coalesced rebuild waits, lookups that skipped an
+    untrusted cache, and hit ratio per cached view.
+    """
+    keys = {
+        (view, outcome): f"{METRICS_PREFIX}:{view}:{outcome}"
+        for view in EMPLOYEE_CACHE_VIEWS
+        for outcome in METRIC_OUTCOMES
+    }
+    found = cache.get_many(keys.values())
+
+    metrics = {}
+    for view in EMPLOYEE_CACHE_VIEWS:
+        counts = {outcome: found.get(keys[view, outcome], 0) for outcome in METRIC_OUTCOMES}
+        lookups = sum(counts.values())
+        # a coalesced wait was answered from the cache too
+        served = counts["hits"] + counts["coalesced"]
+        counts["hit_ratio"] = round(served / lookups, 4) if lookups else None
+        metrics[view] = counts
+    return metrics
@@ -0,0 +1,91 @@
+# accounts/changefeed.py
+import base64
+import binascii
+import json
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Employee, EmployeeTombstone
+
+
+# change_seq values and tombstone ids are handed out without a lock, so a
+# transaction still open can commit a smaller one behind the cursor; rows
+# younger than this are held back until such a transaction has finished
+SETTLE_SECONDS = 5
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(change_seq, employee_id, tombstone_id):
+    payload = {
+        "s": change_seq,
+        "e": employee_id,
+        "t": tombstone_id,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Returns (change_seq, employee_id, tombstone_id), all 0 for no cursor."""
+    if not cursor:
+        return 0, 0, 0
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        return int(payload["s"]), int(payload["e"]), int(payload["t"])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def _settled(rows, stamp, settled):
+    """`rows` up to the first one stamped after `settled`."""
+    for i, row in enumerate(rows):
+        if getattr(row, stamp) > settled:
+            return rows[:i]
+    return rows
+
+
+def employee_changes(cursor, limit, queryset=None):
+    """
+    One page of the change feed after `cursor`: employees ordered by
+    (change_seq, id) and tombstones ordered by id, each read with an
+    index range scan. Each stops at its first row younger than
+    SETTLE_SECONDS, the cursor never moves past a row that is held back.
+    Returns (employees, tombstones, next_cursor, has_more).
+    """
+    change_seq, employee_id, tombstone_id = decode_cursor(cursor)
+    settled = timezone.now() - timedelta(seconds=SETTLE_SECONDS)
+
+    if queryset is None:
+        queryset = Employee.objects.all()
+    employees = list(
+        queryset
+        .filter(Q(change_seq__gt=change_seq) | Q(change_seq=change_seq, id__gt=employee_id))
+        .order_by("change_seq", "id")[:limit + 1]
+    )
+    employees = _settled(employees, "updated_at", settled)
+
+    tombstones = list(
+        EmployeeTombstone.objects
+        .filter(id__gt=tombstone_id)
+        .order_by("id")[:limit + 1]
+    )
+    tombstones = _settled(tombstones, "deleted_at", settled)
+
+    has_more = len(employees) > limit or len(tombstones) > limit
+    employees, tombstones = employees[:limit], tombstones[:limit]
+
+    if employees:
+        change_seq, employee_id = employees[-1].change_seq, employees[-1].id
+    if tombstones:
+        tombstone_id = tombstones[-1].id
+
+    next_cursor = encode_cursor(change_seq, employee_id, tombstone_id)
+    return employees, tombstones, next_cursor, has_more
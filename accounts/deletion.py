@@ -0,0 +1,212 @@
+# accounts/deletion.py
+import logging
+import uuid
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from . import hierarchy, tasks
+from .analytics import invalidate_headcount, invalidate_salaries
+from .caching import HIERARCHY, SETTLEMENT, bump_version, invalidate_employees
+from .events import combine_stats, publish, stats_delta
+from .models import (
+    Employee, EmployeeDeleteJob, EmployeeDocument, EmployeeTombstone, next_change_seq,
+)
+from .signals import STATS_FIELDS, bulk_deleted
+
+
+logger = logging.getLogger(__name__)
+
+# employees deleted per transaction, keeps lock time and cascades bounded
+DELETE_CHUNK_SIZE = 500
+
+# selections up to this size are deleted inside the request
+SYNC_DELETE_LIMIT = DELETE_CHUNK_SIZE
+
+# a queued / running job not heard from for this long died with its process
+JOB_STALE_SECONDS = 5 * 60
+
+ACTIVE_STATUSES = ("QUEUED", "RUNNING")
+
+# finished jobs stay readable this long
+JOB_RETENTION_DAYS = 30
+
+JOB_FIELDS = (
+    "job_id", "status", "total", "processed", "deleted_count", "error",
+    "started_at", "finished_at",
+)
+
+
+def _as_dict(job):
+    return {field: getattr(job, field) for field in JOB_FIELDS}
+
+
+def get_job(job_id):
+    """
+    Progress of a delete job, None if unknown. A job left behind by a
+    worker that stopped is claimed and resumed here.
+    """
+    job = EmployeeDeleteJob.objects.filter(job_id=job_id).first()
+    if job is None:
+        return None
+
+    stale = timezone.now() - timedelta(seconds=JOB_STALE_SECONDS)
+    if job.status in ACTIVE_STATUSES and job.heartbeat_at < stale:
+        # whoever moves the heartbeat first owns the job
+        claimed = EmployeeDeleteJob.objects.filter(
+            pk=job.pk, heartbeat_at=job.heartbeat_at
+        ).update(heartbeat_at=timezone.now())
+        if claimed:
+            logger.warning("Resuming delete job %s at %s/%s", job_id, job.processed, job.total)
+            tasks.submit(_run_job, job.pk)
+    return _as_dict(job)
+
+
+# =================================================
+# STORAGE CLEANUP
+# =================================================
+def delete_files(names):
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except Exception:
+            # a missing or locked file must not stop the rest of the batch
+            logger.warning("Could not delete %s", name)
+
+
+def _stored_files(employee_ids):
+    photos = (
+        Employee.objects
+        .filter(id__in=employee_ids)
+        .exclude(photo="")
+        .exclude(photo__isnull=True)
+        .values_list("photo", flat=True)
+    )
+    documents = (
+        EmployeeDocument.objects
+        .filter(employee_id__in=employee_ids)
+        .exclude(file="")
+        .values_list("file", flat=True)
+    )
+    return [*photos, *documents]
+
+
+# =================================================
+# CHUNKED DELETE
+# =================================================
+def _record_deleted(rows):
+    """
+    What the post_delete receiver does per employee, once for the chunk:
+    tombstones in one INSERT, each cache namespace bumped once and a
+    single event carrying the combined dashboard delta.
+    """
+    EmployeeTombstone.objects.bulk_create([
+        EmployeeTombstone(employee_id=row["id"], employee_code=row["employee_code"])
+        for row in rows
+    ])
+    bump_version(HIERARCHY, SETTLEMENT)
+    invalidate_employees([row["id"] for row in rows])
+    invalidate_headcount(*(row["date_of_joining"] for row in rows))
+    invalidate_salaries()
+
+    event = {"type": "employee"}
+    if len(rows) == 1:
+        # a single delete keeps the event shape of the receiver
+        event.update(action="deleted", id=rows[0]["id"])
+    else:
+        event.update(action="bulk_deleted", ids=[row["id"] for row in rows])
+    event["stats"] = combine_stats(
+        stats_delta({field: row[field] for field in STATS_FIELDS}, None) for row in rows
+    )
+    publish(event)
+
+
+def delete_chunk(employee_ids):
+    """
+    Delete one chunk in its own transaction. Files are queued for removal
+    once the rows are gone for good. Returns the number of employees deleted.
+    """
+    with transaction.atomic():
+        files = _stored_files(employee_ids)
+        rows = list(
+            Employee.objects
+            .filter(id__in=employee_ids)
+            .order_by("id")
+            .values("id", "employee_code", "date_of_joining", *STATS_FIELDS)
+        )
+        # reportees lose their manager through a SET_NULL update that skips
+        # save() and signals, move them up the change feed by hand and drop
+        # their cached copies
+        reportees = list(
+            Employee.objects
+            .filter(reporting_manager_id__in=employee_ids)
+            .exclude(id__in=employee_ids)
+            .values_list("id", flat=True)
+        )
+        if reportees:
+            Employee.objects.filter(id__in=reportees).update(
+                updated_at=timezone.now(), change_seq=next_change_seq(),
+            )
+            invalidate_employees(reportees)
+        with hierarchy.detached(employee_ids), bulk_deleted(employee_ids):
+            _, per_model = Employee.objects.filter(id__in=employee_ids).delete()
+        if rows:
+            _record_deleted(rows)
+        if files:
+            transaction.on_commit(lambda: tasks.submit(delete_files, files))
+    return per_model.get(Employee._meta.label, 0)
+
+
+def _chunks(employee_ids):
+    for start in range(0, len(employee_ids), DELETE_CHUNK_SIZE):
+        yield employee_ids[start:start + DELETE_CHUNK_SIZE]
+
+
+def delete_employees(employee_ids, progress=None):
+    """Delete employees chunk by chunk, calling progress(processed, deleted)."""
+    employee_ids = sorted(set(employee_ids))
+    processed = deleted = 0
+    for chunk in _chunks(employee_ids):
+        deleted += delete_chunk(chunk)
+        processed += len(chunk)
+        if progress:
+            progress(processed, deleted)
+    return deleted
+
+
+def _run_job(job_pk):
+    job = EmployeeDeleteJob.objects.get(pk=job_pk)
+    jobs = EmployeeDeleteJob.objects.filter(pk=job_pk)
+    done, deleted_before = job.processed, job.deleted_count
+
+    def progress(processed, deleted):
+        jobs.update(
+            processed=done + processed,
+            deleted_count=deleted_before + deleted,
+            heartbeat_at=timezone.now(),
+        )
+
+    jobs.update(status="RUNNING", heartbeat_at=timezone.now())
+    try:
+        # chunks already committed by an earlier attempt are skipped
+        delete_employees(job.employee_ids[done:], progress)
+        jobs.update(status="COMPLETED", finished_at=timezone.now())
+    except Exception as exc:
+        jobs.update(status="FAILED", error=str(exc), finished_at=timezone.now())
+
+
+def start_delete_job(employee_ids):
+    """Queue a background delete and return its initial progress record."""
+    employee_ids = sorted(set(employee_ids))
+    EmployeeDeleteJob.objects.filter(
+        finished_at__lt=timezone.now() - timedelta(days=JOB_RETENTION_DAYS)
+    ).delete()
+    job = EmployeeDeleteJob.objects.create(
+        job_id=uuid.uuid4().hex,
+        employee_ids=employee_ids,
+        total=len(employee_ids),
+    )
+    transaction.on_commit(lambda: tasks.submit(_run_job, job.pk))
+    return _as_dict(job)
@@ -0,0 +1,133 @@
+# accounts/dimensions.py
+import time
+
+from django.db import IntegrityError, transaction
+
+from .caching import DIMENSIONS, get_version
+from .models import Department, Location
+
+
+# how often a process checks whether another one changed a dimension table
+RECHECK_SECONDS = 1
+
+
+def canonical_name(name):
+    """Trimmed, single spaced; None for blank values."""
+    if name is None:
+        return None
+    name = " ".join(str(name).split())
+    return name or None
+
+
+class DimensionLookup:
+    """
+    id <-> name map of a small dimension table, held in memory per process,
+    so employee rows carry integer ids while the API keeps speaking names.
+
+    An id or name it does not know reloads the table (a row created by
+    another process); renames and deletes are noticed through the
+    DIMENSIONS cache version, checked at most every RECHECK_SECONDS.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._names = {}  # id -> name
+        self._ids = {}  # lowercase name -> id
+        self._version = None
+        self._checked = None
+        self._pending = {}  # id -> name, created by a transaction still open
+
+    def __deepcopy__(self, memo):
+        # shared per process, serializer fields copying their arguments get it as is
+        return self
+
+    def _load(self):
+        rows = dict(self.model.objects.values_list("id", "name"))
+        # an id taken again after the transaction that created it rolled back
+        self._pending = {
+            pk: name for pk, name in self._pending.items() if rows.get(pk, name) == name
+        }
+        rows = [(pk, name) for pk, name in rows.items() if pk not in self._pending]
+        self._names = dict(rows)
+        self._ids = {name.lower(): pk for pk, name in rows}
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._checked is not None and now - self._checked < RECHECK_SECONDS:
+            return
+        version = get_version(DIMENSIONS)
+        if version != self._version:
+            self._load()
+            self._version = version
+        self._checked = now
+
+    def name(self, pk):
+        if pk is None:
+            return None
+        self._refresh()
+        if pk not in self._names:
+            self._load()
+        return self._names.get(pk) or self._pending.get(pk)
+
+    def names(self):
+        """{id: name} of every row."""
+        self._refresh()
+        return self._names
+
+    def id_for(self, name, create=False):
+        """
+        Id of the row matching `name` (case and spacing insensitive), None
+        if there is none. With create=True an unknown name becomes a row.
+        """
+        name = canonical_name(name)
+        if name is None:
+            return None
+        self._refresh()
+        pk = self._ids.get(name.lower())
+        if pk is None:
+            self._load()
+            pk = self._ids.get(name.lower())
+        if pk is None and create:
+            try:
+                with transaction.atomic():
+                    pk = self.model.objects.create(name=name).pk
+            except IntegrityError:
+                # created by a concurrent request in the meantime
+                return self.model.objects.get(name__iexact=name).pk
+            # kept out of the shared maps until it commits, a rollback
+            # would leave them pointing at a row that does not exist
+            self._pending[pk] = name
+            transaction.on_commit(lambda: self._committed(pk))
+        return pk
+
+    def _committed(self, pk):
+        self._pending.pop(pk, None)
+        self._version = self._checked = None  # next lookup reloads
+
+
+class NewDimension(str):
+    """
+    A department / location name with no row yet, let through validation
+    by DimensionField. create_missing_dimensions() turns it into an id.
+    """
+
+
+departments = DimensionLookup(Department)
+locations = DimensionLookup(Location)
+
+# Employee attname -> lookup
+EMPLOYEE_DIMENSIONS = {
+    "department_id": departments,
+    "location_id": locations,
+}
+
+
+def create_missing_dimensions(values):
+    """
+    Replace the NewDimension names in `values` (Employee attname -> value)
+    with the ids of freshly created rows. Call it inside the transaction
+    that writes the employee, so a failed write leaves no rows behind.
+    """
+    for attname, lookup in EMPLOYEE_DIMENSIONS.items():
+        if isinstance(values.get(attname), NewDimension):
+            values[attname] = lookup.id_for(values[attname], create=True)
@@ -0,0 +1,199 @@
+# accounts/events.py
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from .dimensions import departments
+from .listen import listen_available, listen_connection
+
+
+logger = logging.getLogger(__name__)
+
+# Postgres NOTIFY channel shared by every worker process
+CHANNEL = "employee_events"
+
+# frames buffered per connection before it is told to resync
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# comment frame sent on idle connections so proxies keep them open
+HEARTBEAT_SECONDS = 15
+
+LISTEN_POLL_SECONDS = 5
+LISTEN_RETRY_SECONDS = 5
+
+RESYNC_FRAME = b"event: resync\ndata: {}\n\n"
+HEARTBEAT_FRAME = b": ping\n\n"
+
+
+def _uses_notify():
+    # NOTIFY is only worth sending when this process can LISTEN for it
+    return listen_available()
+
+
+def _frame(payload):
+    return f"event: change\ndata: {payload}\n\n".encode()
+
+
+# =================================================
+# BROADCASTER (ONE PER WORKER PROCESS)
+# =================================================
+class Broadcaster:
+    """
+    Fans change events out to every open SSE connection of this process.
+    Connections are asyncio queues on the server's event loop; events can
+    be dispatched from any thread. On Postgres with a direct LISTEN
+    connection (DATABASE_LISTEN_URL) a single LISTEN thread feeds it, so
+    events from every worker reach every connection; otherwise the events
+    of this process are dispatched locally after commit.
+    """
+
+    def __init__(self):
+        self._queues = set()
+        self._loop = None
+        self._lock = threading.Lock()
+        self._listener = None
+
+    def subscribe(self):
+        self._loop = asyncio.get_running_loop()
+        self._ensure_listener()
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._queues.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self._queues.discard(queue)
+
+    @property
+    def subscriber_count(self):
+        return len(self._queues)
+
+    def dispatch(self, payload):
+        """Thread-safe: queue an encoded event for every subscriber."""
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self._queues:
+            return
+        loop.call_soon_threadsafe(self._fanout, _frame(payload))
+
+    def _fanout(self, frame):
+        for queue in list(self._queues):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # the client fell behind, drop its backlog and make it refetch
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_FRAME)
+
+    # -------------------------
+    # Postgres LISTEN thread
+    # -------------------------
+    def _ensure_listener(self):
+        if not _uses_notify():
+            return
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(
+                    target=self._listen, name="employee-events-listener", daemon=True
+                )
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            wrapper = listen_connection()
+            try:
+                wrapper.ensure_connection()
+                raw = wrapper.connection
+                raw.autocommit = True
+                with raw.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                while True:
+                    if select.select([raw], [], [], LISTEN_POLL_SECONDS) == ([], [], []):
+                        continue
+                    raw.poll()
+                    while raw.notifies:
+                        self.dispatch(raw.notifies.pop(0).payload)
+            except Exception:
+                logger.exception("Employee event listener lost its connection")
+                time.sleep(LISTEN_RETRY_SECONDS)
+            finally:
+                wrapper.close()
+
+
+broadcaster = Broadcaster()
+
+
+# =================================================
+# PUBLISHING
+# =================================================
+def publish(event):
+    """
+    Send a change event once the current transaction commits. With LISTEN
+    available it goes through NOTIFY (transactional, reaches every worker);
+    otherwise it is dispatched to this process's subscribers after commit.
+    """
+    payload = json.dumps(event, cls=DjangoJSONEncoder, separators=(",", ":"))
+    if _uses_notify():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, payload])
+    else:
+        transaction.on_commit(lambda: broadcaster.dispatch(payload))
+
+
+def stats_delta(before, after):
+    """
+    Change to the dashboard counters when an employee goes from `before`
+    to `after`, each a dict with status and department_id (None when the
+    employee did not exist). Departments are reported by name.
+    """
+    delta = {"total_employees": 0, "active": 0, "on_leave": 0, "departments": {}}
+    for values, sign in ((before, -1), (after, 1)):
+        if values is None:
+            continue
+        delta["total_employees"] += sign
+        if values["status"] == "ACTIVE":
+            delta["active"] += sign
+        elif values["status"] == "ON_LEAVE":
+            delta["on_leave"] += sign
+        name = departments.name(values["department_id"])
+        delta["departments"][name] = delta["departments"].get(name, 0) + sign
+
+    delta["departments"] = {name: n for name, n in delta["departments"].items() if n}
+    return {key: value for key, value in delta.items() if value}
+
+
+def combine_stats(deltas):
+    """Sum several stats_delta() results into one."""
+    total = {"departments": {}}
+    for delta in deltas:
+        for key, value in delta.items():
+            if key == "departments":
+                for name, n in value.items():
+                    total["departments"][name] = total["departments"].get(name, 0) + n
+            else:
+                total[key] = total.get(key, 0) + value
+
+    total["departments"] = {name: n for name, n in total["departments"].items() if n}
+    return {key: value for key, value in total.items() if value}
+
+
+# =================================================
+# SSE STREAM
+# =================================================
+async def event_stream():
+    queue = broadcaster.subscribe()
+    try:
+        yield b"retry: 5000\n\n"
+        while True:
+            try:
+                frame = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                frame = HEARTBEAT_FRAME
+            yield frame
+    finally:
+        broadcaster.unsubscribe(queue)
@@ -0,0 +1,103 @@
+# accounts/export.py
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .dimensions import departments, locations
+
+
+# rows fetched per database round trip while streaming
+EXPORT_CHUNK_SIZE = 2000
+
+# column key -> (CSV header, ORM lookup)
+EXPORT_COLUMNS = {
+    "id": ("ID", "id"),
+    "employee_code": ("Employee Code", "employee_code"),
+    "first_name": ("First Name", "first_name"),
+    "last_name": ("Last Name", "last_name"),
+    "email": ("Email", "email"),
+    "phone": ("Phone", "phone"),
+    "gender": ("Gender", "gender"),
+    "date_of_birth": ("Date of Birth", "date_of_birth"),
+    "department": ("Department", "department_id"),
+    "designation": ("Designation", "designation"),
+    "location": ("Location", "location_id"),
+    "status": ("Status", "status"),
+    "date_of_joining": ("Date of Joining", "date_of_joining"),
+    "reporting_manager": ("Reporting Manager Code", "reporting_manager__employee_code"),
+    "employee_type": ("Employee Type", "employee_type"),
+    "work_shift": ("Work Shift", "work_shift"),
+    "work_timing": ("Work Timing", "work_timing"),
+    "probation_status": ("Probation Status", "probation_status"),
+    "annual_ctc": ("Annual CTC", "annual_ctc"),
+    "basic_pay": ("Basic Pay", "basic_pay"),
+    "allowances": ("Allowances", "allowances"),
+    "bonus": ("Bonus", "bonus"),
+}
+
+DEFAULT_EXPORT_COLUMNS = [
+    "id",
+    "employee_code",
+    "first_name",
+    "last_name",
+    "email",
+    "department",
+    "designation",
+    "location",
+    "status",
+]
+
+# columns read as ids and written as names
+DIMENSION_COLUMNS = {
+    "department": departments,
+    "location": locations,
+}
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, columns):
+    lookups = [EXPORT_COLUMNS[column][1] for column in columns]
+    rows = queryset.values_list(*lookups).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    mapped = [
+        (index, DIMENSION_COLUMNS[column])
+        for index, column in enumerate(columns) if column in DIMENSION_COLUMNS
+    ]
+    if not mapped:
+        yield from rows
+        return
+    for row in rows:
+        row = list(row)
+        for index, lookup in mapped:
+            row[index] = lookup.name(row[index])
+        yield row
+
+
+def stream_csv(queryset, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([EXPORT_COLUMNS[column][0] for column in columns])
+    for row in export_rows(queryset, columns):
+        yield writer.writerow(row)
+
+
+def stream_ndjson(queryset, columns):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in export_rows(queryset, columns):
+        yield encoder.encode(dict(zip(columns, row))) + "\n"
+
+
+STREAMERS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+}
@@ -0,0 +1,440 @@
+# accounts/hierarchy.py
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+
+from .caching import SCOPED_NAMESPACES, bump_version
+from .dimensions import departments
+from .models import Employee, EmployeeHierarchy
+
+
+# hard cap on nodes returned by one org chart response
+MAX_ORG_CHART_NODES = 2000
+
+NODE_FIELDS = ("id", "employee_code", "first_name", "last_name", "designation", "department_id")
+
+# ids per IN (...) list when seeding the pending set
+CHUNK_SIZE = 500
+
+
+class HierarchyCycleError(ValueError):
+    """Raised when a reporting_manager assignment would create a loop."""
+
+    def __init__(self, employee_ids):
+        self.employee_ids = list(employee_ids)
+        super().__init__(
+            "Reporting manager assignment creates a cycle for employees: "
+            + ", ".join(map(str, self.employee_ids))
+        )
+
+
+# =================================================
+# LOOKUPS
+# =================================================
+def is_in_subtree(manager_id, employee_id):
+    """True if employee_id is manager_id or reports to it at any depth."""
+    return EmployeeHierarchy.objects.filter(
+        ancestor_id=manager_id,
+        descendant_id=employee_id
+    ).exists()
+
+
+def creates_cycle(employee_id, manager_id):
+    """Would making manager_id the manager of employee_id create a loop?"""
+    if manager_id is None:
+        return False
+    return is_in_subtree(employee_id, manager_id)
+
+
+def cycle_members(new_managers):
+    """
+    Of the employees in {employee_id: new manager_id}, the ones whose new
+    manager closes a reporting loop. Reads the closure as it stood before
+    the change (call it once the failed refresh has rolled back): every
+    new chain is followed up to the nearest employee that moves too, so
+    one grouped lookup per chunk covers trees of any depth.
+    """
+    moved = set(new_managers)
+    nearest = {}
+    for chunk in _chunks({m for m in new_managers.values() if m is not None}):
+        rows = (
+            EmployeeHierarchy.objects
+            .filter(descendant_id__in=chunk, ancestor_id__in=moved)
+            .values_list("descendant_id", "ancestor_id", "depth")
+        )
+        for descendant, ancestor, depth in rows:
+            if descendant not in nearest or depth < nearest[descendant][1]:
+                nearest[descendant] = (ancestor, depth)
+
+    # next moving employee above each one, None once the chain reaches a root
+    above = {
+        emp_id: nearest[manager_id][0] if manager_id in nearest else None
+        for emp_id, manager_id in new_managers.items()
+    }
+    on_loop, seen = set(), set()
+    for start in above:
+        path, node = {}, start
+        while node is not None and node not in seen and node not in path:
+            path[node] = len(path)
+            node = above[node]
+        if node in path:
+            on_loop.update(list(path)[path[node]:])
+        seen.update(path)
+    return on_loop
+
+
+def subtree_counts(employee_ids):
+    """{employee_id: (direct_reportees, headcount)} from one grouped lookup."""
+    rows = (
+        EmployeeHierarchy.objects
+        .filter(ancestor_id__in=employee_ids, depth__gt=0)
+        .values("ancestor_id")
+        .annotate(
+            headcount=Count("id"),
+            direct=Count("id", filter=Q(depth=1)),
+        )
+    )
+    return {row["ancestor_id"]: (row["direct"], row["headcount"]) for row in rows}
+
+
+# =================================================
+# CLOSURE MAINTENANCE
+# =================================================
+def _tables():
+    qn = connection.ops.quote_name
+    return qn(EmployeeHierarchy._meta.db_table), qn(Employee._meta.db_table)
+
+
+def _chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+
+def _trees_changed():
+    """Results cached per manager scope are stale once the transaction commits."""
+    transaction.on_commit(lambda: bump_version(*SCOPED_NAMESPACES))
+
+
+def _reset_pending(cursor):
+    cursor.execute(
+        "CREATE TEMPORARY TABLE IF NOT EXISTS hierarchy_pending ("
+        "id BIGINT PRIMARY KEY, ready SMALLINT NOT NULL DEFAULT 0)"
+    )
+    cursor.execute("DELETE FROM hierarchy_pending")
+
+
+def _propagate(cursor):
+    """
+    Give every employee in hierarchy_pending its ancestor rows. Each round
+    handles the pending employees whose manager is already complete, so the
+    number of statements follows the tree depth, not the number of rows.
+    Whatever is still pending afterwards sits on a manager cycle.
+    """
+    closure, employee = _tables()
+
+    while True:
+        cursor.execute(f"""
+            UPDATE hierarchy_pending SET ready = 1
+            WHERE id IN (
+                SELECT e.id
+                FROM {employee} e
+                JOIN hierarchy_pending p ON p.id = e.id
+                WHERE e.reporting_manager_id IS NULL
+                   OR e.reporting_manager_id NOT IN (SELECT id FROM hierarchy_pending)
+            )
+        """)
+        if not cursor.rowcount:
+            break
+
+        cursor.execute(f"""
+            INSERT INTO {closure} (ancestor_id, descendant_id, depth)
+            SELECT c.ancestor_id, e.id, c.depth + 1
+            FROM hierarchy_pending p
+            JOIN {employee} e ON e.id = p.id
+            JOIN {closure} c ON c.descendant_id = e.reporting_manager_id
+            WHERE p.ready = 1
+        """)
+        cursor.execute("DELETE FROM hierarchy_pending WHERE ready = 1")
+
+    cursor.execute("SELECT id FROM hierarchy_pending ORDER BY id LIMIT 20")
+    stuck = [row[0] for row in cursor.fetchall()]
+    if stuck:
+        raise HierarchyCycleError(stuck)
+
+
+def add_self_rows(employee_ids):
+    closure, employee = _tables()
+    with connection.cursor() as cursor:
+        for chunk in _chunks(employee_ids):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"""
+                INSERT INTO {closure} (ancestor_id, descendant_id, depth)
+                SELECT e.id, e.id, 0
+                FROM {employee} e
+                WHERE e.id IN ({placeholders})
+                  AND NOT EXISTS (
+                      SELECT 1 FROM {closure} c
+                      WHERE c.ancestor_id = e.id AND c.descendant_id = e.id
+                  )
+            """, chunk)
+
+
+def refresh_subtrees(employee_ids):
+    """
+    Re-derive ancestor rows for the subtrees under employee_ids after their
+    reporting_manager changed (or they were just created). Raises
+    HierarchyCycleError, rolling the closure back, if the new managers
+    form a loop.
+    """
+    employee_ids = list(employee_ids)
+    if not employee_ids:
+        return
+
+    closure, _ = _tables()
+    with transaction.atomic(), connection.cursor() as cursor:
+        _reset_pending(cursor)
+        for chunk in _chunks(employee_ids):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"""
+                INSERT INTO hierarchy_pending (id)
+                SELECT DISTINCT descendant_id FROM {closure}
+                WHERE ancestor_id IN ({placeholders})
+                  AND descendant_id NOT IN (SELECT id FROM hierarchy_pending)
+            """, chunk)
+        cursor.execute(f"""
+            DELETE FROM {closure}
+            WHERE depth > 0
+              AND descendant_id IN (SELECT id FROM hierarchy_pending)
+        """)
+        _propagate(cursor)
+    _trees_changed()
+
+
+def rebuild_closure():
+    """Recompute the whole closure table from reporting_manager."""
+    closure, employee = _tables()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {closure}")
+        cursor.execute(f"""
+            INSERT INTO {closure} (ancestor_id, descendant_id, depth)
+            SELECT id, id, 0 FROM {employee}
+        """)
+        _reset_pending(cursor)
+        cursor.execute(f"INSERT INTO hierarchy_pending (id) SELECT id FROM {employee}")
+        _propagate(cursor)
+        _trees_changed()
+        cursor.execute(f"SELECT COUNT(*) FROM {closure}")
+        return cursor.fetchone()[0]
+
+
+def detach_subtrees(employee_ids):
+    """
+    Called before employees are deleted: their reportees become roots
+    (reporting_manager is SET_NULL), so the links from everything above
+    a deleted employee into its subtree go away. Rows that mention the
+    deleted employees themselves are removed by the FK cascade.
+    """
+    closure, _ = _tables()
+    detached_rows = 0
+    with connection.cursor() as cursor:
+        for chunk in _chunks(employee_ids):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"""
+                DELETE FROM {closure}
+                WHERE EXISTS (
+                    SELECT 1 FROM {closure} up
+                    JOIN {closure} down ON down.ancestor_id = up.descendant_id
+                    WHERE up.descendant_id IN ({placeholders})
+                      AND up.depth > 0 AND down.depth > 0
+                      AND up.ancestor_id = {closure}.ancestor_id
+                      AND down.descendant_id = {closure}.descendant_id
+                )
+            """, chunk)
+            detached_rows += cursor.rowcount
+    if detached_rows:
+        _trees_changed()
+
+
+def detach_subtree(employee_id):
+    if employee_id in (getattr(_detached, "ids", None) or ()):
+        return
+    detach_subtrees([employee_id])
+
+
+_detached = threading.local()
+
+
+@contextmanager
+def detached(employee_ids):
+    """
+    Detach many subtrees with set-based deletes up front; the per-row
+    pre_delete calls made while the block runs are skipped.
+    """
+    employee_ids = set(employee_ids)
+    detach_subtrees(employee_ids)
+    _detached.ids = employee_ids
+    try:
+        yield
+    finally:
+        _detached.ids = None
+
+
+# =================================================
+# DEFERRED MAINTENANCE (BULK PATHS)
+# =================================================
+_deferred = threading.local()
+
+
+def is_deferred():
+    return getattr(_deferred, "ids", None) is not None
+
+
+def defer(employee_id, created=False):
+    _deferred.ids.add(employee_id)
+    if created:
+        _deferred.created.add(employee_id)
+
+
+@contextmanager
+def deferred_refresh():
+    """
+    Collect hierarchy changes made by per-row saves and apply them in one
+    set-based refresh when the block exits (CSV upload and friends).
+    """
+    if is_deferred():
+        yield
+        return
+
+    _deferred.ids, _deferred.created = set(), set()
+    try:
+        yield
+        ids, created = _deferred.ids, _deferred.created
+    finally:
+        _deferred.ids = _deferred.created = None
+
+    add_self_rows(created)
+    refresh_subtrees(ids)
+
+
+def employee_saved(employee, created, manager_changed):
+    if is_deferred():
+        if created or manager_changed:
+            defer(employee.pk, created=created)
+        return
+
+    if created:
+        add_self_rows([employee.pk])
+        if employee.reporting_manager_id:
+            closure, _ = _tables()
+            with connection.cursor() as cursor:
+                cursor.execute(f"""
+                    INSERT INTO {closure} (ancestor_id, descendant_id, depth)
+                    SELECT ancestor_id, %s, depth + 1 FROM {closure}
+                    WHERE descendant_id = %s
+                """, [employee.pk, employee.reporting_manager_id])
+    elif manager_changed:
+        refresh_subtrees([employee.pk])
+
+
+# =================================================
+# ORG CHART
+# =================================================
+def _node(details):
+    return {
+        "id": details["id"],
+        "employee_code": details["employee_code"],
+        "name": f"{details['first_name']} {details['last_name'] or ''}".strip(),
+        "designation": details["designation"],
+        "department": departments.name(details["department_id"]),
+    }
+
+
+def _reportees(manager_ids, breadth, limit):
+    """
+    Reportees of manager_ids, lowest ids first: at most `breadth` per
+    manager and `limit` in all, each with its manager's direct reportee
+    count. One query, the cut is made by the database.
+    """
+    per_manager = {"partition_by": F("reporting_manager_id")}
+    return list(
+        Employee.objects
+        .filter(reporting_manager_id__in=manager_ids)
+        .annotate(
+            rank=Window(RowNumber(), order_by=F("id").asc(), **per_manager),
+            siblings=Window(Count("id"), **per_manager),
+        )
+        .filter(rank__lte=breadth)
+        .order_by("reporting_manager_id", "id")
+        .values(*NODE_FIELDS, "reporting_manager_id", "siblings")[:limit]
+    )
+
+
+def build_org_chart(root_id, depth, breadth):
+    """
+    Reportee subtree of root_id (bounded by depth / breadth), the management
+    chain above it and the headcount of every returned subtree. Reportees
+    are read one level per query, capped per manager and in total by the
+    database. Headcounts are counted in the closure table only for nodes
+    whose reportees were cut; the rest are summed from the nodes shown.
+    Returns None if the employee does not exist.
+    """
+    root = Employee.objects.filter(id=root_id).values(*NODE_FIELDS).first()
+    if root is None:
+        return None
+
+    details = {root_id: root}
+    children = defaultdict(list)
+    direct = {}
+    frontier = [root_id]
+    for _ in range(depth):
+        limit = MAX_ORG_CHART_NODES - len(details)
+        if not frontier or limit <= 0:
+            break
+        rows = _reportees(frontier, breadth, limit)
+        for row in rows:
+            details[row["id"]] = row
+            children[row["reporting_manager_id"]].append(row["id"])
+            direct[row["reporting_manager_id"]] = row["siblings"]
+        if len(rows) < limit:
+            # nothing was cut by the node limit: managers without a row
+            # have no reportees
+            for emp_id in frontier:
+                direct.setdefault(emp_id, 0)
+        frontier = [row["id"] for row in rows]
+
+    # only managers whose reportees were cut are counted in the closure
+    # table, the others sum up their reportees (listed after them)
+    cut = {emp_id for emp_id in details if direct.get(emp_id) != len(children[emp_id])}
+    counts = subtree_counts(cut) if cut else {}
+    for emp_id in reversed(list(details)):
+        if emp_id not in cut:
+            shown = children[emp_id]
+            counts[emp_id] = (
+                len(shown), len(shown) + sum(counts.get(c, (0, 0))[1] for c in shown)
+            )
+
+    def render(emp_id):
+        node = _node(details[emp_id])
+        node["direct_reportees"], node["headcount"] = counts.get(emp_id, (0, 0))
+        node["reportees"] = [render(child_id) for child_id in children[emp_id]]
+        node["reportees_truncated"] = len(node["reportees"]) < node["direct_reportees"]
+        return node
+
+    chain = (
+        Employee.objects
+        .filter(descendant_links__descendant_id=root_id, descendant_links__depth__gt=0)
+        .order_by("descendant_links__depth")
+        .values(*NODE_FIELDS)
+    )
+
+    return {
+        "employee": render(root_id),
+        "chain": [_node(row) for row in chain],
+        "depth": depth,
+        "breadth": breadth,
+    }
@@ -0,0 +1,323 @@
+# accounts/invalidation.py
+import atexit
+import logging
+import os
+import select
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, connections, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .listen import listen_available, listen_connection
+from .models import CacheInvalidation
+
+
+logger = logging.getLogger(__name__)
+
+# Postgres NOTIFY channel, wakes subscribers as soon as a row is committed
+CHANNEL = "cache_invalidation"
+
+# how often every worker reads the log (the only path without NOTIFY)
+POLL_SECONDS = 1
+
+# bumps published within this window go out as one row
+PUBLISH_DELAY_SECONDS = 0.02
+
+# a worker that has not synced for this long stops trusting its cache
+DEFAULT_MAX_STALENESS_SECONDS = 10
+
+# rows are pruned after this, a worker out of sync for half of it resets
+RETENTION_SECONDS = 60 * 60
+PRUNE_SECONDS = 60
+
+# ids skipped over (inserts not committed yet) are looked for this long
+GAP_TIMEOUT_SECONDS = 30
+MAX_GAP = 1000
+
+SYNC_BATCH_SIZE = 1000
+
+
+def bus_enabled():
+    return getattr(settings, "CACHE_INVALIDATION_BUS", True)
+
+
+def max_staleness():
+    return getattr(settings, "CACHE_MAX_STALENESS", DEFAULT_MAX_STALENESS_SECONDS)
+
+
+def _origin():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class InvalidationBus:
+    """
+    Carries cache namespace bumps between worker processes and machines.
+
+    Writers queue the namespaces they bump; once their transaction has
+    committed a publisher thread writes them to the CacheInvalidation log
+    (one row per burst) and, when LISTEN is available (accounts.listen),
+    sends a NOTIFY. A subscriber thread in every process reads the rows it
+    has not seen yet (woken by NOTIFY, or every POLL_SECONDS) and calls
+    `on_bump(namespaces)` for the ones written by other processes.
+
+    Staleness is bounded: if the subscriber has not synced for
+    CACHE_MAX_STALENESS seconds, healthy() turns False and callers stop
+    reading from the cache until it catches up. After an outage longer than
+    the log retention `on_reset()` drops everything.
+    """
+
+    def __init__(self, on_bump, on_reset):
+        self.on_bump = on_bump
+        self.on_reset = on_reset
+
+        self._lock = threading.Lock()
+        self._subscriber = None
+        self._publisher = None
+
+        self._outbox = set()
+        self._outbox_ready = threading.Condition()
+
+        self._last_id = None
+        self._gaps = {}  # missing id -> monotonic deadline
+        self._last_sync = None  # until the first sync nothing cached is trusted
+        self._last_prune = 0.0
+        self._pid = os.getpid()
+
+        self.mode = None
+        self.counters = {
+            "published": 0,
+            "received": 0,
+            "resets": 0,
+            "bypassed_lookups": 0,
+            "errors": 0,
+        }
+        self.lag = {"last": None, "max": 0.0, "total": 0.0}
+
+        atexit.register(self._flush_on_exit)
+
+    # -------------------------
+    # Threads
+    # -------------------------
+    def _start(self, attr, target, name):
+        thread = getattr(self, attr)
+        if thread is not None and thread.is_alive():
+            return
+        with self._lock:
+            thread = getattr(self, attr)
+            if thread is None or not thread.is_alive():
+                if self._pid != os.getpid():
+                    # forked: the parent's position in the log means nothing here
+                    self._pid = os.getpid()
+                    self._last_id = None
+                    self._last_sync = None
+                thread = threading.Thread(target=target, name=name, daemon=True)
+                setattr(self, attr, thread)
+                thread.start()
+
+    def _since_sync(self):
+        if self._last_sync is None:
+            return float("inf")
+        return time.monotonic() - self._last_sync
+
+    def ensure_started(self):
+        if bus_enabled():
+            self._start("_subscriber", self._subscribe, "cache-invalidation-subscriber")
+
+    def _fresh(self):
+        return not bus_enabled() or self._since_sync() <= max_staleness()
+
+    def healthy(self):
+        if not bus_enabled():
+            return True
+        self.ensure_started()
+        if self._fresh():
+            return True
+        self.counters["bypassed_lookups"] += 1
+        return False
+
+    # -------------------------
+    # Publishing
+    # -------------------------
+    def publish(self, namespaces):
+        """Queue namespaces for the other processes, sent after commit."""
+        if not bus_enabled() or not namespaces:
+            return
+        self.ensure_started()
+        namespaces = set(namespaces)
+        transaction.on_commit(lambda: self._queue(namespaces))
+
+    def _queue(self, namespaces):
+        self._start("_publisher", self._publish_loop, "cache-invalidation-publisher")
+        with self._outbox_ready:
+            self._outbox |= namespaces
+            self._outbox_ready.notify()
+
+    def _publish_loop(self):
+        while True:
+            with self._outbox_ready:
+                while not self._outbox:
+                    self._outbox_ready.wait()
+            time.sleep(PUBLISH_DELAY_SECONDS)
+            try:
+                self.flush()
+            except Exception:
+                self.counters["errors"] += 1
+                logger.exception("Could not publish cache invalidations")
+                connections.close_all()
+                time.sleep(POLL_SECONDS)
+
+    def flush(self):
+        """Write out queued namespaces now (also run at interpreter exit)."""
+        with self._outbox_ready:
+            namespaces, self._outbox = self._outbox, set()
+        if not namespaces:
+            return
+        try:
+            close_old_connections()
+            with transaction.atomic():
+                row = CacheInvalidation.objects.create(
+                    namespaces=sorted(namespaces), origin=_origin()
+                )
+                if listen_available():
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, str(row.id)])
+        except Exception:
+            # put them back for the next attempt
+            with self._outbox_ready:
+                self._outbox |= namespaces
+            raise
+        self.counters["published"] += 1
+
+    # -------------------------
+    # Subscribing
+    # -------------------------
+    def _subscribe(self):
+        while True:
+            try:
+                if listen_available():
+                    self._listen()
+                else:
+                    self.mode = "poll"
+                    while True:
+                        self.sync()
+                        time.sleep(POLL_SECONDS)
+            except Exception:
+                self.counters["errors"] += 1
+                logger.exception("Cache invalidation subscriber failed")
+                connections.close_all()
+                time.sleep(POLL_SECONDS)
+
+    def _listen(self):
+        # not the default connection, LISTEN does not survive the pooler
+        wrapper = listen_connection()
+        try:
+            wrapper.ensure_connection()
+            raw = wrapper.connection
+            raw.autocommit = True
+            with raw.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+            self.mode = "listen"
+            while True:
+                # a notification or the poll interval, whichever comes first
+                if select.select([raw], [], [], POLL_SECONDS) != ([], [], []):
+                    raw.poll()
+                    raw.notifies.clear()
+                self.sync()
+        finally:
+            self.mode = None
+            wrapper.close()
+
+    def sync(self):
+        """Apply every row committed before this call started."""
+        started = time.monotonic()
+        close_old_connections()
+
+        if self._last_id is None:
+            # nothing was read from the cache before this first sync
+            self._last_id = self._max_id()
+        elif self._since_sync() > RETENTION_SECONDS / 2:
+            # rows we never saw may be pruned already
+            self._last_id = self._max_id()
+            self._gaps.clear()
+            self.counters["resets"] += 1
+            self.on_reset()
+        else:
+            self._catch_up(started)
+
+        self._last_sync = started
+        if started - self._last_prune > PRUNE_SECONDS:
+            self._last_prune = started
+            self._prune()
+
+    def _max_id(self):
+        return CacheInvalidation.objects.aggregate(last=Max("id"))["last"] or 0
+
+    def _catch_up(self, now):
+        self._gaps = {gap: deadline for gap, deadline in self._gaps.items() if deadline > now}
+        while True:
+            rows = list(
+                CacheInvalidation.objects
+                .filter(Q(id__gt=self._last_id) | Q(id__in=list(self._gaps)))
+                .order_by("id")
+                .values_list("id", "namespaces", "origin", "created_at")[:SYNC_BATCH_SIZE]
+            )
+            origin = _origin()
+            for row_id, namespaces, row_origin, created_at in rows:
+                if row_id in self._gaps:
+                    del self._gaps[row_id]
+                elif row_id > self._last_id:
+                    # a lower id may still be inside an open transaction
+                    for gap in range(max(self._last_id + 1, row_id - MAX_GAP), row_id):
+                        self._gaps[gap] = now + GAP_TIMEOUT_SECONDS
+                    self._last_id = row_id
+                if row_origin == origin:
+                    continue
+                self.on_bump(namespaces)
+                self._record_lag(created_at)
+            if len(rows) < SYNC_BATCH_SIZE:
+                return
+
+    def _record_lag(self, created_at):
+        lag = max((timezone.now() - created_at).total_seconds(), 0.0)
+        self.counters["received"] += 1
+        self.lag["last"] = lag
+        self.lag["max"] = max(self.lag["max"], lag)
+        self.lag["total"] += lag
+
+    def _prune(self):
+        cutoff = timezone.now() - timedelta(seconds=RETENTION_SECONDS)
+        CacheInvalidation.objects.filter(created_at__lt=cutoff).delete()
+
+    # -------------------------
+    # Metrics
+    # -------------------------
+    def metrics(self):
+        received = self.counters["received"]
+        since_sync = self._since_sync()
+        return {
+            "enabled": bus_enabled(),
+            "mode": self.mode,
+            "healthy": self._fresh(),
+            "max_staleness_seconds": max_staleness(),
+            "seconds_since_sync": round(since_sync, 3) if self._last_sync is not None else None,
+            "last_applied_id": self._last_id,
+            "pending_gaps": len(self._gaps),
+            **self.counters,
+            "lag_seconds": {
+                "last": None if self.lag["last"] is None else round(self.lag["last"], 4),
+                "max": round(self.lag["max"], 4),
+                "mean": round(self.lag["total"] / received, 4) if received else None,
+            },
+        }
+
+    def _flush_on_exit(self):
+        # management commands exit right after their last write
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Could not publish cache invalidations at exit")
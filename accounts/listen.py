@@ -0,0 +1,38 @@
+# accounts/listen.py
+from urllib.parse import urlparse
+
+import dj_database_url
+from django.conf import settings
+from django.db import connection, connections
+from django.db.utils import load_backend
+
+
+def _listen_url():
+    url = getattr(settings, "DATABASE_LISTEN_URL", "")
+    if connection.vendor != "postgresql" or not url:
+        return None
+    # a transaction pooler hands each statement to whichever server
+    # connection is free, the LISTEN registration is lost with it
+    if "-pooler" in (urlparse(url).hostname or ""):
+        return None
+    return url
+
+
+def listen_available():
+    """True when LISTEN has a direct, session-level connection to run on."""
+    return _listen_url() is not None
+
+
+def listen_connection():
+    """
+    New connection for a LISTEN thread, opened on DATABASE_LISTEN_URL
+    instead of the pooled default. Only the server and credentials come
+    from the URL: NOTIFY is per database, so the database name stays the
+    default one. The caller closes it.
+    """
+    direct = dj_database_url.parse(_listen_url(), ssl_require=True)
+    params = {
+        **connections.settings["default"],
+        **{key: direct[key] for key in ("HOST", "PORT", "USER", "PASSWORD", "OPTIONS")},
+    }
+    return load_backend(params["ENGINE"]).DatabaseWrapper(params, alias="listen")
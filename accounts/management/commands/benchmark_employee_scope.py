@@ -0,0 +1,114 @@
+# accounts/management/commands/benchmark_employee_scope.py
+import random
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from accounts.dimensions import departments
+from accounts.hierarchy import rebuild_closure
+from accounts.models import Employee
+from accounts.scoping import EmployeeScopeMixin
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark manager-scoped employee visibility on a deep hierarchy: "
+        "closure-table scoping vs walking reporting_manager per row. "
+        "All generated rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=20000)
+        parser.add_argument("--depth", type=int, default=200, help="Length of the management chain")
+        parser.add_argument("--sample", type=int, default=200, help="Rows timed for the naive walk")
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        count = max(options["employees"], options["depth"] + 1)
+        depth = options["depth"]
+
+        with transaction.atomic():
+            base_id = (Employee.objects.aggregate(m=Max("id"))["m"] or 0) + 1
+            department_id = departments.id_for("Benchmark", create=True)
+
+            # a chain of `depth` managers, everybody else hangs off a random one
+            employees = []
+            for i in range(count):
+                if i == 0:
+                    manager_id = None
+                elif i < depth:
+                    manager_id = base_id + i - 1
+                else:
+                    manager_id = base_id + rng.randrange(depth)
+                employees.append(Employee(
+                    id=base_id + i,
+                    employee_code=f"BENCH-{base_id + i}",
+                    first_name="Bench",
+                    last_name=str(i),
+                    department_id=department_id,
+                    designation="Engineer",
+                    reporting_manager_id=manager_id,
+                ))
+            Employee.objects.bulk_create(employees, batch_size=2000)
+
+            started = time.perf_counter()
+            rebuild_closure()
+            rebuild_time = time.perf_counter() - started
+
+            viewer_id = base_id + depth // 2
+            view = EmployeeScopeMixin()
+            view.request = SimpleNamespace(user=SimpleNamespace(
+                is_authenticated=True,
+                is_superuser=False,
+                is_staff=False,
+                is_super_admin=False,
+                _employee_scope=viewer_id,
+            ))
+
+            # closure scoping: one join for the list
+            started = time.perf_counter()
+            visible = list(
+                view.scope_employees(Employee.objects.filter(id__gte=base_id))
+                .values_list("id", flat=True)
+            )
+            list_time = time.perf_counter() - started
+
+            sample = rng.sample(range(base_id, base_id + count), min(options["sample"], count))
+
+            # closure scoping: one indexed lookup per detail view
+            started = time.perf_counter()
+            closure_hits = sum(view.in_scope(emp_id) for emp_id in sample)
+            detail_time = (time.perf_counter() - started) / len(sample)
+
+            # naive: walk reporting_manager one query per level
+            started = time.perf_counter()
+            naive_hits = 0
+            for emp_id in sample:
+                current = emp_id
+                while current is not None:
+                    if current == viewer_id:
+                        naive_hits += 1
+                        break
+                    current = (
+                        Employee.objects.filter(id=current)
+                        .values_list("reporting_manager_id", flat=True)
+                        .first()
+                    )
+            naive_per_row = (time.perf_counter() - started) / len(sample)
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"employees: {count}, chain depth: {depth}, visible to viewer: {len(visible)}")
+        self.stdout.write(f"closure rebuild:               {rebuild_time * 1000:10.1f} ms")
+        self.stdout.write(f"scoped list (closure join):    {list_time * 1000:10.1f} ms")
+        self.stdout.write(f"detail check (closure lookup): {detail_time * 1000:10.3f} ms/row")
+        self.stdout.write(f"detail check (naive walk):     {naive_per_row * 1000:10.3f} ms/row")
+        self.stdout.write(
+            f"naive walk for the same list:  {naive_per_row * count * 1000:10.1f} ms (extrapolated)"
+        )
+        if closure_hits != naive_hits:
+            self.stderr.write(f"mismatch: closure={closure_hits} naive={naive_hits}")
@@ -0,0 +1,75 @@
+# accounts/management/commands/benchmark_renderers.py
+import gzip
+import time
+
+import brotli
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from accounts.export import DEFAULT_EXPORT_COLUMNS, export_rows
+from accounts.middleware import BROTLI_QUALITY
+from accounts.models import Employee
+from accounts.renderers import MessagePackRenderer, ORJSONRenderer
+from accounts.serializers import EmployeeSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Render time and bytes on the wire for the employee list and export "
+        "payloads: DRF JSON vs orjson vs MessagePack, raw / gzip / brotli."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def _time(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+
+        employees = Employee.objects.select_related("reporting_manager").order_by("id")[:rows]
+        payloads = {
+            "list": EmployeeSerializer(employees, many=True).data,
+            "export": [
+                dict(zip(DEFAULT_EXPORT_COLUMNS, row))
+                for row in export_rows(
+                    Employee.objects.order_by("id")[:rows], DEFAULT_EXPORT_COLUMNS
+                )
+            ],
+        }
+        renderers = {
+            "drf-json": JSONRenderer(),
+            "orjson": ORJSONRenderer(),
+            "msgpack": MessagePackRenderer(),
+        }
+
+        self.stdout.write(
+            f"{'payload':8} {'renderer':9} {'render ms':>10} {'raw KB':>9} "
+            f"{'gzip KB':>9} {'gzip ms':>8} {'br KB':>9} {'br ms':>8}"
+        )
+        for name, data in payloads.items():
+            reference = None
+            for renderer_name, renderer in renderers.items():
+                render_time, body = self._time(lambda: renderer.render(data), repeat)
+                gzip_time, gzipped = self._time(lambda: gzip.compress(body, 6), 1)
+                br_time, brotlied = self._time(
+                    lambda: brotli.compress(body, quality=BROTLI_QUALITY), 1
+                )
+                self.stdout.write(
+                    f"{name:8} {renderer_name:9} {render_time * 1000:10.1f} "
+                    f"{len(body) / 1024:9.1f} {len(gzipped) / 1024:9.1f} {gzip_time * 1000:8.1f} "
+                    f"{len(brotlied) / 1024:9.1f} {br_time * 1000:8.1f}"
+                )
+                if renderer_name == "drf-json":
+                    reference = body
+                elif renderer_name == "orjson" and body != reference:
+                    self.stderr.write(f"{name}: orjson output differs from DRF JSONRenderer")
+        self.stdout.write(f"rows: {len(payloads['list'])}, best of {repeat}")
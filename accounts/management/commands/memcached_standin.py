@@ -0,0 +1,173 @@
+# accounts/management/commands/memcached_standin.py
+import socketserver
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+
+# exptime values above this are absolute unix timestamps (memcached rule)
+RELATIVE_EXPTIME_LIMIT = 60 * 60 * 24 * 30
+
+STORAGE_COMMANDS = {"set", "add", "replace", "append", "prepend", "cas"}
+
+
+class Store:
+    """Thread-safe key -> (flags, value, expires_at, cas) map."""
+
+    def __init__(self):
+        self.items = {}
+        self.lock = threading.Lock()
+        self.next_cas = 1
+
+    @staticmethod
+    def expiry(exptime):
+        if exptime == 0:
+            return None
+        if exptime < 0:
+            return 0
+        if exptime > RELATIVE_EXPTIME_LIMIT:
+            return exptime
+        return time.time() + exptime
+
+    def live(self, key):
+        item = self.items.get(key)
+        if item is not None and item[2] is not None and item[2] <= time.time():
+            del self.items[key]
+            item = None
+        return item
+
+    def put(self, key, flags, value, expires_at):
+        self.items[key] = (flags, value, expires_at, self.next_cas)
+        self.next_cas += 1
+
+
+class MemcachedHandler(socketserver.StreamRequestHandler):
+    """
+    The subset of the memcached text protocol used by Django's
+    PyMemcacheCache: get / gets, storage commands, delete, incr / decr,
+    touch, flush_all, version.
+    """
+
+    def reply(self, line, noreply=False):
+        if not noreply:
+            self.wfile.write(line + b"\r\n")
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            parts = line.split()
+            if not parts:
+                continue
+            command, args = parts[0].decode().lower(), parts[1:]
+
+            if command in STORAGE_COMMANDS:
+                data = self.rfile.read(int(args[3]) + 2)[:-2]
+                self.storage(store, command, args, data)
+            elif command in ("get", "gets"):
+                with store.lock:
+                    for key in args:
+                        item = store.live(key)
+                        if item is None:
+                            continue
+                        flags, value, _, cas = item
+                        header = b"VALUE %s %d %d" % (key, flags, len(value))
+                        if command == "gets":
+                            header += b" %d" % cas
+                        self.wfile.write(header + b"\r\n" + value + b"\r\n")
+                self.reply(b"END")
+            elif command == "delete":
+                with store.lock:
+                    found = store.live(args[0]) is not None
+                    store.items.pop(args[0], None)
+                self.reply(b"DELETED" if found else b"NOT_FOUND", b"noreply" in args)
+            elif command in ("incr", "decr"):
+                self.incr(store, command, args)
+            elif command == "touch":
+                with store.lock:
+                    item = store.live(args[0])
+                    if item is not None:
+                        store.items[args[0]] = (
+                            item[0], item[1], store.expiry(int(args[1])), item[3]
+                        )
+                self.reply(b"TOUCHED" if item else b"NOT_FOUND", b"noreply" in args)
+            elif command == "flush_all":
+                with store.lock:
+                    store.items.clear()
+                self.reply(b"OK", b"noreply" in args)
+            elif command == "version":
+                self.reply(b"VERSION 1.6.0-standin")
+            elif command == "quit":
+                return
+            else:
+                self.reply(b"ERROR")
+            self.wfile.flush()
+
+    def storage(self, store, command, args, data):
+        key, flags, exptime = args[0], int(args[1]), int(args[2])
+        noreply = args[-1] == b"noreply"
+        with store.lock:
+            item = store.live(key)
+            if command == "add" and item is not None:
+                return self.reply(b"NOT_STORED", noreply)
+            if command in ("replace", "append", "prepend") and item is None:
+                return self.reply(b"NOT_STORED", noreply)
+            if command == "cas":
+                if item is None:
+                    return self.reply(b"NOT_FOUND", noreply)
+                if item[3] != int(args[4]):
+                    return self.reply(b"EXISTS", noreply)
+            if command == "append":
+                flags, data, expires_at = item[0], item[1] + data, item[2]
+            elif command == "prepend":
+                flags, data, expires_at = item[0], data + item[1], item[2]
+            else:
+                expires_at = store.expiry(exptime)
+            store.put(key, flags, data, expires_at)
+        self.reply(b"STORED", noreply)
+
+    def incr(self, store, command, args):
+        key, delta = args[0], int(args[1])
+        noreply = b"noreply" in args[2:]
+        with store.lock:
+            item = store.live(key)
+            if item is None:
+                return self.reply(b"NOT_FOUND", noreply)
+            if not item[1].isdigit():
+                return self.reply(
+                    b"CLIENT_ERROR cannot increment or decrement non-numeric value", noreply
+                )
+            value = int(item[1]) + delta if command == "incr" else max(int(item[1]) - delta, 0)
+            store.put(key, item[0], str(value % 2 ** 64).encode(), item[2])
+        self.reply(str(value % 2 ** 64).encode(), noreply)
+
+
+class StandinServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address):
+        super().__init__(address, MemcachedHandler)
+        self.store = Store()
+
+
+class Command(BaseCommand):
+    help = (
+        "Run an in-process memcached stand-in, for trying CACHE_BACKEND=memcached "
+        "locally without a memcached server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=11211)
+
+    def handle(self, *args, **options):
+        with StandinServer((options["host"], options["port"])) as server:
+            self.stdout.write(f"memcached stand-in listening on {options['host']}:{options['port']}")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
@@ -0,0 +1,23 @@
+# accounts/management/commands/rebuild_employee_hierarchy.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.caching import HIERARCHY, bump_version
+from accounts.hierarchy import HierarchyCycleError, rebuild_closure
+
+
+class Command(BaseCommand):
+    help = "Rebuild the employee hierarchy closure table from reporting_manager."
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            rows = rebuild_closure()
+        except HierarchyCycleError as exc:
+            raise CommandError(str(exc))
+
+        bump_version(HIERARCHY)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt hierarchy with {rows} rows in {time.monotonic() - started:.1f}s"
+        ))
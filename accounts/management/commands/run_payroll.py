@@ -0,0 +1,32 @@
+# accounts/management/commands/run_payroll.py
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.payroll import run_payroll
+
+
+class Command(BaseCommand):
+    help = (
+        "Run payroll for a month. Employees unchanged since the last completed "
+        "run keep their figures, everyone else is recomputed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--period",
+            help="Any day of the payroll month (YYYY-MM-DD), defaults to the current month",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            period = date.fromisoformat(options["period"]) if options["period"] else date.today()
+        except ValueError:
+            raise CommandError("--period must be a date (YYYY-MM-DD)")
+
+        run = run_payroll(period)
+        self.stdout.write(self.style.SUCCESS(
+            f"Payroll run {run.id} for {run.period:%Y-%m}: "
+            f"{run.employee_count} employees, {run.recomputed_count} recomputed, "
+            f"net {run.total_net}"
+        ))
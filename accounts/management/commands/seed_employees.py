@@ -0,0 +1,271 @@
+# accounts/management/commands/seed_employees.py
+import random
+import time
+from array import array
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from accounts.analytics import invalidate_headcount, invalidate_salaries
+from accounts.caching import HIERARCHY, SETTLEMENT, bump_version, invalidate_all_employees
+from accounts.dimensions import departments as department_lookup, locations as location_lookup
+from accounts.hierarchy import rebuild_closure
+from accounts.models import (
+    Employee,
+    EmployeeOffboarding,
+    OffboardingChecklist,
+    EmployeeDocument,
+    next_change_seq,
+)
+
+
+FIRST_NAMES = [
+    "Aarav", "Vivaan", "Aditya", "Arjun", "Sai", "Karthik", "Rahul", "Vikram",
+    "Santhosh", "Manoj", "Suresh", "Ramesh", "Naveen", "Harish", "Ajay", "Rohit",
+    "Priya", "Ananya", "Divya", "Kavya", "Meera", "Sneha", "Lakshmi", "Pooja",
+    "Nithya", "Deepa", "Keerthi", "Swathi", "Aishwarya", "Revathi", "Shruti", "Nandini",
+]
+
+LAST_NAMES = [
+    "Sharma", "Kumar", "Iyer", "Reddy", "Nair", "Menon", "Rao", "Pillai",
+    "Krishnan", "Subramanian", "Raman", "Gupta", "Verma", "Patel", "Shah", "Joshi",
+    "Bose", "Das", "Mukherjee", "Chatterjee", "Naidu", "Shetty", "Hegde", "Kulkarni",
+]
+
+# department -> designations, most senior first
+DEPARTMENTS = {
+    "Engineering": ["VP Engineering", "Engineering Manager", "Tech Lead", "Senior Software Engineer", "Software Engineer"],
+    "Product": ["VP Product", "Product Director", "Senior Product Manager", "Product Manager", "Associate Product Manager"],
+    "Sales": ["VP Sales", "Regional Sales Manager", "Sales Manager", "Senior Sales Executive", "Sales Executive"],
+    "Marketing": ["VP Marketing", "Marketing Manager", "Brand Lead", "Marketing Specialist", "Marketing Associate"],
+    "Finance": ["CFO", "Finance Manager", "Senior Accountant", "Accountant", "Accounts Executive"],
+    "Human Resources": ["CHRO", "HR Manager", "HR Business Partner", "HR Executive", "HR Associate"],
+    "Operations": ["COO", "Operations Manager", "Operations Lead", "Operations Analyst", "Operations Associate"],
+    "Support": ["Head of Support", "Support Manager", "Support Lead", "Senior Support Engineer", "Support Engineer"],
+}
+DEPARTMENT_NAMES = list(DEPARTMENTS)
+
+LOCATIONS = ["Chennai", "Bengaluru", "Hyderabad", "Pune", "Mumbai", "Delhi", "Coimbatore", "Kochi"]
+
+SHIFTS = [
+    ("DAY", "09:00 AM - 06:00 PM"),
+    ("NIGHT", "09:00 PM - 06:00 AM"),
+    ("ROTATIONAL", "Rotational"),
+]
+
+# annual CTC band by depth in the reporting tree (CEO = 0)
+CTC_BANDS = [6000000, 3600000, 2400000, 1500000, 900000, 600000]
+
+EXIT_REASONS = [
+    "Better opportunity",
+    "Higher studies",
+    "Relocation",
+    "Personal reasons",
+    "Contract ended",
+    "Health reasons",
+]
+
+CHECKLIST_ITEMS = [item for item, _ in OffboardingChecklist.CHECKLIST_CHOICES]
+DOCUMENT_TYPES = [doc_type for doc_type, _ in EmployeeDocument.DOCUMENT_TYPES]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic employees with a coherent reporting tree, "
+        "offboardings, checklists and documents using batched bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=10000, help="Number of employees to create")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per bulk_create batch")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed (same seed = same data)")
+        parser.add_argument("--fanout", type=int, default=8, help="Direct reports per manager")
+        parser.add_argument("--prefix", default="SEED", help="Prefix for generated employee codes")
+        parser.add_argument(
+            "--offboarding-ratio", type=float, default=0.03,
+            help="Fraction of employees that get an offboarding with checklist"
+        )
+        parser.add_argument(
+            "--document-ratio", type=float, default=0.5,
+            help="Fraction of employees that get uploaded documents"
+        )
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        batch_size = options["batch_size"]
+        fanout = options["fanout"]
+
+        if count < 1:
+            raise CommandError("--count must be at least 1")
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1")
+        if fanout < 1:
+            raise CommandError("--fanout must be at least 1")
+
+        rng = random.Random(options["seed"])
+        prefix = options["prefix"]
+
+        # Primary keys are assigned up front so managers can be referenced
+        # from the same batch without a round trip per level.
+        base_id = (Employee.objects.aggregate(m=Max("id"))["m"] or 0) + 1
+        base_offboarding_id = (EmployeeOffboarding.objects.aggregate(m=Max("id"))["m"] or 0) + 1
+
+        if Employee.objects.filter(employee_code__startswith=f"{prefix}-").exists():
+            raise CommandError(
+                f"Employees with prefix '{prefix}-' already exist, use another --prefix"
+            )
+
+        department_ids = {
+            name: department_lookup.id_for(name, create=True) for name in DEPARTMENT_NAMES
+        }
+        location_ids = [location_lookup.id_for(name, create=True) for name in LOCATIONS]
+
+        # per-index tree state (compact arrays keep a million rows cheap)
+        depths = array("B", bytes(count))
+        departments = array("B", bytes(count))
+
+        today = date.today()
+        started = time.monotonic()
+        next_offboarding_id = base_offboarding_id
+        totals = {"employees": 0, "offboardings": 0, "checklist": 0, "documents": 0}
+
+        for start in range(0, count, batch_size):
+            end = min(start + batch_size, count)
+            employees, offboardings, checklist, documents = [], [], [], []
+
+            for i in range(start, end):
+                emp_id = base_id + i
+
+                if i == 0:
+                    manager_id = None
+                    depth = 0
+                    dept_idx = 0
+                else:
+                    parent = (i - 1) // fanout
+                    manager_id = base_id + parent
+                    depth = min(depths[parent] + 1, 255)
+                    # each direct report of the CEO heads a department,
+                    # everyone below inherits it
+                    if depth == 1:
+                        dept_idx = (i - 1) % len(DEPARTMENT_NAMES)
+                    else:
+                        dept_idx = departments[parent]
+                depths[i] = depth
+                departments[i] = dept_idx
+
+                department = DEPARTMENT_NAMES[dept_idx]
+                titles = DEPARTMENTS[department]
+                designation = "CEO" if depth == 0 else titles[min(depth - 1, len(titles) - 1)]
+
+                band = CTC_BANDS[min(depth, len(CTC_BANDS) - 1)]
+                annual_ctc = round(band * rng.uniform(0.85, 1.25), -2)
+                basic_pay = round(annual_ctc * 0.5, -2)
+                allowances = round(annual_ctc * 0.35, -2)
+                bonus = annual_ctc - basic_pay - allowances
+
+                first_name = rng.choice(FIRST_NAMES)
+                last_name = rng.choice(LAST_NAMES)
+                shift, timing = SHIFTS[0] if rng.random() < 0.8 else rng.choice(SHIFTS[1:])
+                joined = today - timedelta(days=rng.randint(30, 15 * 365))
+
+                status_roll = rng.random()
+                if status_roll < 0.9:
+                    status = "ACTIVE"
+                elif status_roll < 0.95:
+                    status = "ON_LEAVE"
+                else:
+                    status = "INACTIVE"
+
+                employees.append(Employee(
+                    id=emp_id,
+                    employee_code=f"{prefix}-{emp_id:07d}",
+                    first_name=first_name,
+                    last_name=last_name,
+                    email=f"{first_name}.{last_name}.{emp_id}@example.com".lower(),
+                    gender=rng.choice(("MALE", "FEMALE", "OTHER")),
+                    date_of_birth=joined - timedelta(days=rng.randint(21 * 365, 40 * 365)),
+                    department_id=department_ids[department],
+                    designation=designation,
+                    location_id=rng.choice(location_ids),
+                    status=status,
+                    phone=f"9{rng.randint(0, 999999999):09d}",
+                    date_of_joining=joined,
+                    reporting_manager_id=manager_id,
+                    employee_type="FULL_TIME" if rng.random() < 0.9 else "TEMPORARY",
+                    work_shift=shift,
+                    work_timing=timing,
+                    probation_status="COMPLETED" if (today - joined).days > 180 else "PENDING",
+                    annual_ctc=Decimal(annual_ctc),
+                    basic_pay=Decimal(basic_pay),
+                    allowances=Decimal(allowances),
+                    bonus=Decimal(bonus),
+                ))
+
+                if i > 0 and rng.random() < options["offboarding_ratio"]:
+                    resignation = today - timedelta(days=rng.randint(0, 60))
+                    offboardings.append(EmployeeOffboarding(
+                        id=next_offboarding_id,
+                        employee_id=emp_id,
+                        resignation_date=resignation,
+                        last_working_date=resignation + timedelta(days=rng.choice((30, 60, 90))),
+                        reason_for_exit=rng.choice(EXIT_REASONS),
+                    ))
+                    for item in CHECKLIST_ITEMS:
+                        checklist.append(OffboardingChecklist(
+                            offboarding_id=next_offboarding_id,
+                            item=item,
+                            status="SUBMITTED" if rng.random() < 0.4 else "PENDING",
+                        ))
+                    next_offboarding_id += 1
+
+                if rng.random() < options["document_ratio"]:
+                    for doc_type in rng.sample(DOCUMENT_TYPES, rng.randint(1, len(DOCUMENT_TYPES))):
+                        documents.append(EmployeeDocument(
+                            employee_id=emp_id,
+                            document_type=doc_type,
+                            file=f"employee_documents/seed/{prefix}-{emp_id:07d}_{doc_type.lower()}.pdf",
+                        ))
+
+            with transaction.atomic():
+                seq = next_change_seq()
+                for employee in employees:
+                    employee.change_seq = seq
+                Employee.objects.bulk_create(employees, batch_size=batch_size)
+                EmployeeOffboarding.objects.bulk_create(offboardings, batch_size=batch_size)
+                OffboardingChecklist.objects.bulk_create(checklist, batch_size=batch_size)
+                EmployeeDocument.objects.bulk_create(documents, batch_size=batch_size)
+
+            totals["employees"] += len(employees)
+            totals["offboardings"] += len(offboardings)
+            totals["checklist"] += len(checklist)
+            totals["documents"] += len(documents)
+
+            self.stdout.write(
+                f"  {end}/{count} employees ({time.monotonic() - started:.1f}s)"
+            )
+
+        # explicit ids leave Postgres sequences behind, move them forward
+        sequence_sql = connection.ops.sequence_reset_sql(
+            no_style(), [Employee, EmployeeOffboarding]
+        )
+        if sequence_sql:
+            with connection.cursor() as cursor:
+                for sql in sequence_sql:
+                    cursor.execute(sql)
+
+        # bulk_create skips signals, bring the hierarchy up to date by hand
+        rebuild_closure()
+        bump_version(HIERARCHY, SETTLEMENT)
+        invalidate_all_employees()
+        invalidate_headcount()
+        invalidate_salaries()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {totals['employees']} employees, {totals['offboardings']} offboardings, "
+            f"{totals['checklist']} checklist items and {totals['documents']} documents "
+            f"in {time.monotonic() - started:.1f}s"
+        ))
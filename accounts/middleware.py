@@ -0,0 +1,120 @@
+# accounts/middleware.py
+import brotli
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+
+# bodies smaller than this are sent as they are
+DEFAULT_MIN_SIZE = 1024
+
+# already compressed, or must reach the client unbuffered
+DEFAULT_EXCLUDED_TYPES = (
+    "text/event-stream",
+    "image/",
+    "application/pdf",
+    "application/zip",
+    "application/gzip",
+)
+
+BROTLI_QUALITY = 5
+GZIP_RANDOM_BYTES = 100  # same BREACH padding as Django's GZipMiddleware
+
+
+def _accepted_encodings(header):
+    """{"gzip": 1.0, "br": 0.8, ...} from an Accept-Encoding header."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(header):
+    accepted = _accepted_encodings(header)
+    candidates = [
+        (accepted.get(coding, accepted.get("*", 0.0)), preference, coding)
+        for preference, coding in enumerate(("gzip", "br"))
+    ]
+    q, _, coding = max(candidates)
+    return coding if q > 0 else None
+
+
+def _brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Brotli or gzip, whichever the client prefers (brotli on a tie), for
+    responses above COMPRESSION_MIN_SIZE bytes. Sync streaming responses
+    (CSV / NDJSON exports) are compressed on the fly; event streams, files
+    and already encoded responses pass through untouched.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, "COMPRESSION_MIN_SIZE", DEFAULT_MIN_SIZE)
+        self.excluded_types = tuple(
+            getattr(settings, "COMPRESSION_EXCLUDED_TYPES", DEFAULT_EXCLUDED_TYPES)
+        )
+
+    def _skip(self, response):
+        if response.has_header("Content-Encoding") or isinstance(response, FileResponse):
+            return True
+        if response.get("Content-Type", "").startswith(self.excluded_types):
+            return True
+        if response.streaming:
+            return response.is_async
+        return len(response.content) < self.min_size
+
+    def process_response(self, request, response):
+        if self._skip(response):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if encoding == "br":
+                response.streaming_content = _brotli_sequence(response.streaming_content)
+            else:
+                response.streaming_content = compress_sequence(
+                    response.streaming_content, max_random_bytes=GZIP_RANDOM_BYTES
+                )
+            del response.headers["Content-Length"]
+        else:
+            if encoding == "br":
+                compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
+            else:
+                compressed = compress_string(
+                    response.content, max_random_bytes=GZIP_RANDOM_BYTES
+                )
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.9 on 2026-10-19 10:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_hierarchy(apps, schema_editor):
+    Employee = apps.get_model("accounts", "Employee")
+    EmployeeHierarchy = apps.get_model("accounts", "EmployeeHierarchy")
+    qn = schema_editor.connection.ops.quote_name
+    closure = qn(EmployeeHierarchy._meta.db_table)
+    employee = qn(Employee._meta.db_table)
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {closure} (ancestor_id, descendant_id, depth) "
+            f"SELECT id, id, 0 FROM {employee}"
+        )
+        depth = 0
+        while True:
+            cursor.execute(f"""
+                INSERT INTO {closure} (ancestor_id, descendant_id, depth)
+                SELECT c.ancestor_id, e.id, c.depth + 1
+                FROM {closure} c
+                JOIN {employee} e ON e.reporting_manager_id = c.descendant_id
+                WHERE c.depth = %s
+                  AND NOT EXISTS (
+                      SELECT 1 FROM {closure} x
+                      WHERE x.ancestor_id = c.ancestor_id AND x.descendant_id = e.id
+                  )
+            """, [depth])
+            if not cursor.rowcount:
+                break
+            depth += 1
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0016_employee_allowances_employee_annual_ctc_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeHierarchy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='accounts.employee')),
+                ('descendant', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='accounts.employee')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='hierarchy_desc_depth_idx')],
+                'unique_together': {('ancestor', 'descendant')},
+            },
+        ),
+        migrations.RunPython(populate_hierarchy, migrations.RunPython.noop),
+    ]
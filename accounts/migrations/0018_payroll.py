@@ -0,0 +1,48 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0017_employeehierarchy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField(help_text='First day of the payroll month')),
+                ('status', models.CharField(choices=[('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='RUNNING', max_length=20)),
+                ('employee_count', models.PositiveIntegerField(default=0)),
+                ('recomputed_count', models.PositiveIntegerField(default=0)),
+                ('total_gross', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('total_net', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('previous_run', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='next_runs', to='accounts.payrollrun')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PayrollResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('basic', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('allowances', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('bonus', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('gross', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('provident_fund', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('professional_tax', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('net', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('employee_updated_at', models.DateTimeField()),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payroll_results', to='accounts.employee')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='accounts.payrollrun')),
+            ],
+            options={
+                'unique_together': {('run', 'employee')},
+            },
+        ),
+    ]
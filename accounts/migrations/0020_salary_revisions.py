@@ -0,0 +1,48 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0019_change_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalaryRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('criteria', models.JSONField(default=dict)),
+                ('rules', models.JSONField(default=dict, help_text='Rules and default_percent as sent')),
+                ('fields', models.JSONField(default=list)),
+                ('employee_count', models.PositiveIntegerField(default=0)),
+                ('annual_ctc_delta', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='salary_revisions', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SalaryRevisionEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('percent', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('old_annual_ctc', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('new_annual_ctc', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('old_basic_pay', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('new_basic_pay', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('old_allowances', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('new_allowances', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('old_bonus', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('new_bonus', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='salary_revisions', to='accounts.employee')),
+                ('revision', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='accounts.salaryrevision')),
+            ],
+            options={
+                'unique_together': {('revision', 'employee')},
+            },
+        ),
+    ]
@@ -0,0 +1,129 @@
+from collections import Counter, defaultdict
+
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+DIMENSIONS = [("department", "Department"), ("location", "Location")]
+
+
+def canonical_name(name):
+    return " ".join((name or "").split())
+
+
+def to_dimension_tables(apps, schema_editor):
+    """
+    One row per distinct name, compared case-insensitively with whitespace
+    collapsed. The most used spelling becomes the canonical one.
+    """
+    Employee = apps.get_model("accounts", "Employee")
+
+    for field, model_name in DIMENSIONS:
+        Dimension = apps.get_model("accounts", model_name)
+
+        spellings = defaultdict(Counter)
+        raw_values = defaultdict(set)
+        for value, count in (
+            Employee.objects.order_by().values_list(field).annotate(n=models.Count("id"))
+        ):
+            name = canonical_name(value)
+            if name:
+                spellings[name.lower()][name] += count
+                raw_values[name.lower()].add(value)
+
+        for key, counter in spellings.items():
+            top = max(counter.values())
+            name = min(spelling for spelling, n in counter.items() if n == top)
+            dimension = Dimension.objects.create(name=name)
+            Employee.objects.filter(**{f"{field}__in": raw_values[key]}).update(
+                **{f"{field}_ref": dimension}
+            )
+
+
+def to_names(apps, schema_editor):
+    Employee = apps.get_model("accounts", "Employee")
+    for field, model_name in DIMENSIONS:
+        Dimension = apps.get_model("accounts", model_name)
+        for dimension in Dimension.objects.all():
+            Employee.objects.filter(**{f"{field}_ref": dimension}).update(**{field: dimension.name})
+    Employee.objects.filter(department__isnull=True).update(department="")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0021_cache_invalidation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Department',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+            ],
+            options={
+                'ordering': ['name'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='department_name_ci_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+            ],
+            options={
+                'ordering': ['name'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='location_name_ci_unique')],
+            },
+        ),
+        # nullable while both columns exist so the reverse direction can refill it
+        migrations.AlterField(
+            model_name='employee',
+            name='department',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='department_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.department'),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='location_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.RunPython(to_dimension_tables, to_names),
+        migrations.RemoveField(
+            model_name='employee',
+            name='department',
+        ),
+        migrations.RemoveField(
+            model_name='employee',
+            name='location',
+        ),
+        migrations.RenameField(
+            model_name='employee',
+            old_name='department_ref',
+            new_name='department',
+        ),
+        migrations.RenameField(
+            model_name='employee',
+            old_name='location_ref',
+            new_name='location',
+        ),
+        migrations.AlterField(
+            model_name='employee',
+            name='department',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='employees', to='accounts.department'),
+        ),
+        migrations.AlterField(
+            model_name='employee',
+            name='location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='employees', to='accounts.location'),
+        ),
+    ]
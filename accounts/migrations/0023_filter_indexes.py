@@ -0,0 +1,85 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:33
+
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+# ?search= runs icontains, UPPER(column::text) LIKE UPPER('%term%') on
+# Postgres, which only trigram indexes can serve; other backends scan
+SEARCH_COLUMNS = ["first_name", "last_name", "employee_code", "email", "phone"]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "employee_{column}_trgm_idx" '
+            f'ON "accounts_employee" USING gin (UPPER("{column}") gin_trgm_ops)'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "employee_{column}_trgm_idx"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0022_department_location'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employee',
+            name='department',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='employees', to='accounts.department'),
+        ),
+        migrations.AlterField(
+            model_name='employee',
+            name='location',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='employees', to='accounts.location'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(django.db.models.functions.text.Upper('status'), models.F('employee_code'), name='employee_status_ci_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(models.F('department'), django.db.models.functions.text.Upper('status'), name='employee_dept_status_ci_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(models.F('location'), django.db.models.functions.text.Upper('status'), name='employee_loc_status_ci_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['status', 'department'], name='employee_status_dept_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='employee_email_ci_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(django.db.models.functions.text.Upper('first_name'), django.db.models.functions.text.Upper('last_name'), name='employee_name_ci_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeeoffboarding',
+            index=models.Index(fields=['last_working_date', 'id'], name='offboarding_lwd_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payrollrun',
+            index=models.Index(fields=['started_at', 'id'], name='payrollrun_started_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salaryrevision',
+            index=models.Index(fields=['created_at', 'id'], name='revision_created_id_idx'),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0023_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['date_of_joining'], name='employee_joined_idx'),
+        ),
+    ]
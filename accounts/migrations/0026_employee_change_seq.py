@@ -0,0 +1,41 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+def create_counter(apps, schema_editor):
+    # existing rows keep change_seq 0, a full sync walks them in id order
+    # and everything written from here on sorts after them
+    EmployeeChangeCounter = apps.get_model("accounts", "EmployeeChangeCounter")
+    EmployeeChangeCounter.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0025_delete_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeChangeCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='employee',
+            name='employee_updated_id_idx',
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='change_seq',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['change_seq', 'id'], name='employee_change_seq_idx'),
+        ),
+        migrations.RunPython(create_counter, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:05
+
+from django.db import migrations
+from django.db.models import Max
+
+
+# models.CHANGE_SEQUENCE
+CHANGE_SEQUENCE = "accounts_employee_change_seq"
+
+
+def create_sequence(apps, schema_editor):
+    # Employee.change_seq comes from nextval() from here on, starting past
+    # every value the counter row handed out
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Employee = apps.get_model("accounts", "Employee")
+    EmployeeChangeCounter = apps.get_model("accounts", "EmployeeChangeCounter")
+    last = max(
+        Employee.objects.aggregate(seq=Max("change_seq"))["seq"] or 0,
+        EmployeeChangeCounter.objects.aggregate(value=Max("value"))["value"] or 0,
+    )
+    schema_editor.execute(f"CREATE SEQUENCE {CHANGE_SEQUENCE} START WITH {last + 1}")
+
+
+def drop_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP SEQUENCE {CHANGE_SEQUENCE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0026_employee_change_seq'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_sequence, drop_sequence),
+        migrations.DeleteModel(
+            name='EmployeeChangeCounter',
+        ),
+    ]
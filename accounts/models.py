@@ -58,7 +58,66 @@ class User(AbstractUser):
 # ==========================
 # EMPLOYEE MODEL (SANThOSH)
 # ==========================
-from django.db import models
+from django.db import connection, models
+from django.db.models import Max
+from django.db.models.functions import Lower, Upper
+from django.db.models.lookups import Exact
+
+
+# Postgres sequence behind Employee.change_seq, created in migration 0027
+CHANGE_SEQUENCE = "accounts_employee_change_seq"
+
+
+def next_change_seq():
+    """
+    Next change sequence value. On Postgres it is nextval() of
+    CHANGE_SEQUENCE, which never waits on other writers; values can then
+    commit out of order, the change feed holds back recent rows for that.
+    Other databases run one writer at a time and take the largest value + 1.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT nextval(%s)", [CHANGE_SEQUENCE])
+            return cursor.fetchone()[0]
+    return (Employee.objects.aggregate(seq=Max("change_seq"))["seq"] or 0) + 1
+
+
+class DimensionModel(models.Model):
+    """
+    Lookup table behind a repeated employee attribute. Names are stored
+    trimmed with single spaces and are unique regardless of case.
+    """
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        abstract = True
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class Department(DimensionModel):
+    class Meta(DimensionModel.Meta):
+        constraints = [
+            models.UniqueConstraint(Lower("name"), name="department_name_ci_unique"),
+        ]
+
+
+class Location(DimensionModel):
+    class Meta(DimensionModel.Meta):
+        constraints = [
+            models.UniqueConstraint(Lower("name"), name="location_name_ci_unique"),
+        ]
+
+
+def iexact(field, value):
+    """
+    Case-insensitive match written as UPPER(field) = UPPER(value), the
+    expression the *_ci indexes below are built on (__iexact compiles to
+    LIKE on SQLite and cannot use them).
+    """
+    return Exact(Upper(field), Upper(models.Value(value)))
 
 
 class Employee(models.Model):
@@ -109,9 +168,22 @@ class Employee(models.Model):
         blank=True
     )
 
-    department = models.CharField(max_length=100)
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.PROTECT,
+        null=True,
+        related_name="employees",
+        db_index=False  # covered by employee_dept_status_ci_idx
+    )
     designation = models.CharField(max_length=100)
-    location = models.CharField(max_length=100, blank=True, null=True)
+    location = models.ForeignKey(
+        Location,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="employees",
+        db_index=False  # covered by employee_loc_status_ci_idx
+    )
 
     status = models.CharField(
         max_length=20,
@@ -130,6 +202,8 @@ class Employee(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # change feed position, see next_change_seq(); every write path sets it
+    change_seq = models.BigIntegerField(default=0)
      # 🔥 NEW HR FIELDS
     reporting_manager = models.ForeignKey(
         "self",
@@ -168,8 +242,110 @@ class Employee(models.Model):
     allowances = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     bonus = models.DecimalField(max_digits=12, decimal_places=2, default=0)
 
+    class Meta:
+        indexes = [
+            # keyset pagination of the change feed
+            models.Index(fields=["change_seq", "id"], name="employee_change_seq_idx"),
+            # list filters, alone and combined, in the list's employee_code order
+            models.Index(Upper("status"), "employee_code", name="employee_status_ci_code_idx"),
+            models.Index("department", Upper("status"), name="employee_dept_status_ci_idx"),
+            models.Index("location", Upper("status"), name="employee_loc_status_ci_idx"),
+            # stats counts and the status facet
+            models.Index(fields=["status", "department"], name="employee_status_dept_idx"),
+            # user -> employee scope lookup and reporting manager names
+            models.Index(Upper("email"), name="employee_email_ci_idx"),
+            models.Index(Upper("first_name"), Upper("last_name"), name="employee_name_ci_idx"),
+            # joins since the last memoized headcount period
+            models.Index(fields=["date_of_joining"], name="employee_joined_idx"),
+            # ?search= trigram indexes are Postgres only, see migration 0023_filter_indexes
+        ]
+
     def __str__(self):
         return self.employee_code
+
+    # -------------------------
+    # Change tracking
+    # -------------------------
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.change_seq = next_change_seq()
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "change_seq"}
+        super().save(*args, **kwargs)
+        # post_save receivers have seen the diff, start tracking from here
+        self._loaded_values = {
+            f.attname: self.__dict__.get(f.attname, models.DEFERRED)
+            for f in self._meta.concrete_fields
+        }
+
+    def changed_fields(self):
+        """
+        Attnames changed since the row was loaded or last saved.
+        Returns None for instances that were never loaded (new rows).
+        """
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is None:
+            return None
+        return {
+            name for name, value in loaded.items()
+            if value is not models.DEFERRED
+            and self.__dict__.get(name, value) != value
+        }
+# ============================
+# EMPLOYEE HIERARCHY (CLOSURE TABLE)
+# ============================
+
+class EmployeeHierarchy(models.Model):
+    """
+    One row per (ancestor, descendant) pair in the reporting tree, including
+    the (employee, employee, 0) self row. Maintained by accounts.hierarchy.
+    """
+    ancestor = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="descendant_links",
+        db_index=False  # covered by the unique index below
+    )
+    descendant = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="ancestor_links",
+        db_index=False  # covered by hierarchy_desc_depth_idx
+    )
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ("ancestor", "descendant")
+        indexes = [
+            models.Index(fields=["descendant", "depth"], name="hierarchy_desc_depth_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
+
+
+# ============================
+# EMPLOYEE TOMBSTONES (CHANGE FEED)
+# ============================
+
+class EmployeeTombstone(models.Model):
+    """
+    Written when an employee is deleted so sync clients can drop it.
+    The autoincrement id is the feed sequence.
+    """
+    employee_id = models.PositiveIntegerField()
+    employee_code = models.CharField(max_length=50)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.employee_code} deleted"
+
+
 # ============================
 # EMPLOYEE OFFBOARDING
 # ============================
@@ -186,6 +362,12 @@ class EmployeeOffboarding(models.Model):
     additional_notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # dashboard date range filter and order
+            models.Index(fields=["last_working_date", "id"], name="offboarding_lwd_id_idx"),
+        ]
+
     def __str__(self):
         return f"Offboarding - {self.employee.employee_code}"
 
@@ -244,3 +426,185 @@ class EmployeeDocument(models.Model):
 
     def __str__(self):
         return f"{self.employee_id} - {self.document_type}"
+
+
+# ============================
+# PAYROLL
+# ============================
+
+class PayrollRun(models.Model):
+    STATUS_CHOICES = [
+        ("RUNNING", "Running"),
+        ("COMPLETED", "Completed"),
+        ("FAILED", "Failed"),
+    ]
+
+    period = models.DateField(help_text="First day of the payroll month")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="RUNNING")
+    previous_run = models.ForeignKey(
+        "self",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="next_runs"
+    )
+
+    employee_count = models.PositiveIntegerField(default=0)
+    recomputed_count = models.PositiveIntegerField(default=0)
+    total_gross = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    total_net = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # run list, newest first
+            models.Index(fields=["started_at", "id"], name="payrollrun_started_id_idx"),
+        ]
+
+    def __str__(self):
+        return f"Payroll {self.period:%Y-%m} ({self.status})"
+
+
+class PayrollResult(models.Model):
+    run = models.ForeignKey(
+        PayrollRun,
+        on_delete=models.CASCADE,
+        related_name="results"
+    )
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="payroll_results"
+    )
+
+    # monthly figures
+    basic = models.DecimalField(max_digits=12, decimal_places=2)
+    allowances = models.DecimalField(max_digits=12, decimal_places=2)
+    bonus = models.DecimalField(max_digits=12, decimal_places=2)
+    gross = models.DecimalField(max_digits=12, decimal_places=2)
+    provident_fund = models.DecimalField(max_digits=12, decimal_places=2)
+    professional_tax = models.DecimalField(max_digits=12, decimal_places=2)
+    net = models.DecimalField(max_digits=12, decimal_places=2)
+
+    # Employee.updated_at the figures were computed from
+    employee_updated_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("run", "employee")
+
+    def __str__(self):
+        return f"{self.run_id} - {self.employee_id}"
+
+
+# ============================
+# SALARY REVISIONS
+# ============================
+
+class SalaryRevision(models.Model):
+    """One mass revision: the filters and rules used and what it changed."""
+    created_by = models.ForeignKey(
+        User,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="salary_revisions"
+    )
+    criteria = models.JSONField(default=dict)
+    rules = models.JSONField(default=dict, help_text="Rules and default_percent as sent")
+    fields = models.JSONField(default=list)
+
+    employee_count = models.PositiveIntegerField(default=0)
+    annual_ctc_delta = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # revision history, newest first
+            models.Index(fields=["created_at", "id"], name="revision_created_id_idx"),
+        ]
+
+    def __str__(self):
+        return f"Salary revision {self.id} ({self.employee_count} employees)"
+
+
+class SalaryRevisionEntry(models.Model):
+    """Before / after salary of one employee in a revision."""
+    revision = models.ForeignKey(
+        SalaryRevision,
+        on_delete=models.CASCADE,
+        related_name="entries"
+    )
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="salary_revisions"
+    )
+    percent = models.DecimalField(max_digits=6, decimal_places=2)
+
+    old_annual_ctc = models.DecimalField(max_digits=12, decimal_places=2)
+    new_annual_ctc = models.DecimalField(max_digits=12, decimal_places=2)
+    old_basic_pay = models.DecimalField(max_digits=12, decimal_places=2)
+    new_basic_pay = models.DecimalField(max_digits=12, decimal_places=2)
+    old_allowances = models.DecimalField(max_digits=12, decimal_places=2)
+    new_allowances = models.DecimalField(max_digits=12, decimal_places=2)
+    old_bonus = models.DecimalField(max_digits=12, decimal_places=2)
+    new_bonus = models.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        unique_together = ("revision", "employee")
+
+    def __str__(self):
+        return f"{self.revision_id} - {self.employee_id}"
+
+
+# ============================
+# BULK DELETE JOBS
+# ============================
+
+class EmployeeDeleteJob(models.Model):
+    """
+    Progress of a background bulk delete, readable from every worker
+    process. A queued or running job whose heartbeat stops died with its
+    process and is resumed from `processed` (see accounts.deletion).
+    """
+    STATUS_CHOICES = [
+        ("QUEUED", "Queued"),
+        ("RUNNING", "Running"),
+        ("COMPLETED", "Completed"),
+        ("FAILED", "Failed"),
+    ]
+
+    job_id = models.CharField(max_length=32, unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="QUEUED")
+    employee_ids = models.JSONField(help_text="Sorted, deleted in this order")
+    total = models.PositiveIntegerField()
+    processed = models.PositiveIntegerField(default=0)
+    deleted_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    started_at = models.DateTimeField(auto_now_add=True)
+    heartbeat_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Delete job {self.job_id} ({self.status})"
+
+
+# ============================
+# CACHE INVALIDATION LOG
+# ============================
+
+class CacheInvalidation(models.Model):
+    """
+    One row per published cache version bump. Every worker process reads
+    the rows past the last id it applied, so invalidations reach caches
+    held by other processes and machines.
+    """
+    namespaces = models.JSONField()
+    origin = models.CharField(max_length=100)  # host:pid of the writer
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.id}: {', '.join(self.namespaces)}"
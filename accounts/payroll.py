@@ -0,0 +1,137 @@
+# accounts/payroll.py
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import Employee, PayrollRun, PayrollResult
+
+
+# ==========================
+# PAYROLL RULES (MONTHLY)
+# ==========================
+# Salary fields on Employee are annual amounts.
+PF_RATE = Decimal("0.12")            # employee provident fund share of basic
+PF_MONTHLY_CAP = Decimal("1800")     # 12% of the 15,000 statutory wage ceiling
+PROFESSIONAL_TAX = Decimal("200")
+
+# employees computed per chunk before the single bulk insert
+COMPUTE_CHUNK_SIZE = 5000
+
+CENT = Decimal("0.01")
+
+RESULT_FIGURES = (
+    "basic",
+    "allowances",
+    "bonus",
+    "gross",
+    "provident_fund",
+    "professional_tax",
+    "net",
+)
+
+
+def _money(value):
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def compute_monthly(basic_pay, allowances, bonus):
+    basic = _money((basic_pay or Decimal(0)) / 12)
+    allowances = _money((allowances or Decimal(0)) / 12)
+    bonus = _money((bonus or Decimal(0)) / 12)
+    gross = basic + allowances + bonus
+    provident_fund = min(_money(basic * PF_RATE), PF_MONTHLY_CAP)
+    professional_tax = PROFESSIONAL_TAX if gross > 0 else Decimal(0)
+    return {
+        "basic": basic,
+        "allowances": allowances,
+        "bonus": bonus,
+        "gross": gross,
+        "provident_fund": provident_fund,
+        "professional_tax": professional_tax,
+        "net": gross - provident_fund - professional_tax,
+    }
+
+
+def payable_employees():
+    return Employee.objects.exclude(status="INACTIVE")
+
+
+def _carry_forward(run, previous_run):
+    """
+    Copy results of employees unchanged since previous_run in one
+    INSERT ... SELECT. Returns the number of rows copied.
+    """
+    qn = connection.ops.quote_name
+    result_table = qn(PayrollResult._meta.db_table)
+    employee_table = qn(Employee._meta.db_table)
+    figures = ", ".join(RESULT_FIGURES)
+    source_figures = ", ".join(f"r.{name}" for name in RESULT_FIGURES)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            INSERT INTO {result_table} (run_id, employee_id, {figures}, employee_updated_at)
+            SELECT %s, r.employee_id, {source_figures}, r.employee_updated_at
+            FROM {result_table} r
+            JOIN {employee_table} e ON e.id = r.employee_id
+            WHERE r.run_id = %s
+              AND e.updated_at = r.employee_updated_at
+              AND e.status <> %s
+        """, [run.id, previous_run.id, "INACTIVE"])
+        return cursor.rowcount
+
+
+def run_payroll(period):
+    """
+    Create a payroll run for the month of `period`. Employees whose row has
+    not changed since the last completed run keep their previous figures;
+    everyone else is recomputed in chunks and written with one bulk insert.
+    """
+    period = period.replace(day=1)
+    previous_run = (
+        PayrollRun.objects
+        .filter(status="COMPLETED")
+        .order_by("-started_at", "-id")
+        .first()
+    )
+    run = PayrollRun.objects.create(period=period, previous_run=previous_run)
+
+    try:
+        with transaction.atomic():
+            carried = _carry_forward(run, previous_run) if previous_run else 0
+
+            pending = (
+                payable_employees()
+                .exclude(id__in=PayrollResult.objects.filter(run=run).values("employee_id"))
+                .values_list("id", "basic_pay", "allowances", "bonus", "updated_at")
+                .order_by("id")
+            )
+
+            results = []
+            for emp_id, basic_pay, allowances, bonus, updated_at in pending.iterator(
+                chunk_size=COMPUTE_CHUNK_SIZE
+            ):
+                results.append(PayrollResult(
+                    run=run,
+                    employee_id=emp_id,
+                    employee_updated_at=updated_at,
+                    **compute_monthly(basic_pay, allowances, bonus),
+                ))
+            PayrollResult.objects.bulk_create(results, batch_size=COMPUTE_CHUNK_SIZE)
+
+            totals = run.results.aggregate(gross=Sum("gross"), net=Sum("net"))
+            run.employee_count = carried + len(results)
+            run.recomputed_count = len(results)
+            run.total_gross = totals["gross"] or 0
+            run.total_net = totals["net"] or 0
+            run.status = "COMPLETED"
+            run.finished_at = timezone.now()
+            run.save()
+    except Exception:
+        run.status = "FAILED"
+        run.finished_at = timezone.now()
+        run.save(update_fields=["status", "finished_at"])
+        raise
+
+    return run
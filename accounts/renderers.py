@@ -0,0 +1,48 @@
+# accounts/renderers.py
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# DRF's own fallback for everything orjson / msgpack do not handle natively
+# (Decimal, lazy strings, querysets ...). Datetimes are passed through to it
+# as well so they keep DRF's format ("...Z", no forced microseconds).
+_drf_default = JSONEncoder().default
+
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Byte-for-byte compatible with DRF's compact JSONRenderer output,
+    encoded with orjson. Pretty-printed requests (?indent / browsable API)
+    fall back to the stock renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_drf_default, option=ORJSON_OPTIONS)
+
+        # same strict javascript subset as DRF
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Opt-in via Accept: application/msgpack (or ?format=msgpack)."""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=_drf_default, use_bin_type=True)
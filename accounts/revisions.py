@@ -0,0 +1,200 @@
+# accounts/revisions.py
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import (
+    Case, Count, DecimalField, F, OuterRef, Q, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Now, Round
+from django.utils import timezone
+
+from .dimensions import departments
+from .models import Employee, SalaryRevision, SalaryRevisionEntry, next_change_seq
+
+
+# salary columns a revision may raise, all annual amounts
+REVISABLE_FIELDS = ["annual_ctc", "basic_pay", "allowances", "bonus"]
+DEFAULT_REVISION_FIELDS = ["annual_ctc", "basic_pay", "allowances"]
+
+# rule keys an employee is matched on (designation stands in for the grade)
+RULE_KEYS = ["department", "designation"]
+
+CENT = Decimal("0.01")
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+PERCENT = DecimalField(max_digits=6, decimal_places=2)
+HUNDRED = Value(Decimal(100), output_field=PERCENT)
+
+
+def _rule_condition(key, value):
+    if key == "department":
+        # an unknown department matches nobody
+        return Q(department_id=departments.id_for(value) or 0)
+    return Q(**{f"{key}__iexact": value})
+
+
+def percent_expression(rules, default_percent=None):
+    """
+    CASE over the rules, first match wins: the percent an employee's salary
+    moves by, NULL when no rule applies and there is no default.
+    """
+    whens = []
+    for rule in rules:
+        condition = Q()
+        for key in RULE_KEYS:
+            if rule.get(key):
+                condition &= _rule_condition(key, rule[key])
+        whens.append(When(condition, then=Value(rule["percent"], output_field=PERCENT)))
+
+    default = Value(default_percent, output_field=PERCENT) if default_percent is not None else None
+    return Case(*whens, default=default, output_field=PERCENT)
+
+
+def revised(field, percent):
+    """New value of `field`, rounded to paise."""
+    return Round(
+        F(field) * (HUNDRED + percent) / HUNDRED,
+        2,
+        output_field=MONEY,
+    )
+
+
+def revision_queryset(queryset, rules, default_percent=None):
+    """Employees the rules apply to, annotated with their percent."""
+    return (
+        queryset
+        .exclude(status="INACTIVE")
+        .annotate(revision_percent=percent_expression(rules, default_percent))
+        .filter(revision_percent__isnull=False)
+    )
+
+
+def preview_revision(queryset, fields):
+    """Impacted headcount and annual / monthly deltas, by aggregation only."""
+    deltas = {
+        f"{field}_delta": Sum(revised(field, F("revision_percent")) - F(field), output_field=MONEY)
+        for field in fields
+    }
+    totals = queryset.aggregate(employee_count=Count("id"), **deltas)
+    by_department = sorted(
+        (
+            {"department": departments.name(row.pop("department_id")), **row}
+            for row in queryset.order_by()
+            .values("department_id")
+            .annotate(employee_count=Count("id"), **deltas)
+        ),
+        key=lambda row: row["department"] or "",
+    )
+
+    def clean(row):
+        for field in fields:
+            row[f"{field}_delta"] = (row[f"{field}_delta"] or Decimal(0)).quantize(CENT)
+        return row
+
+    totals = clean(totals)
+    totals["monthly_payroll_delta"] = (
+        sum(totals[f"{field}_delta"] for field in fields if field != "annual_ctc") / 12
+    ).quantize(CENT)
+    totals["by_department"] = [clean(row) for row in by_department]
+    return totals
+
+
+def _insert_entries(revision, queryset, fields):
+    """Snapshot before / after values with one INSERT ... SELECT."""
+    columns = {
+        "revision_id": Value(revision.id),
+        "employee_id": F("id"),
+        "percent": F("revision_percent"),
+    }
+    for field in REVISABLE_FIELDS:
+        columns[f"old_{field}"] = F(field)
+        columns[f"new_{field}"] = revised(field, F("revision_percent")) if field in fields else F(field)
+
+    select = queryset.order_by().annotate(
+        **{f"rev_{name}": expression for name, expression in columns.items()}
+    ).values(*[f"rev_{name}" for name in columns])
+    sql, params = select.query.sql_with_params()
+
+    qn = connection.ops.quote_name
+    target = ", ".join(qn(name) for name in columns)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {qn(SalaryRevisionEntry._meta.db_table)} ({target}) {sql}",
+            params,
+        )
+        return cursor.rowcount
+
+
+def _joined_update_supported():
+    if connection.vendor == "postgresql":
+        return True
+    # UPDATE ... FROM arrived in SQLite 3.33
+    return connection.vendor == "sqlite" and connection.Database.sqlite_version_info >= (3, 33)
+
+
+def _update_from_entries(revision, fields, change_seq):
+    """
+    Move the salaries with one UPDATE ... FROM joined to the entries, the
+    employee rows are matched once instead of once per revised column.
+    """
+    qn = connection.ops.quote_name
+    column = {
+        name: qn(Employee._meta.get_field(name).column)
+        for name in [*fields, "updated_at", "change_seq"]
+    }
+    assignments = ", ".join(f"{column[field]} = r.{qn(f'new_{field}')}" for field in fields)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {qn(Employee._meta.db_table)} AS e "
+            f"SET {assignments}, {column['updated_at']} = %s, {column['change_seq']} = %s "
+            f"FROM {qn(SalaryRevisionEntry._meta.db_table)} r "
+            f"WHERE r.revision_id = %s AND r.employee_id = e.id",
+            [
+                connection.ops.adapt_datetimefield_value(timezone.now()),
+                change_seq,
+                revision.id,
+            ],
+        )
+
+
+def apply_revision(queryset, fields, user=None, criteria=None, rules=None):
+    """
+    Record every impacted employee's before / after salary, then move the
+    salaries with one UPDATE that reads the new values from those entries
+    (joined where the database has UPDATE ... FROM, one subquery per column
+    elsewhere), so the audit trail and the employee rows cannot disagree.
+    """
+    with transaction.atomic():
+        revision = SalaryRevision.objects.create(
+            created_by=user if user and user.is_authenticated else None,
+            criteria=criteria or {},
+            rules=rules or {},
+            fields=fields,
+        )
+        count = _insert_entries(revision, queryset, fields)
+
+        seq = next_change_seq()
+        entries = SalaryRevisionEntry.objects.filter(revision=revision)
+        if _joined_update_supported():
+            _update_from_entries(revision, fields, seq)
+        else:
+            def new_value(field):
+                return Subquery(
+                    entries.filter(employee_id=OuterRef("pk")).values(f"new_{field}")[:1]
+                )
+
+            Employee.objects.filter(
+                id__in=entries.values("employee_id")
+            ).update(
+                updated_at=Now(),
+                change_seq=seq,
+                **{field: new_value(field) for field in fields},
+            )
+
+        delta = entries.aggregate(
+            delta=Sum(F("new_annual_ctc") - F("old_annual_ctc"), output_field=MONEY)
+        )["delta"]
+        revision.employee_count = count
+        revision.annual_ctc_delta = delta or 0
+        revision.save(update_fields=["employee_count", "annual_ctc_delta"])
+
+    return revision
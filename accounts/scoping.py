@@ -0,0 +1,55 @@
+# accounts/scoping.py
+from .models import Employee, EmployeeHierarchy, iexact
+
+
+# sentinel: the user may see every employee
+UNRESTRICTED = None
+
+# the user is not linked to an employee record, nothing is visible
+NO_ACCESS = 0
+
+
+def get_manager_scope(user):
+    """
+    Employee id whose reportee tree the user may see, UNRESTRICTED for
+    admins, NO_ACCESS for anonymous users and users without an employee.
+    Users are matched to employees by email; the lookup is kept on the
+    user object for the rest of the request.
+    """
+    if not user or not user.is_authenticated:
+        return NO_ACCESS
+    if user.is_superuser or user.is_staff or getattr(user, "is_super_admin", False):
+        return UNRESTRICTED
+
+    if not hasattr(user, "_employee_scope"):
+        employee_id = (
+            Employee.objects
+            .filter(iexact("email", user.email))
+            .values_list("id", flat=True)
+            .first()
+        )
+        user._employee_scope = employee_id or NO_ACCESS
+    return user._employee_scope
+
+
+class EmployeeScopeMixin:
+    """
+    Restricts employee reads and writes to the requesting manager's
+    reportee tree (including themselves) using the hierarchy closure table: one indexed
+    join for lists and one indexed lookup for single employees.
+    """
+
+    def scope_employees(self, queryset, prefix=""):
+        manager_id = get_manager_scope(self.request.user)
+        if manager_id is UNRESTRICTED:
+            return queryset
+        return queryset.filter(**{f"{prefix}ancestor_links__ancestor_id": manager_id})
+
+    def in_scope(self, employee_id):
+        manager_id = get_manager_scope(self.request.user)
+        if manager_id is UNRESTRICTED:
+            return True
+        return EmployeeHierarchy.objects.filter(
+            ancestor_id=manager_id,
+            descendant_id=employee_id
+        ).exists()
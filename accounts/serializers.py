@@ -44,11 +44,92 @@ class MessageResponseSerializer(serializers.Serializer):
 # Employee Module Serializer
 # ====================================
 from rest_framework import serializers
-from .models import Employee
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
+from .models import Employee, iexact
 from .models import EmployeeOffboarding, OffboardingChecklist,EmployeeDocument
-
-
-class EmployeeSerializer(serializers.ModelSerializer):
+from .hierarchy import creates_cycle
+from django.db import transaction
+from .dimensions import (
+    NewDimension, canonical_name, create_missing_dimensions, departments, locations,
+)
+
+CYCLE_ERROR = "Reporting manager cannot be the employee or one of their reportees"
+
+
+@extend_schema_field(OpenApiTypes.STR)
+class DimensionField(serializers.Field):
+    """
+    A department / location by name. Output maps the id column through the
+    in-memory lookup (no join); input accepts any spelling of an existing
+    name. Names that are new come out as NewDimension, their rows are only
+    created when the employee is saved (DimensionSaveMixin).
+    """
+    default_error_messages = {
+        "invalid": "Not a valid string.",
+        "blank": "This field may not be blank.",
+        "max_length": "Ensure this field has no more than 100 characters.",
+    }
+
+    def __init__(self, lookup, **kwargs):
+        self.lookup = lookup
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return self.lookup.name(value)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, (str, int)) or isinstance(data, bool):
+            self.fail("invalid")
+        name = canonical_name(data)
+        if name is None:
+            if self.allow_null:
+                return None
+            self.fail("blank")
+        if len(name) > 100:
+            self.fail("max_length")
+        pk = self.lookup.id_for(name)
+        return pk if pk is not None else NewDimension(name)
+
+
+class DimensionSaveMixin:
+    """Creates the rows of new department / location names in the save's transaction."""
+
+    def save(self, **kwargs):
+        with transaction.atomic():
+            create_missing_dimensions(self.validated_data)
+            return super().save(**kwargs)
+
+
+def department_field(**kwargs):
+    return DimensionField(departments, source="department_id", **kwargs)
+
+
+def location_field(**kwargs):
+    kwargs.setdefault("required", False)
+    return DimensionField(locations, source="location_id", allow_null=True, **kwargs)
+
+
+class SparseFieldsMixin:
+    """
+    Accepts `fields` / `exclude` keyword arguments that narrow the output
+    to a subset of the declared fields (?fields= / ?exclude=).
+    """
+
+    def __init__(self, *args, fields=None, exclude=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in exclude or ():
+            self.fields.pop(name, None)
+
+    @classmethod
+    def readable_fields(cls):
+        return [name for name, field in cls().fields.items() if not field.write_only]
+
+
+class EmployeeSerializer(DimensionSaveMixin, SparseFieldsMixin, serializers.ModelSerializer):
     # INPUT: manager name
     reporting_manager = serializers.CharField(
         write_only=True,
@@ -60,9 +141,13 @@ class EmployeeSerializer(serializers.ModelSerializer):
     # OUTPUT: manager name
     reporting_manager_name = serializers.SerializerMethodField(read_only=True)
 
+    department = department_field()
+    location = location_field()
+
     class Meta:
         model = Employee
-        fields = "__all__"
+        # change feed bookkeeping, set by every write path itself
+        exclude = ["change_seq"]
 
     # -------------------------
     # Helpers
@@ -81,9 +166,9 @@ class EmployeeSerializer(serializers.ModelSerializer):
         first_name = parts[0]
         last_name = " ".join(parts[1:]) if len(parts) > 1 else None
 
-        qs = Employee.objects.filter(first_name__iexact=first_name)
+        qs = Employee.objects.filter(iexact("first_name", first_name))
         if last_name:
-            qs = qs.filter(last_name__iexact=last_name)
+            qs = qs.filter(iexact("last_name", last_name))
 
         return qs.first()
 
@@ -119,6 +204,10 @@ class EmployeeSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError({
                     "reporting_manager": "Reporting manager not found"
                 })
+            if manager and creates_cycle(instance.pk, manager.pk):
+                raise serializers.ValidationError({
+                    "reporting_manager": CYCLE_ERROR
+                })
             instance.reporting_manager = manager
 
         instance.save()
@@ -129,8 +218,9 @@ class EmployeeSerializer(serializers.ModelSerializer):
 # EMPLOYEE TAB SERIALIZERS
 # =================================================
 
-class EmployeeOverviewSerializer(serializers.ModelSerializer):
+class EmployeeOverviewSerializer(DimensionSaveMixin, serializers.ModelSerializer):
     full_name = serializers.CharField(write_only=True, required=False)
+    location = location_field()
 
     class Meta:
         model = Employee
@@ -160,7 +250,7 @@ class EmployeeOverviewSerializer(serializers.ModelSerializer):
 
         return super().update(instance, validated_data)
 
-class EmployeeJobSerializer(serializers.ModelSerializer):
+class EmployeeJobSerializer(DimensionSaveMixin, serializers.ModelSerializer):
     # 🔥 INPUT (STRING)
     reporting_manager_name = serializers.CharField(
         write_only=True,
@@ -168,6 +258,8 @@ class EmployeeJobSerializer(serializers.ModelSerializer):
         allow_blank=True,
         help_text="Full name of reporting manager"
     )
+    department = department_field()
+    location = location_field()
 
     class Meta:
         model = Employee
@@ -205,15 +297,19 @@ class EmployeeJobSerializer(serializers.ModelSerializer):
             first_name = parts[0]
             last_name = parts[1] if len(parts) > 1 else None
 
-            qs = Employee.objects.filter(first_name__iexact=first_name)
+            qs = Employee.objects.filter(iexact("first_name", first_name))
             if last_name:
-                qs = qs.filter(last_name__iexact=last_name)
+                qs = qs.filter(iexact("last_name", last_name))
 
             manager = qs.first()
             if not manager:
                 raise serializers.ValidationError({
                     "reporting_manager_name": "Reporting manager not found"
                 })
+            if creates_cycle(instance.pk, manager.pk):
+                raise serializers.ValidationError({
+                    "reporting_manager_name": CYCLE_ERROR
+                })
 
             instance.reporting_manager = manager
 
@@ -263,6 +359,155 @@ class EmployeeOffboardingSerializer(serializers.ModelSerializer):
             "created_at",
             "checklist",
         ]
+
+
+class EmployeeSummarySerializer(serializers.ModelSerializer):
+    name = serializers.SerializerMethodField()
+    department = department_field(read_only=True)
+
+    class Meta:
+        model = Employee
+        fields = ["id", "employee_code", "name", "department", "designation", "status"]
+
+    def get_name(self, obj):
+        return f"{obj.first_name} {obj.last_name or ''}".strip()
+
+
+class OffboardingDashboardSerializer(serializers.ModelSerializer):
+    employee = EmployeeSummarySerializer(read_only=True)
+    checklist = OffboardingChecklistSerializer(many=True, read_only=True)
+    total_items = serializers.IntegerField(read_only=True)
+    submitted_items = serializers.IntegerField(read_only=True)
+    pending_items = serializers.IntegerField(read_only=True)
+    completion_percent = serializers.SerializerMethodField()
+
+    class Meta:
+        model = EmployeeOffboarding
+        fields = [
+            "id",
+            "employee",
+            "resignation_date",
+            "last_working_date",
+            "reason_for_exit",
+            "total_items",
+            "submitted_items",
+            "pending_items",
+            "completion_percent",
+            "checklist",
+        ]
+
+    def get_completion_percent(self, obj):
+        return round(obj.completion_percent, 1)
+
+
+class OffboardingBulkItemSerializer(serializers.Serializer):
+    employee_id = serializers.IntegerField()
+    resignation_date = serializers.DateField()
+    last_working_date = serializers.DateField()
+    reason_for_exit = serializers.CharField(max_length=255)
+    additional_notes = serializers.CharField(required=False, allow_blank=True, default="")
+    checklist = serializers.DictField(
+        child=serializers.CharField(),
+        help_text="Checklist item -> PENDING | SUBMITTED"
+    )
+
+    def validate(self, attrs):
+        if attrs["last_working_date"] < attrs["resignation_date"]:
+            raise serializers.ValidationError({
+                "last_working_date": "Last working date cannot be before resignation date"
+            })
+        return attrs
+
+
+class OffboardingBulkSerializer(serializers.Serializer):
+    """Request body for bulk offboarding (schema only)."""
+    resignation_date = serializers.DateField(required=False)
+    last_working_date = serializers.DateField(required=False)
+    reason_for_exit = serializers.CharField(required=False)
+    additional_notes = serializers.CharField(required=False)
+    checklist = serializers.DictField(
+        child=serializers.CharField(),
+        required=False,
+        help_text="Shared checklist, used when an employee has none of their own"
+    )
+    employees = OffboardingBulkItemSerializer(many=True)
+
+
+class ChecklistChangeSerializer(serializers.Serializer):
+    checklist_id = serializers.IntegerField(required=False)
+    offboarding_id = serializers.IntegerField(required=False)
+    item = serializers.ChoiceField(
+        choices=OffboardingChecklist.CHECKLIST_CHOICES,
+        required=False
+    )
+    status = serializers.ChoiceField(choices=OffboardingChecklist.STATUS_CHOICES)
+
+    def to_internal_value(self, data):
+        # choices are matched case-insensitively like the offboarding API
+        if hasattr(data, "copy"):
+            data = data.copy()
+            for field in ("item", "status"):
+                if isinstance(data.get(field), str):
+                    data[field] = data[field].upper()
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        if not attrs.get("checklist_id") and not (attrs.get("offboarding_id") and attrs.get("item")):
+            raise serializers.ValidationError(
+                "Provide checklist_id or offboarding_id + item"
+            )
+        return attrs
+
+
+class ChecklistBulkUpdateSerializer(serializers.Serializer):
+    """Request body for the batch checklist update (schema only)."""
+    changes = ChecklistChangeSerializer(many=True)
+
+
+# =================================================
+# EMPLOYEE BULK PATCH
+# =================================================
+class EmployeeChangesSerializer(serializers.ModelSerializer):
+    """Columns a bulk patch may change, all optional."""
+    reporting_manager = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text="Full name of reporting manager, blank to clear"
+    )
+    department = department_field(required=False)
+    location = location_field()
+
+    class Meta:
+        model = Employee
+        fields = [
+            "department",
+            "designation",
+            "location",
+            "status",
+            "employee_type",
+            "work_shift",
+            "work_timing",
+            "probation_status",
+            "reporting_manager",
+        ]
+        extra_kwargs = {name: {"required": False} for name in fields}
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError("changes must contain at least one field")
+        return attrs
+
+
+class EmployeeBulkPatchItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    changes = EmployeeChangesSerializer()
+
+
+class EmployeeBulkPatchSerializer(serializers.Serializer):
+    """Request body for the bulk employee patch (schema only)."""
+    items = EmployeeBulkPatchItemSerializer(many=True)
+
+
 class EmployeeDocumentSerializer(serializers.ModelSerializer):
     # Return a safe URL for the file and size info without raising if file missing
     file = serializers.SerializerMethodField()
@@ -310,3 +555,170 @@ class EmployeeBulkActionSerializer(serializers.Serializer):
         child=serializers.IntegerField(),
         help_text="List of selected employee IDs"
     )
+
+
+from .export import DEFAULT_EXPORT_COLUMNS, EXPORT_COLUMNS, EXPORT_FORMATS
+
+
+class EmployeeBulkExportSerializer(serializers.Serializer):
+    employee_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        help_text="Optional list of selected employee IDs"
+    )
+    search = serializers.CharField(required=False, allow_blank=True)
+    department = serializers.CharField(required=False, allow_blank=True)
+    status = serializers.CharField(required=False, allow_blank=True)
+    location = serializers.CharField(required=False, allow_blank=True)
+    columns = serializers.ListField(
+        child=serializers.ChoiceField(choices=list(EXPORT_COLUMNS)),
+        required=False,
+        allow_empty=False,
+        default=DEFAULT_EXPORT_COLUMNS,
+        help_text="Columns to export, in order"
+    )
+    # not "format": DRF reserves that name for content negotiation
+    output = serializers.ChoiceField(choices=list(EXPORT_FORMATS), default="csv")
+
+
+# =================================================
+# PAYROLL RUNS
+# =================================================
+from .models import PayrollRun, PayrollResult
+
+
+class PayrollRunCreateSerializer(serializers.Serializer):
+    period = serializers.DateField(
+        help_text="Any day of the payroll month, stored as the first of the month"
+    )
+
+
+class PayrollRunSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PayrollRun
+        fields = [
+            "id",
+            "period",
+            "status",
+            "previous_run",
+            "employee_count",
+            "recomputed_count",
+            "total_gross",
+            "total_net",
+            "started_at",
+            "finished_at",
+        ]
+
+
+class PayrollResultSerializer(serializers.ModelSerializer):
+    employee_code = serializers.CharField(source="employee.employee_code", read_only=True)
+    employee_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PayrollResult
+        fields = [
+            "employee",
+            "employee_code",
+            "employee_name",
+            "basic",
+            "allowances",
+            "bonus",
+            "gross",
+            "provident_fund",
+            "professional_tax",
+            "net",
+        ]
+
+    def get_employee_name(self, obj):
+        return f"{obj.employee.first_name} {obj.employee.last_name}".strip()
+
+
+# =================================================
+# SALARY REVISIONS
+# =================================================
+from decimal import Decimal
+from .models import SalaryRevision, SalaryRevisionEntry
+from .revisions import DEFAULT_REVISION_FIELDS, REVISABLE_FIELDS, RULE_KEYS
+
+PERCENT_LIMITS = {
+    "max_digits": 6,
+    "decimal_places": 2,
+    "min_value": Decimal("-50"),
+    "max_value": Decimal("100"),
+}
+
+
+class SalaryRevisionRuleSerializer(serializers.Serializer):
+    department = serializers.CharField(required=False)
+    designation = serializers.CharField(required=False, help_text="Grade / designation")
+    percent = serializers.DecimalField(**PERCENT_LIMITS)
+
+    def validate(self, attrs):
+        if not any(attrs.get(key) for key in RULE_KEYS):
+            raise serializers.ValidationError("A rule needs department and/or designation")
+        return attrs
+
+
+class SalaryRevisionFiltersSerializer(serializers.Serializer):
+    search = serializers.CharField(required=False, allow_blank=True)
+    department = serializers.CharField(required=False, allow_blank=True)
+    status = serializers.CharField(required=False, allow_blank=True)
+    location = serializers.CharField(required=False, allow_blank=True)
+    employee_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+
+class SalaryRevisionRequestSerializer(serializers.Serializer):
+    filters = SalaryRevisionFiltersSerializer(required=False, default=dict)
+    rules = SalaryRevisionRuleSerializer(many=True, required=False, default=list)
+    default_percent = serializers.DecimalField(
+        required=False,
+        allow_null=True,
+        help_text="Applied to filtered employees no rule matches",
+        **PERCENT_LIMITS
+    )
+    fields = serializers.ListField(
+        child=serializers.ChoiceField(choices=REVISABLE_FIELDS),
+        required=False,
+        allow_empty=False,
+        default=DEFAULT_REVISION_FIELDS,
+    )
+
+    def validate(self, attrs):
+        if not attrs["rules"] and attrs.get("default_percent") is None:
+            raise serializers.ValidationError("Provide rules and/or default_percent")
+        return attrs
+
+
+class SalaryRevisionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SalaryRevision
+        fields = [
+            "id",
+            "created_by",
+            "criteria",
+            "rules",
+            "fields",
+            "employee_count",
+            "annual_ctc_delta",
+            "created_at",
+        ]
+
+
+class SalaryRevisionEntrySerializer(serializers.ModelSerializer):
+    employee_code = serializers.CharField(source="employee.employee_code", read_only=True)
+
+    class Meta:
+        model = SalaryRevisionEntry
+        fields = [
+            "employee",
+            "employee_code",
+            "percent",
+            "old_annual_ctc",
+            "new_annual_ctc",
+            "old_basic_pay",
+            "new_basic_pay",
+            "old_allowances",
+            "new_allowances",
+            "old_bonus",
+            "new_bonus",
+        ]
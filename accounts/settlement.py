@@ -0,0 +1,166 @@
+# accounts/settlement.py
+from decimal import Decimal
+
+import numpy as np
+
+from .models import EmployeeOffboarding
+
+
+# ==========================
+# SETTLEMENT RULES
+# ==========================
+# Salary fields on Employee are annual amounts, entered next to annual_ctc.
+GRATUITY_MIN_MONTHS = 60           # 5 years of continuous service
+GRATUITY_DAYS_PER_YEAR = 15        # 15 days of basic per completed year ...
+GRATUITY_WORKING_DAYS = 26         # ... over a 26 working day month
+GRATUITY_CAP = Decimal("2000000")  # statutory ceiling
+ANNUAL_LEAVE_DAYS = Decimal("18")  # earned leave, accrues over the calendar year
+NOTICE_PERIOD_DAYS = 30            # shortfall is recovered from the settlement
+
+# columns pulled per offboarding, in this order
+INPUT_COLUMNS = (
+    "employee_id",
+    "employee__employee_code",
+    "employee__basic_pay",
+    "employee__allowances",
+    "employee__date_of_joining",
+    "resignation_date",
+    "last_working_date",
+)
+
+# money is handled as integer paise so the array pass rounds like Decimal
+PAISE = 100
+
+
+def _paise(values):
+    return np.fromiter(
+        (int((value or 0) * PAISE) for value in values), dtype=np.int64, count=len(values)
+    )
+
+
+def _dates(values):
+    return np.array(values, dtype="datetime64[D]")
+
+
+def _divide(numerator, denominator):
+    """numerator / denominator rounded half up, both non-negative integers."""
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+def _day_of_month(days):
+    return (days - days.astype("datetime64[M]")).astype(np.int64) + 1
+
+
+def _service_months(joined, last_day):
+    months = (
+        last_day.astype("datetime64[M]") - joined.astype("datetime64[M]")
+    ).astype(np.int64)
+    months -= _day_of_month(last_day) < _day_of_month(joined)
+    valid = ~np.isnat(joined) & (joined <= last_day)
+    return np.where(valid, months, 0)
+
+
+def _amount(paise):
+    return Decimal(int(paise)).scaleb(-2)
+
+
+def compute_settlements(columns):
+    """
+    Settlement figures for a batch, given as {column: [values...]} with the
+    INPUT_COLUMNS above. Works column by column over the whole batch with
+    numpy and returns one dict per employee, in input order.
+    """
+    employee_ids = columns["employee_id"]
+    codes = columns["employee__employee_code"]
+    basic = _paise(columns["employee__basic_pay"])
+    gross = basic + _paise(columns["employee__allowances"])
+    joined = _dates(columns["employee__date_of_joining"])
+    resigned = _dates(columns["resignation_date"])
+    last_day = _dates(columns["last_working_date"])
+
+    # salary for the days worked in the final month
+    month_start = last_day.astype("datetime64[M]")
+    month_days = (
+        (month_start + 1).astype("datetime64[D]") - month_start.astype("datetime64[D]")
+    ).astype(np.int64)
+    pending_salary = _divide(gross * _day_of_month(last_day), 12 * month_days)
+
+    # gratuity: a final part-year of 6+ months counts as a full year
+    months = _service_months(joined, last_day)
+    years = months // 12 + (months % 12 >= 6)
+    gratuity = np.where(
+        months >= GRATUITY_MIN_MONTHS,
+        np.minimum(
+            _divide(basic * GRATUITY_DAYS_PER_YEAR * years, 12 * GRATUITY_WORKING_DAYS),
+            int(GRATUITY_CAP * PAISE),
+        ),
+        0,
+    )
+
+    # leave accrued since the later of 1 Jan and the joining date
+    year_start = last_day.astype("datetime64[Y]")
+    year_days = (
+        (year_start + 1).astype("datetime64[D]") - year_start.astype("datetime64[D]")
+    ).astype(np.int64)
+    accrual_start = np.where(
+        np.isnat(joined), year_start.astype("datetime64[D]"),
+        np.maximum(year_start.astype("datetime64[D]"), joined),
+    )
+    worked = np.maximum((last_day - accrual_start).astype(np.int64) + 1, 0)
+    leave_days = int(ANNUAL_LEAVE_DAYS) * worked
+    leave_tenths = _divide(10 * leave_days, year_days)
+    leave_encashment = _divide(leave_days * basic, year_days * 12 * 30)
+
+    # notice period shortfall, recovered at the daily gross rate
+    shortfall = np.maximum(NOTICE_PERIOD_DAYS - (last_day - resigned).astype(np.int64), 0)
+    deductions = _divide(shortfall * gross, 12 * 30)
+
+    total = pending_salary + leave_encashment + gratuity - deductions
+
+    return [
+        {
+            "employee_id": emp_id,
+            "employee_code": codes[i],
+            "last_working_date": columns["last_working_date"][i],
+            "years_of_service": round(int(months[i]) / 12, 1),
+            "leave_days": Decimal(int(leave_tenths[i])).scaleb(-1),
+            "notice_shortfall_days": int(shortfall[i]),
+            "pending_salary": _amount(pending_salary[i]),
+            "leave_encashment": _amount(leave_encashment[i]),
+            "gratuity": _amount(gratuity[i]),
+            "deductions": _amount(deductions[i]),
+            "total_settlement": _amount(total[i]),
+        }
+        for i, emp_id in enumerate(employee_ids)
+    ]
+
+
+def _columns(rows):
+    return dict(zip(INPUT_COLUMNS, map(list, zip(*rows)))) if rows else None
+
+
+def settlement_for_employee(employee_id):
+    """One query for the inputs, None if the employee has no offboarding."""
+    rows = list(
+        EmployeeOffboarding.objects
+        .filter(employee_id=employee_id)
+        .values_list(*INPUT_COLUMNS)
+    )
+    if not rows:
+        return None
+    return compute_settlements(_columns(rows))[0]
+
+
+def pending_settlements(queryset=None):
+    """Settlements for every offboarded employee not yet deactivated."""
+    if queryset is None:
+        queryset = EmployeeOffboarding.objects.all()
+    rows = list(
+        queryset
+        .exclude(employee__status="INACTIVE")
+        .order_by("last_working_date", "employee_id")
+        .values_list(*INPUT_COLUMNS)
+    )
+    if not rows:
+        return []
+    return compute_settlements(_columns(rows))
@@ -0,0 +1,213 @@
+# accounts/signals.py
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from . import hierarchy
+from .analytics import CUBE_DIMENSIONS, SALARY_COLUMNS, invalidate_headcount, invalidate_salaries
+from .caching import (
+    DIMENSIONS, HIERARCHY, SETTLEMENT,
+    bump_version, invalidate_all_employees, invalidate_employees,
+)
+from .events import publish, stats_delta
+from .models import (
+    Department, Employee, EmployeeDocument, EmployeeOffboarding, EmployeeTombstone, Location,
+)
+
+
+# fields rendered in the org chart, a change to any of them makes it stale
+ORG_CHART_FIELDS = {
+    "reporting_manager_id",
+    "employee_code",
+    "first_name",
+    "last_name",
+    "designation",
+    "department_id",
+}
+
+# inputs of the final settlement calculation
+SETTLEMENT_FIELDS = {
+    "employee_code",
+    "basic_pay",
+    "allowances",
+    "date_of_joining",
+    "status",
+}
+
+
+# fields behind the dashboard counters
+STATS_FIELDS = ("status", "department_id")
+
+# shown on reportees as their reporting_manager_name
+MANAGER_NAME_FIELDS = {"first_name", "last_name"}
+
+# where an employee's join / exit events land in the headcount series
+HEADCOUNT_FIELDS = {"date_of_joining", "department_id"}
+
+# salaries and what salary distributions group / filter them by
+SALARY_FIELDS = {*SALARY_COLUMNS, *CUBE_DIMENSIONS.values()}
+
+
+def _manager_changed(instance):
+    changed = instance.changed_fields()
+    return changed is None or "reporting_manager_id" in changed
+
+
+@receiver(pre_save, sender=Employee)
+def employee_check_hierarchy(sender, instance, **kwargs):
+    if instance.pk is None or instance.reporting_manager_id is None:
+        return
+    if _manager_changed(instance) and hierarchy.creates_cycle(
+        instance.pk, instance.reporting_manager_id
+    ):
+        raise hierarchy.HierarchyCycleError([instance.pk])
+
+
+@receiver(post_save, sender=Employee)
+def employee_saved(sender, instance, created, **kwargs):
+    changed = instance.changed_fields()
+
+    hierarchy.employee_saved(
+        instance,
+        created=created,
+        manager_changed=not created and _manager_changed(instance),
+    )
+
+    if created or changed is None or changed & ORG_CHART_FIELDS:
+        bump_version(HIERARCHY)
+    if not created and (changed is None or changed & SETTLEMENT_FIELDS):
+        bump_version(SETTLEMENT)
+
+    stale = [instance.pk]
+    if not created and (changed is None or changed & MANAGER_NAME_FIELDS):
+        stale += instance.reportees.values_list("id", flat=True)
+    invalidate_employees(stale)
+
+    if created:
+        invalidate_headcount(instance.date_of_joining)
+    elif changed is None or "department_id" in changed:
+        # every event of the employee moves to the new department
+        invalidate_headcount()
+    elif "date_of_joining" in changed:
+        invalidate_headcount(instance._loaded_values["date_of_joining"], instance.date_of_joining)
+
+    if created or changed is None or changed & SALARY_FIELDS:
+        invalidate_salaries()
+
+    _publish_employee_saved(instance, created, changed)
+
+
+def _publish_employee_saved(instance, created, changed):
+    after = {field: getattr(instance, field) for field in STATS_FIELDS}
+    event = {"type": "employee", "id": instance.pk}
+
+    if created:
+        event.update(action="created", stats=stats_delta(None, after))
+    elif changed is None:
+        event.update(action="updated", changed=None)
+    else:
+        changed = changed - {"updated_at", "change_seq"}
+        if not changed:
+            return
+        before = {field: instance._loaded_values.get(field) for field in STATS_FIELDS}
+        event.update(
+            action="updated",
+            changed=sorted(changed),
+            stats=stats_delta(before, after),
+        )
+
+    if not event.get("stats", True):
+        del event["stats"]
+    publish(event)
+
+
+@receiver(pre_delete, sender=Employee)
+def employee_detach_hierarchy(sender, instance, **kwargs):
+    hierarchy.detach_subtree(instance.pk)
+
+
+_bulk_deleted = threading.local()
+
+
+@contextmanager
+def bulk_deleted(employee_ids):
+    """
+    Skip the per-row post_delete work for employees deleted while the
+    block runs; the caller writes their tombstones, bumps the caches and
+    publishes one event for all of them.
+    """
+    _bulk_deleted.ids = set(employee_ids)
+    try:
+        yield
+    finally:
+        _bulk_deleted.ids = None
+
+
+@receiver(post_delete, sender=Employee)
+def employee_deleted(sender, instance, **kwargs):
+    if instance.pk in (getattr(_bulk_deleted, "ids", None) or ()):
+        return
+    EmployeeTombstone.objects.create(
+        employee_id=instance.pk,
+        employee_code=instance.employee_code,
+    )
+    bump_version(HIERARCHY, SETTLEMENT)
+    invalidate_employees([instance.pk])
+    invalidate_headcount(instance.date_of_joining)
+    invalidate_salaries()
+
+    before = {field: getattr(instance, field) for field in STATS_FIELDS}
+    publish({
+        "type": "employee",
+        "action": "deleted",
+        "id": instance.pk,
+        "stats": stats_delta(before, None),
+    })
+
+
+def _action(kwargs):
+    if "created" not in kwargs:
+        return "deleted"
+    return "created" if kwargs["created"] else "updated"
+
+
+@receiver(post_save, sender=EmployeeOffboarding)
+@receiver(post_delete, sender=EmployeeOffboarding)
+def offboarding_changed(sender, instance, **kwargs):
+    bump_version(SETTLEMENT)
+    if kwargs.get("created") is False:
+        # the previous last working date is not known
+        invalidate_headcount()
+    else:
+        invalidate_headcount(instance.last_working_date)
+    publish({
+        "type": "offboarding",
+        "action": _action(kwargs),
+        "id": instance.employee_id,
+    })
+
+
+@receiver(post_save, sender=EmployeeDocument)
+@receiver(post_delete, sender=EmployeeDocument)
+def document_changed(sender, instance, **kwargs):
+    publish({
+        "type": "document",
+        "action": _action(kwargs),
+        "id": instance.employee_id,
+        "document_type": instance.document_type,
+    })
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def dimension_changed(sender, instance, created=False, **kwargs):
+    bump_version(DIMENSIONS)
+    if not created:
+        # a renamed department / location shows on every cached employee
+        bump_version(HIERARCHY)
+        invalidate_all_employees()
+        invalidate_salaries()
@@ -0,0 +1,30 @@
+# accounts/tasks.py
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections, connections
+
+
+logger = logging.getLogger(__name__)
+
+# in-process background work (bulk deletes, storage cleanup), small on purpose
+# so it never competes with request threads for database connections
+MAX_WORKERS = 2
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="accounts-task")
+
+
+def _run(func, args, kwargs):
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed", func.__name__)
+        raise
+    finally:
+        connections.close_all()
+
+
+def submit(func, *args, **kwargs):
+    """Run func in a background worker thread, returns the Future."""
+    return _executor.submit(_run, func, args, kwargs)
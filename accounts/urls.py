@@ -40,8 +40,32 @@ from .views import (
     EmployeeDocumentUpdateView,
     EmployeeSalaryUpdateView,
     EmployeeBulkDeleteView,
+    EmployeeBulkDeleteStatusView,
+    EmployeeChangeFeedView,
+    employee_events_view,
+    EmployeeProfileView,
+    EmployeeBulkPatchView,
     EmployeeBulkExportView,
-    EmployeeSalarySlipDownloadView
+    EmployeeSalarySlipDownloadView,
+    EmployeeOrgChartView,
+    EmployeeOffboardingBulkView,
+    OffboardingDashboardView,
+    OffboardingChecklistBulkUpdateView,
+    EmployeeFinalSettlementBatchView,
+
+    # Payroll
+    PayrollRunListCreateView,
+    PayrollRunDetailView,
+    PayrollRunResultsView,
+    SalaryRevisionPreviewView,
+    SalaryRevisionListCreateView,
+    SalaryRevisionEntriesView,
+    EmployeeCacheMetricsView,
+
+    # Analytics
+    EmployeeCubeView,
+    EmployeeHeadcountSeriesView,
+    EmployeeSalaryDistributionView,
 )
 urlpatterns = [
     # AUTH APIs
@@ -67,18 +91,29 @@ urlpatterns = [
 
     # ================= OFFBOARDING =================
     path("employees/<int:pk>/offboarding/", EmployeeOffboardingView.as_view()),
+    path("employees/offboarding/bulk/", EmployeeOffboardingBulkView.as_view()),
+    path("employees/offboarding/dashboard/", OffboardingDashboardView.as_view()),
     path(
         "employees/offboarding/checklist/<int:checklist_id>/",
         OffboardingChecklistUpdateView.as_view()
     ),
+    path(
+        "employees/offboarding/checklist/bulk-update/",
+        OffboardingChecklistBulkUpdateView.as_view()
+    ),
     path(
         "employees/<int:pk>/final-settlement/",
         EmployeeFinalSettlementView.as_view()
     ),
+    path(
+        "employees/final-settlement/batch/",
+        EmployeeFinalSettlementBatchView.as_view()
+    ),
     path(
         "employees/<int:pk>/deactivate/",
         EmployeeDeactivateView.as_view()
     ),
+    path("employees/<int:pk>/profile/", EmployeeProfileView.as_view()),
     path("employees/<int:pk>/overview/", EmployeeOverviewView.as_view()),
     path("employees/<int:pk>/job/", EmployeeJobView.as_view()),
     path("employees/<int:pk>/salary/", EmployeeSalaryView.as_view()),
@@ -91,10 +126,33 @@ urlpatterns = [
     path("employees/<int:emp_id>/documents/update/",EmployeeDocumentUpdateView.as_view()),
     path("employees/<int:emp_id>/documents/",EmployeeDocumentListView.as_view()),
     path("employees/<int:emp_id>/documents/download/<str:document_type>/",EmployeeDocumentDownloadByTypeView.as_view()),
+    path("employees/bulk-patch/", EmployeeBulkPatchView.as_view()),
     path("employees/bulk-delete/", EmployeeBulkDeleteView.as_view()),
+    path("employees/bulk-delete/<str:job_id>/", EmployeeBulkDeleteStatusView.as_view()),
     path("employees/bulk-export/", EmployeeBulkExportView.as_view()),
+    path("employees/changes/", EmployeeChangeFeedView.as_view()),
+    path("employees/events/", employee_events_view),
     path(
     "employees/<int:id>/salary-slip/download/",EmployeeSalarySlipDownloadView.as_view()),
 
+    # ================= ORG CHART =================
+    path("employees/<int:pk>/org-chart/", EmployeeOrgChartView.as_view()),
+
+    # ================= PAYROLL =================
+    path("payroll/runs/", PayrollRunListCreateView.as_view()),
+    path("payroll/runs/<int:pk>/", PayrollRunDetailView.as_view()),
+    path("payroll/runs/<int:pk>/results/", PayrollRunResultsView.as_view()),
+    path("payroll/salary-revisions/", SalaryRevisionListCreateView.as_view()),
+    path("payroll/salary-revisions/preview/", SalaryRevisionPreviewView.as_view()),
+    path("payroll/salary-revisions/<int:pk>/entries/", SalaryRevisionEntriesView.as_view()),
+
+    # ================= ANALYTICS =================
+    path("employees/analytics/cube/", EmployeeCubeView.as_view()),
+    path("employees/analytics/headcount/", EmployeeHeadcountSeriesView.as_view()),
+    path("employees/analytics/salary-distribution/", EmployeeSalaryDistributionView.as_view()),
+
+    # ================= CACHE =================
+    path("cache/metrics/", EmployeeCacheMetricsView.as_view()),
+
 
 ]
@@ -95,7 +95,10 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 from drf_spectacular.utils import extend_schema
 from drf_spectacular.types import OpenApiTypes
-from django.db.models import Q, Count
+from django.db.models import Q, Count, F, Case, When, Value, FloatField
+from django.db.models.functions import Cast
+from rest_framework.pagination import PageNumberPagination
+from django.db import transaction, IntegrityError
 from django.http import HttpResponse
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
@@ -104,16 +107,31 @@ from reportlab.pdfgen import canvas
 from django.http import HttpResponse
 from datetime import date
 import csv, io
+
+SETTLEMENT_CACHE_TIMEOUT = 60 * 60
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from drf_spectacular.utils import extend_schema
-from .models import Employee, EmployeeOffboarding, OffboardingChecklist
+from .models import Employee, EmployeeOffboarding, OffboardingChecklist, iexact, next_change_seq
 from .serializers import EmployeeOffboardingSerializer,OffboardingChecklistSerializer
+from .serializers import OffboardingBulkSerializer, OffboardingBulkItemSerializer
+from .serializers import OffboardingDashboardSerializer
+from .serializers import ChecklistChangeSerializer, ChecklistBulkUpdateSerializer
 from django.http import FileResponse
 from .models import EmployeeDocument
 from .serializers import EmployeeDocumentSerializer
 from django.http import FileResponse
+from .hierarchy import deferred_refresh
+from .scoping import UNRESTRICTED, EmployeeScopeMixin, get_manager_scope
+from .settlement import settlement_for_employee, pending_settlements
+from .caching import HIERARCHY, SETTLEMENT, bump_version, versioned_key
+from .caching import cached_employee, invalidate_employees, invalidate_all_employees
+from .dimensions import EMPLOYEE_DIMENSIONS, create_missing_dimensions, departments, locations
+from .analytics import invalidate_headcount, invalidate_salaries
+from .events import publish as publish_event
+from django.core.cache import cache
+from decimal import Decimal
 import os
 from .serializers import (
    
@@ -127,15 +145,83 @@ from .serializers import (
 # =================================================
 # EMPLOYEE LIST + CREATE (PHOTO + GENDER + DOB)
 # =================================================
-class EmployeeListCreateView(APIView):
-    parser_classes = (MultiPartParser, FormParser)
+EMPLOYEE_FILTER_FIELDS = ["department", "status", "location"]
+
+# filters on a dimension table go by id, resolved from the name in memory
+DIMENSION_FILTERS = {"department": departments, "location": locations}
+
+
+def filter_employees(qs, params):
+    """Apply the list endpoint's search and exact-match filters."""
+    search = params.get("search")
+    if search:
+        qs = qs.filter(
+            Q(first_name__icontains=search) |
+            Q(last_name__icontains=search) |
+            Q(employee_code__icontains=search) |
+            Q(email__icontains=search) |
+            Q(phone__icontains=search)
+        )
+
+    for field in EMPLOYEE_FILTER_FIELDS:
+        if not params.get(field):
+            continue
+        if field in DIMENSION_FILTERS:
+            pk = DIMENSION_FILTERS[field].id_for(params[field])
+            qs = qs.filter(**{f"{field}_id": pk}) if pk else qs.none()
+        else:
+            qs = qs.filter(iexact(field, params[field]))
+
+    return qs
+
+
+def parse_sparse_fields(params, serializer_class):
+    """
+    Read ?fields= / ?exclude= (comma separated).
+    Returns ({"fields": ..., "exclude": ...}, None) or (None, error message).
+    """
+    allowed = serializer_class.readable_fields()
+    selection = {}
+    for param in ("fields", "exclude"):
+        if not params.get(param):
+            continue
+        names = [name.strip() for name in params[param].split(",") if name.strip()]
+        unknown = [name for name in names if name not in allowed]
+        if unknown:
+            return None, (
+                f"Unknown {param}: {', '.join(unknown)}. "
+                f"Allowed: {', '.join(allowed)}"
+            )
+        selection[param] = names
+    return selection, None
+
+
+def project_employees(qs, serializer):
+    """
+    Load only the columns the serializer will output, joining the
+    reporting manager only when reporting_manager_name is requested.
+    """
+    model_fields = {f.attname for f in Employee._meta.concrete_fields}
+    columns = {"id"}
+    for field in serializer.fields.values():
+        if not field.write_only and field.source in model_fields:
+            columns.add(field.source)
+
+    if "reporting_manager_name" in serializer.fields:
+        qs = qs.select_related("reporting_manager")
+        columns |= {
+            "reporting_manager",
+            "reporting_manager__first_name",
+            "reporting_manager__last_name",
+        }
+    return qs.only(*columns)
+
 
-    def get_permissions(self):
-        # 🔓 Public ONLY for filter/search APIs
-        if self.request.method == "GET" and self.request.query_params:
-            return []
-        # 🔐 Base list & create require auth
-        return [IsAuthenticated()]
+class EmployeeListCreateView(EmployeeScopeMixin, APIView):
+    # filtered lists are scoped to the caller's reportee tree like the
+    # base list, so they need a user as well
+    permission_classes = [IsAuthenticated]
+    parser_classes = (MultiPartParser, FormParser)
 
     @extend_schema(
         request={
@@ -236,25 +322,33 @@ class EmployeeListCreateView(APIView):
 
         return Response(EmployeeSerializer(employee).data, status=201)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("search", OpenApiTypes.STR, OpenApiParameter.QUERY),
+            OpenApiParameter("department", OpenApiTypes.STR, OpenApiParameter.QUERY),
+            OpenApiParameter("status", OpenApiTypes.STR, OpenApiParameter.QUERY),
+            OpenApiParameter("location", OpenApiTypes.STR, OpenApiParameter.QUERY),
+            OpenApiParameter(
+                "fields", OpenApiTypes.STR, OpenApiParameter.QUERY,
+                description="Comma separated fields to return, e.g. id,first_name,department"
+            ),
+            OpenApiParameter(
+                "exclude", OpenApiTypes.STR, OpenApiParameter.QUERY,
+                description="Comma separated fields to leave out"
+            ),
+        ],
+        responses=EmployeeSerializer(many=True)
+    )
     def get(self, request):
-        qs = Employee.objects.all().order_by("employee_code")
-        params = request.query_params
-
-        search = params.get("search")
-        if search:
-            qs = qs.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(employee_code__icontains=search) |
-                Q(email__icontains=search) |
-                Q(phone__icontains=search)
-            )
+        selection, error = parse_sparse_fields(request.query_params, EmployeeSerializer)
+        if error:
+            return Response({"error": error}, status=400)
 
-        for field in ["department", "status", "location"]:
-            if params.get(field):
-                qs = qs.filter(**{f"{field}__iexact": params[field]})
+        serializer = EmployeeSerializer(**selection)
+        qs = self.scope_employees(Employee.objects.all()).order_by("employee_code")
+        qs = project_employees(filter_employees(qs, request.query_params), serializer)
 
-        return Response(EmployeeSerializer(qs, many=True).data)
+        return Response(EmployeeSerializer(qs, many=True, **selection).data)
     
 # =================================================
 # EMPLOYEE FILTER APIs (PUBLIC)
@@ -263,10 +357,13 @@ class EmployeeFilterView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, filter_type):
-        if filter_type == "departments":
-            data = Employee.objects.values_list("department", flat=True).distinct()
-        elif filter_type == "locations":
-            data = Employee.objects.values_list("location", flat=True).distinct()
+        if filter_type in ("departments", "locations"):
+            field, lookup = (
+                ("department_id", departments) if filter_type == "departments"
+                else ("location_id", locations)
+            )
+            ids = Employee.objects.order_by().values_list(field, flat=True).distinct()
+            data = sorted(filter(None, (lookup.name(pk) for pk in ids)))
         elif filter_type == "status":
             data = Employee.objects.values_list("status", flat=True).distinct()
         else:
@@ -281,40 +378,91 @@ class EmployeeFilterView(APIView):
 # =================================================
 # EMPLOYEE RETRIEVE
 # =================================================
-class EmployeeRetrieveView(APIView):
+def serialize_employee(serializer_class, pk, queryset=None):
+    """Serialized employee as a plain dict (cacheable), None if missing."""
+    queryset = Employee.objects.all() if queryset is None else queryset
+    employee = queryset.filter(pk=pk).first()
+    if employee is None:
+        return None
+    return dict(serializer_class(employee).data)
+
+
+class EmployeeRetrieveView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("fields", OpenApiTypes.STR, OpenApiParameter.QUERY),
+            OpenApiParameter("exclude", OpenApiTypes.STR, OpenApiParameter.QUERY),
+        ],
+        responses=EmployeeSerializer
+    )
     def get(self, request, pk):
-        emp = Employee.objects.get(pk=pk)
-        return Response(EmployeeSerializer(emp).data)
+        if not self.in_scope(pk):
+            return Response({"error": "Employee not found"}, status=404)
+
+        selection, error = parse_sparse_fields(request.query_params, EmployeeSerializer)
+        if error:
+            return Response({"error": error}, status=400)
+
+        # the full representation is cached, the selection is cut from it
+        data = cached_employee("detail", pk, lambda: serialize_employee(
+            EmployeeSerializer, pk, Employee.objects.select_related("reporting_manager")
+        ))
+        if data is None:
+            return Response({"error": "Employee not found"}, status=404)
+
+        if selection:
+            wanted = selection.get("fields", data)
+            excluded = set(selection.get("exclude", ()))
+            data = {
+                name: value for name, value in data.items()
+                if name in wanted and name not in excluded
+            }
+        return Response(data)
 
 
-class EmployeeOverviewView(APIView):
+class EmployeeOverviewView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
-        employee = Employee.objects.get(pk=pk)
-        serializer = EmployeeOverviewSerializer(employee)
-        return Response(serializer.data)
+        if not self.in_scope(pk):
+            return Response({"error": "Employee not found"}, status=404)
+        data = cached_employee(
+            "overview", pk, lambda: serialize_employee(EmployeeOverviewSerializer, pk)
+        )
+        if data is None:
+            return Response({"error": "Employee not found"}, status=404)
+        return Response(data)
 
-class EmployeeJobView(APIView):
+class EmployeeJobView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
-        employee = Employee.objects.get(pk=pk)
-        serializer = EmployeeJobSerializer(employee)
-        return Response(serializer.data)
+        if not self.in_scope(pk):
+            return Response({"error": "Employee not found"}, status=404)
+        data = cached_employee("job", pk, lambda: serialize_employee(
+            EmployeeJobSerializer, pk, Employee.objects.select_related("reporting_manager")
+        ))
+        if data is None:
+            return Response({"error": "Employee not found"}, status=404)
+        return Response(data)
 
-class EmployeeSalaryView(APIView):
+class EmployeeSalaryView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
-        employee = Employee.objects.get(pk=pk)
-        serializer = EmployeeSalarySerializer(employee)
-        return Response(serializer.data)
+        if not self.in_scope(pk):
+            return Response({"error": "Employee not found"}, status=404)
+        data = cached_employee(
+            "salary", pk, lambda: serialize_employee(EmployeeSalarySerializer, pk)
+        )
+        if data is None:
+            return Response({"error": "Employee not found"}, status=404)
+        return Response(data)
     
 
-class EmployeeOverviewUpdateView(APIView):
+class EmployeeOverviewUpdateView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     @extend_schema(
@@ -324,6 +472,9 @@ class EmployeeOverviewUpdateView(APIView):
         description="Update employee overview details"
     )
     def put(self, request, pk):
+        if not self.in_scope(pk):
+            return Response({"error": "Employee not found"}, status=404)
+
         employee = Employee.objects.get(pk=pk)
 
         serializer = EmployeeOverviewSerializer(
@@ -338,7 +489,7 @@ class EmployeeOverviewUpdateView(APIView):
 
 
 
-class EmployeeJobUpdateView(APIView):
+class EmployeeJobUpdateView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     @extend_schema(
@@ -348,6 +499,9 @@ class EmployeeJobUpdateView(APIView):
         description="Update employee job details"
     )
     def put(self, request, pk):
+        if not self.in_scope(pk):
+            return Response({"error": "Employee not found"}, status=404)
+
         employee = Employee.objects.get(pk=pk)
 
         serializer = EmployeeJobSerializer(
@@ -360,7 +514,7 @@ class EmployeeJobUpdateView(APIView):
 
         return Response(serializer.data)
 
-class EmployeeSalaryUpdateView(APIView):
+class EmployeeSalaryUpdateView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     @extend_schema(
@@ -370,6 +524,9 @@ class EmployeeSalaryUpdateView(APIView):
         description="Update employee salary details"
     )
     def put(self, request, pk):
+        if not self.in_scope(pk):
+            return Response({"error": "Employee not found"}, status=404)
+
         employee = Employee.objects.get(pk=pk)
 
         serializer = EmployeeSalarySerializer(
@@ -386,7 +543,7 @@ class EmployeeSalaryUpdateView(APIView):
 # =================================================
 # EMPLOYEE UPDATE (PUT ONLY)
 # =================================================
-class EmployeeUpdateView(APIView):
+class EmployeeUpdateView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser)
 
@@ -451,6 +608,8 @@ class EmployeeUpdateView(APIView):
         responses=EmployeeSerializer
     )
     def put(self, request, pk):
+        if not self.in_scope(pk):
+            return Response({"error": "Employee not found"}, status=404)
         emp = Employee.objects.get(pk=pk)
         serializer = EmployeeSerializer(emp, data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -461,7 +620,7 @@ class EmployeeUpdateView(APIView):
 # =================================================
 # EMPLOYEE PATCH (PHOTO / PARTIAL)
 # =================================================
-class EmployeePatchView(APIView):
+class EmployeePatchView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser)
 
@@ -477,6 +636,8 @@ class EmployeePatchView(APIView):
         responses=EmployeeSerializer
     )
     def patch(self, request, pk):
+        if not self.in_scope(pk):
+            return Response({"error": "Employee not found"}, status=404)
         emp = Employee.objects.get(pk=pk)
         serializer = EmployeeSerializer(emp, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
@@ -487,11 +648,13 @@ class EmployeePatchView(APIView):
 # =================================================
 # EMPLOYEE DELETE
 # =================================================
-class EmployeeDeleteView(APIView):
+class EmployeeDeleteView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def delete(self, request, pk):
-        Employee.objects.filter(pk=pk).delete()
+        if not self.in_scope(pk):
+            return Response({"error": "Employee not found"}, status=404)
+        delete_employees([pk])
         return Response({"message": "Employee deleted"})
 
 
@@ -523,16 +686,21 @@ class EmployeeBulkUploadView(APIView):
 
         created, updated, errors = 0, 0, []
 
-        for idx, row in enumerate(reader, start=1):
-            try:
-                _, is_created = Employee.objects.update_or_create(
-                    employee_code=row.get("employee_code"),
-                    defaults=row
-                )
-                created += int(is_created)
-                updated += int(not is_created)
-            except Exception as e:
-                errors.append(f"Row {idx}: {str(e)}")
+        # hierarchy rows for the whole file are written once at the end
+        with deferred_refresh():
+            for idx, row in enumerate(reader, start=1):
+                try:
+                    for field, lookup in DIMENSION_FILTERS.items():
+                        if field in row:
+                            row[f"{field}_id"] = lookup.id_for(row.pop(field), create=True)
+                    _, is_created = Employee.objects.update_or_create(
+                        employee_code=row.get("employee_code"),
+                        defaults=row
+                    )
+                    created += int(is_created)
+                    updated += int(not is_created)
+                except Exception as e:
+                    errors.append(f"Row {idx}: {str(e)}")
 
         return Response({
             "created": created,
@@ -544,25 +712,30 @@ class EmployeeBulkUploadView(APIView):
 # =================================================
 # EMPLOYEE STATS
 # =================================================
-class EmployeeStatsView(APIView):
+class EmployeeStatsView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        qs = Employee.objects.all()
+        qs = self.scope_employees(Employee.objects.all())
         return Response({
             "total_employees": qs.count(),
             "active": qs.filter(status="ACTIVE").count(),
             "on_leave": qs.filter(status="ON_LEAVE").count(),
-            "department_breakdown": list(
-                qs.values("department").annotate(count=Count("id"))
-            )
+            "department_breakdown": [
+                {"department": departments.name(row["department_id"]), "count": row["count"]}
+                for row in qs.order_by().values("department_id").annotate(count=Count("id"))
+            ]
         })
 
 
 # =================================================
 # EMPLOYEE EXPORT (CSV DOWNLOAD)
 # =================================================
-class EmployeeExportView(APIView):
+# every column except the change feed bookkeeping
+CSV_EXPORT_FIELDS = [f for f in Employee._meta.fields if f.name != "change_seq"]
+
+
+class EmployeeExportView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -570,10 +743,14 @@ class EmployeeExportView(APIView):
         response["Content-Disposition"] = "attachment; filename=employees.csv"
 
         writer = csv.writer(response)
-        writer.writerow([f.name for f in Employee._meta.fields])
+        writer.writerow([f.name for f in CSV_EXPORT_FIELDS])
 
-        for emp in Employee.objects.all():
-            writer.writerow([getattr(emp, f.name) for f in Employee._meta.fields])
+        for emp in self.scope_employees(Employee.objects.all()):
+            writer.writerow([
+                EMPLOYEE_DIMENSIONS[f.attname].name(getattr(emp, f.attname))
+                if f.attname in EMPLOYEE_DIMENSIONS else getattr(emp, f.name)
+                for f in CSV_EXPORT_FIELDS
+            ])
 
         return response
 
@@ -581,7 +758,37 @@ class EmployeeExportView(APIView):
 # =================================================
 # EMPLOYEE OFFBOARDING API
 # =================================================
-class EmployeeOffboardingView(APIView):
+ALLOWED_CHECKLIST_ITEMS = [item for item, _ in OffboardingChecklist.CHECKLIST_CHOICES]
+ALLOWED_CHECKLIST_STATUS = [status for status, _ in OffboardingChecklist.STATUS_CHOICES]
+
+
+def parse_checklist(checklist_data):
+    """
+    Normalise a {"ITEM": "STATUS"} mapping.
+    Returns (checklist, None) or (None, error message).
+    """
+    if not isinstance(checklist_data, dict):
+        return None, "Checklist must be an object of item: status"
+
+    checklist = {}
+    for item, status in checklist_data.items():
+        item = str(item).upper()
+        status = str(status).upper()
+
+        if item not in ALLOWED_CHECKLIST_ITEMS:
+            return None, f"Invalid checklist item: {item}"
+
+        if status not in ALLOWED_CHECKLIST_STATUS:
+            return None, (
+                f"Invalid status '{status}' for {item}. "
+                f"Allowed values: PENDING or SUBMITTED"
+            )
+
+        checklist[item] = status
+    return checklist, None
+
+
+class EmployeeOffboardingView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     @extend_schema(
@@ -633,9 +840,11 @@ class EmployeeOffboardingView(APIView):
     )
     def post(self, request, pk):
 
-        # 1️⃣ Check employee exists
+        # 1️⃣ Check employee exists (offboarding joined in the same query)
+        if not self.in_scope(pk):
+            return Response({"error": "Employee not found"}, status=404)
         try:
-            employee = Employee.objects.get(pk=pk)
+            employee = Employee.objects.select_related("offboarding").get(pk=pk)
         except Employee.DoesNotExist:
             return Response(
                 {"error": "Employee not found"},
@@ -643,7 +852,7 @@ class EmployeeOffboardingView(APIView):
             )
 
         # 2️⃣ Prevent duplicate offboarding
-        if EmployeeOffboarding.objects.filter(employee=employee).exists():
+        if hasattr(employee, "offboarding"):
             return Response(
                 {"error": "Offboarding already exists for this employee"},
                 status=400
@@ -658,65 +867,264 @@ class EmployeeOffboardingView(APIView):
                 status=400
             )
 
-        # 3️⃣ Create offboarding record
-        offboarding = EmployeeOffboarding.objects.create(
-            employee=employee,
-            resignation_date=data["resignation_date"],
-            last_working_date=data["last_working_date"],
-            reason_for_exit=data["reason_for_exit"],
-            additional_notes=data.get("additional_notes", "")
+        checklist, error = parse_checklist(checklist_data)
+        if error:
+            return Response({"error": error}, status=400)
+
+        # 3️⃣ Create offboarding record + checklist rows in one go
+        with transaction.atomic():
+            offboarding = EmployeeOffboarding.objects.create(
+                employee=employee,
+                resignation_date=data["resignation_date"],
+                last_working_date=data["last_working_date"],
+                reason_for_exit=data["reason_for_exit"],
+                additional_notes=data.get("additional_notes", "")
+            )
+
+            OffboardingChecklist.objects.bulk_create([
+                OffboardingChecklist(offboarding=offboarding, item=item, status=status)
+                for item, status in checklist.items()
+            ])
+
+        # 5️⃣ Success
+        return Response(
+            EmployeeOffboardingSerializer(offboarding).data,
+            status=201
         )
 
-        # 4️⃣ 🔥 IMPORTANT FIX (THIS IS THE ROOT CAUSE)
-        # DELETE any existing checklist rows first
-        OffboardingChecklist.objects.filter(offboarding=offboarding).delete()
+# =================================================
+# BULK OFFBOARDING API
+# =================================================
+class EmployeeOffboardingBulkView(EmployeeScopeMixin, APIView):
+    permission_classes = [IsAuthenticated]
 
-        ALLOWED_ITEMS = [
-            "LAPTOP_RETURNED",
-            "ACCESS_CARD",
-            "DOCUMENTS",
-            "NO_DUES",
-            "KNOWLEDGE_TRANSFER"
-        ]
-        ALLOWED_STATUS = ["PENDING", "SUBMITTED"]
+    # fields that may be given once at the top level for every employee
+    SHARED_FIELDS = (
+        "resignation_date",
+        "last_working_date",
+        "reason_for_exit",
+        "additional_notes",
+        "checklist",
+    )
 
-        for item, status in checklist_data.items():
-            item = item.upper()
-            status = status.upper()
+    @extend_schema(
+        request=OffboardingBulkSerializer,
+        responses={201: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
+        tags=["Employee Offboarding"],
+        description=(
+            "Offboard many employees at once. Top-level fields are shared "
+            "defaults, per-employee values override them. Nothing is written "
+            "unless every employee is valid."
+        )
+    )
+    def post(self, request):
+        data = request.data
+        entries = data.get("employees")
 
-            if item not in ALLOWED_ITEMS:
-                return Response(
-                    {"error": f"Invalid checklist item: {item}"},
-                    status=400
-                )
+        if not isinstance(entries, list) or not entries:
+            return Response({"error": "employees list is required"}, status=400)
 
-            if status not in ALLOWED_STATUS:
-                return Response(
-                    {
-                        "error": (
-                            f"Invalid status '{status}' for {item}. "
-                            f"Allowed values: PENDING or SUBMITTED"
-                        )
-                    },
-                    status=400
+        shared = {
+            field: data[field]
+            for field in self.SHARED_FIELDS
+            if field in data
+        }
+
+        # 1️⃣ Validate every entry without touching the database
+        results, valid = [], []
+        seen = set()
+        for entry in entries:
+            if not isinstance(entry, dict):
+                entry = {"employee_id": entry}
+
+            serializer = OffboardingBulkItemSerializer(data={**shared, **entry})
+            if not serializer.is_valid():
+                results.append({
+                    "employee_id": entry.get("employee_id"),
+                    "status": "error",
+                    "errors": serializer.errors,
+                })
+                continue
+
+            item = serializer.validated_data
+            checklist, error = parse_checklist(item["checklist"])
+            errors = None
+            if error:
+                errors = {"checklist": [error]}
+            elif item["employee_id"] in seen:
+                errors = {"employee_id": ["Employee listed more than once"]}
+
+            if errors:
+                results.append({
+                    "employee_id": item["employee_id"],
+                    "status": "error",
+                    "errors": errors,
+                })
+                continue
+
+            seen.add(item["employee_id"])
+            item["checklist"] = checklist
+            results.append({"employee_id": item["employee_id"], "status": "valid"})
+            valid.append((results[-1], item))
+
+        # 2️⃣ One query for existence + existing offboardings
+        existing = dict(
+            self.scope_employees(Employee.objects.filter(id__in=seen))
+            .values_list("id", "offboarding__id")
+        )
+        for result, item in valid:
+            emp_id = item["employee_id"]
+            if emp_id not in existing:
+                result.update(status="error", errors={"employee_id": ["Employee not found"]})
+            elif existing[emp_id] is not None:
+                result.update(
+                    status="error",
+                    errors={"employee_id": ["Offboarding already exists for this employee"]}
                 )
 
-            OffboardingChecklist.objects.create(
-                offboarding=offboarding,
-                item=item,
-                status=status
+        if any(result["status"] == "error" for result in results):
+            return Response({"created": 0, "results": results}, status=400)
+
+        # 3️⃣ Write everything in one transaction with two bulk inserts
+        offboardings = [
+            EmployeeOffboarding(
+                employee_id=item["employee_id"],
+                resignation_date=item["resignation_date"],
+                last_working_date=item["last_working_date"],
+                reason_for_exit=item["reason_for_exit"],
+                additional_notes=item["additional_notes"],
+            )
+            for _, item in valid
+        ]
+        try:
+            with transaction.atomic():
+                EmployeeOffboarding.objects.bulk_create(offboardings)
+                OffboardingChecklist.objects.bulk_create([
+                    OffboardingChecklist(offboarding=offboarding, item=checklist_item, status=status)
+                    for offboarding, (_, item) in zip(offboardings, valid)
+                    for checklist_item, status in item["checklist"].items()
+                ])
+        except IntegrityError:
+            return Response(
+                {"error": "Offboarding already exists for one or more employees"},
+                status=409
+            )
+
+        # bulk_create sends no signals
+        bump_version(SETTLEMENT)
+        invalidate_headcount(*(offboarding.last_working_date for offboarding in offboardings))
+        for offboarding in offboardings:
+            publish_event({
+                "type": "offboarding",
+                "action": "created",
+                "id": offboarding.employee_id,
+            })
+
+        for offboarding, (result, item) in zip(offboardings, valid):
+            result.update(
+                status="created",
+                offboarding_id=offboarding.id,
+                checklist=item["checklist"],
             )
 
-        # 5️⃣ Success
-        return Response(
-            EmployeeOffboardingSerializer(offboarding).data,
-            status=201
+        return Response({"created": len(offboardings), "results": results}, status=201)
+
+
+# =================================================
+# OFFBOARDING DASHBOARD (IN-FLIGHT EXITS)
+# =================================================
+def offboarding_progress(queryset):
+    """Annotate checklist totals and completion percentage computed in SQL."""
+    return queryset.annotate(
+        total_items=Count("checklist"),
+        submitted_items=Count("checklist", filter=Q(checklist__status="SUBMITTED")),
+    ).annotate(
+        pending_items=F("total_items") - F("submitted_items"),
+        completion_percent=Case(
+            When(total_items=0, then=Value(100.0)),
+            default=Cast(F("submitted_items") * 100, FloatField()) / F("total_items"),
+            output_field=FloatField(),
+        ),
+    )
+
+
+class OffboardingDashboardPagination(PageNumberPagination):
+    page_size = 25
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+class OffboardingDashboardView(EmployeeScopeMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("last_working_date_from", OpenApiTypes.DATE, OpenApiParameter.QUERY),
+            OpenApiParameter("last_working_date_to", OpenApiTypes.DATE, OpenApiParameter.QUERY),
+            OpenApiParameter(
+                "pending", OpenApiTypes.BOOL, OpenApiParameter.QUERY,
+                description="true: only exits with pending checklist items, false: only fully cleared"
+            ),
+            OpenApiParameter(
+                "include_completed", OpenApiTypes.BOOL, OpenApiParameter.QUERY,
+                description="Include past exits whose checklist is fully submitted"
+            ),
+            OpenApiParameter("page", OpenApiTypes.INT, OpenApiParameter.QUERY),
+            OpenApiParameter("page_size", OpenApiTypes.INT, OpenApiParameter.QUERY),
+        ],
+        responses=OffboardingDashboardSerializer(many=True),
+        tags=["Employee Offboarding"],
+        description="Paginated in-flight offboardings with checklist progress"
+    )
+    def get(self, request):
+        params = request.query_params
+
+        qs = offboarding_progress(
+            self.scope_employees(EmployeeOffboarding.objects.all(), prefix="employee__")
+            .select_related("employee")
+            .prefetch_related("checklist")
+        )
+
+        date_filters = {}
+        for param, lookup in (
+            ("last_working_date_from", "last_working_date__gte"),
+            ("last_working_date_to", "last_working_date__lte"),
+        ):
+            if params.get(param):
+                try:
+                    date_filters[lookup] = date.fromisoformat(params[param])
+                except ValueError:
+                    return Response(
+                        {"error": f"{param} must be a date (YYYY-MM-DD)"},
+                        status=400
+                    )
+        qs = qs.filter(**date_filters)
+
+        pending = params.get("pending", "").lower()
+        if pending == "true":
+            qs = qs.filter(pending_items__gt=0)
+        elif pending == "false":
+            qs = qs.filter(pending_items=0)
+
+        # active = still working here or something left to collect
+        if params.get("include_completed", "").lower() != "true":
+            qs = qs.filter(
+                Q(last_working_date__gte=date.today()) | Q(pending_items__gt=0)
+            )
+
+        qs = qs.order_by("last_working_date", "id")
+
+        paginator = OffboardingDashboardPagination()
+        page = paginator.paginate_queryset(qs, request, view=self)
+        return paginator.get_paginated_response(
+            OffboardingDashboardSerializer(page, many=True).data
         )
 
+
 # =================================================
 # UPDATE OFFBOARDING CHECKLIST
 # =================================================
-class OffboardingChecklistUpdateView(APIView):
+class OffboardingChecklistUpdateView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     # ✅ GET CHECKLIST DETAILS USING checklist_id
@@ -730,6 +1138,8 @@ class OffboardingChecklistUpdateView(APIView):
                 {"error": "Checklist item not found"},
                 status=404
             )
+        if not self.in_scope(checklist_item.offboarding.employee_id):
+            return Response({"error": "Checklist item not found"}, status=404)
 
         # Fetch all checklist items for same offboarding
         checklist_qs = OffboardingChecklist.objects.filter(
@@ -745,40 +1155,180 @@ class OffboardingChecklistUpdateView(APIView):
             "checklist": checklist_data
         })
 
+
+# =================================================
+# BATCH CHECKLIST UPDATE
+# =================================================
+class OffboardingChecklistBulkUpdateView(EmployeeScopeMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        request=ChecklistBulkUpdateSerializer,
+        responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
+        tags=["Employee Offboarding"],
+        description=(
+            "Change the status of many checklist items at once, addressed by "
+            "checklist_id or by offboarding_id + item"
+        )
+    )
+    def patch(self, request):
+        changes = request.data.get("changes") if isinstance(request.data, dict) else request.data
+        if not isinstance(changes, list) or not changes:
+            return Response({"error": "changes list is required"}, status=400)
+
+        # 1️⃣ Validate shapes and choice values, no queries
+        results, valid = [], []
+        for change in changes:
+            serializer = ChecklistChangeSerializer(data=change if isinstance(change, dict) else {})
+            if serializer.is_valid():
+                results.append({"status": "valid"})
+                valid.append((results[-1], serializer.validated_data))
+            else:
+                results.append({"status": "error", "errors": serializer.errors})
+
+        # 2️⃣ Load every addressed row with one query
+        checklist_ids = {c["checklist_id"] for _, c in valid if c.get("checklist_id")}
+        offboarding_ids = {c["offboarding_id"] for _, c in valid if c.get("offboarding_id")}
+
+        rows = self.scope_employees(
+            OffboardingChecklist.objects.filter(
+                Q(id__in=checklist_ids) | Q(offboarding_id__in=offboarding_ids)
+            ),
+            prefix="offboarding__employee__"
+        ).only("id", "offboarding_id", "item", "status")
+
+        by_id, by_item = {}, {}
+        for row in rows:
+            by_id[row.id] = row
+            by_item[(row.offboarding_id, row.item)] = row
+
+        to_update = {}
+        for result, change in valid:
+            if change.get("checklist_id"):
+                row = by_id.get(change["checklist_id"])
+                result["checklist_id"] = change["checklist_id"]
+            else:
+                row = by_item.get((change["offboarding_id"], change["item"]))
+                result.update(offboarding_id=change["offboarding_id"], item=change["item"])
+
+            if row is None:
+                result.update(status="error", errors={"checklist": ["Checklist item not found"]})
+                continue
+
+            row.status = change["status"]
+            to_update[row.id] = row
+            result.update(
+                status="updated",
+                checklist_id=row.id,
+                offboarding_id=row.offboarding_id,
+                item=row.item,
+                new_status=row.status,
+            )
+
+        if any(result["status"] == "error" for result in results):
+            return Response({"updated": 0, "results": results}, status=400)
+
+        # 3️⃣ One UPDATE for the whole batch
+        with transaction.atomic():
+            OffboardingChecklist.objects.bulk_update(to_update.values(), ["status"])
+
+        progress = offboarding_progress(
+            EmployeeOffboarding.objects.filter(
+                id__in={row.offboarding_id for row in to_update.values()}
+            )
+        ).values(
+            "id", "employee_id", "total_items", "submitted_items",
+            "pending_items", "completion_percent"
+        )
+
+        return Response({
+            "updated": len(to_update),
+            "results": results,
+            "offboardings": [
+                {
+                    "offboarding_id": p["id"],
+                    "employee_id": p["employee_id"],
+                    "total_items": p["total_items"],
+                    "submitted_items": p["submitted_items"],
+                    "pending_items": p["pending_items"],
+                    "completion_percent": round(p["completion_percent"], 1),
+                }
+                for p in progress
+            ],
+        })
+
 # =================================================
 # DEACTIVATE EMPLOYEE
 # =================================================
-class EmployeeDeactivateView(APIView):
+class EmployeeDeactivateView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, pk):
+        if not self.in_scope(pk):
+            return Response({"error": "Employee not found"}, status=404)
         emp = Employee.objects.get(pk=pk)
         emp.status = "INACTIVE"
         emp.save()
 
         return Response({"message": "Employee deactivated"})
 
-class EmployeeFinalSettlementView(APIView):
+class EmployeeFinalSettlementView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
+    @extend_schema(
+        responses={200: OpenApiTypes.OBJECT, 404: OpenApiTypes.OBJECT},
+        tags=["Employee Offboarding"],
+        description="Final settlement computed from salary, tenure and offboarding dates"
+    )
     def get(self, request, pk):
-        pending_salary = 75000
-        leave_encashment = 25000
-        gratuity = 50000
-        deductions = 35000
+        if not self.in_scope(pk):
+            return Response({"error": "Employee not found"}, status=404)
 
-        total = pending_salary + leave_encashment + gratuity - deductions
+        cache_key = versioned_key(SETTLEMENT, "employee", pk)
+        data = cache.get(cache_key)
 
-        return Response({
-            "pending_salary": pending_salary,
-            "leave_encashment": leave_encashment,
-            "gratuity": gratuity,
-            "deductions": deductions,
-            "total_settlement": total
-        })
+        if data is None:
+            data = settlement_for_employee(pk)
+            if data is None:
+                return Response(
+                    {"error": "Offboarding not found for this employee"},
+                    status=404
+                )
+            cache.set(cache_key, data, SETTLEMENT_CACHE_TIMEOUT)
+
+        return Response(data)
+
+
+class EmployeeFinalSettlementBatchView(EmployeeScopeMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        responses={200: OpenApiTypes.OBJECT},
+        tags=["Employee Offboarding"],
+        description="Final settlements for every offboarded employee not yet deactivated"
+    )
+    def get(self, request):
+        scope = get_manager_scope(request.user)
+        cache_key = versioned_key(SETTLEMENT, "pending", scope)
+        data = cache.get(cache_key)
+
+        if data is None:
+            results = pending_settlements(
+                self.scope_employees(EmployeeOffboarding.objects.all(), prefix="employee__")
+            )
+            data = {
+                "count": len(results),
+                "total_payout": sum(
+                    (r["total_settlement"] for r in results), Decimal("0.00")
+                ),
+                "results": results,
+            }
+            cache.set(cache_key, data, SETTLEMENT_CACHE_TIMEOUT)
 
+        return Response(data)
 
-class EmployeeDocumentUploadView(APIView):
+
+class EmployeeDocumentUploadView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
@@ -802,6 +1352,8 @@ class EmployeeDocumentUploadView(APIView):
         responses=EmployeeDocumentSerializer
     )
     def post(self, request, emp_id):
+        if not self.in_scope(emp_id):
+            return Response({"error": "Employee not found"}, status=404)
         try:
             employee = Employee.objects.get(id=emp_id)
         except Employee.DoesNotExist:
@@ -818,11 +1370,13 @@ class EmployeeDocumentUploadView(APIView):
             status=201
         )
 
-class EmployeeDocumentListView(APIView):
+class EmployeeDocumentListView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, emp_id):
         # If there is no employee with this id, return 404 to make API behavior explicit
+        if not self.in_scope(emp_id):
+            return Response({"error": "Employee not found"}, status=404)
         try:
             Employee.objects.get(id=emp_id)
         except Employee.DoesNotExist:
@@ -837,7 +1391,7 @@ class EmployeeDocumentListView(APIView):
 # =================================================
 # UPDATE EMPLOYEE DOCUMENT (BY emp_id + document_type)
 # =================================================
-class EmployeeDocumentUpdateView(APIView):
+class EmployeeDocumentUpdateView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
@@ -872,6 +1426,8 @@ class EmployeeDocumentUpdateView(APIView):
             )
 
         # 1️⃣ Check employee
+        if not self.in_scope(emp_id):
+            return Response({"error": "Employee not found"}, status=404)
         try:
             employee = Employee.objects.get(id=emp_id)
         except Employee.DoesNotExist:
@@ -903,10 +1459,12 @@ class EmployeeDocumentUpdateView(APIView):
 
 
 
-class EmployeeDocumentDownloadByTypeView(APIView):
+class EmployeeDocumentDownloadByTypeView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, emp_id, document_type):
+        if not self.in_scope(emp_id):
+            return Response({"error": "Employee not found"}, status=404)
         try:
             document = EmployeeDocument.objects.get(
                 employee_id=emp_id,
@@ -938,15 +1496,27 @@ class EmployeeDocumentDownloadByTypeView(APIView):
 # ================================
 # BULK DELETE EMPLOYEES
 # ================================
-from .serializers import EmployeeBulkActionSerializer
+from .serializers import EmployeeBulkActionSerializer, EmployeeBulkExportSerializer
+from .export import EXPORT_FORMATS, STREAMERS
+from django.http import StreamingHttpResponse
+from .deletion import (
+    SYNC_DELETE_LIMIT,
+    delete_employees,
+    start_delete_job,
+    get_job as get_delete_job,
+)
 
-class EmployeeBulkDeleteView(APIView):
+class EmployeeBulkDeleteView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     @extend_schema(
         request=EmployeeBulkActionSerializer,
-        responses={200: OpenApiTypes.OBJECT},
-        description="Bulk delete selected employees"
+        responses={200: OpenApiTypes.OBJECT, 202: OpenApiTypes.OBJECT},
+        description=(
+            "Bulk delete selected employees. Small selections are deleted "
+            "right away; larger ones run in the background in chunks and "
+            "return a job_id to poll."
+        )
     )
     def post(self, request):
         employee_ids = request.data.get("employee_ids", [])
@@ -957,71 +1527,80 @@ class EmployeeBulkDeleteView(APIView):
                 status=400
             )
 
-        deleted_count, _ = Employee.objects.filter(
-            id__in=employee_ids
-        ).delete()
+        serializer = EmployeeBulkActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        employee_ids = set(serializer.validated_data["employee_ids"])
 
-        return Response({
-            "deleted_count": deleted_count
-        })
+        if get_manager_scope(request.user) is not UNRESTRICTED:
+            outside = employee_ids - set(
+                self.scope_employees(Employee.objects.filter(id__in=employee_ids))
+                .values_list("id", flat=True)
+            )
+            if outside:
+                return Response(
+                    {"error": "Employees not found", "employee_ids": sorted(outside)},
+                    status=404
+                )
+
+        if len(employee_ids) <= SYNC_DELETE_LIMIT:
+            return Response({
+                "deleted_count": delete_employees(employee_ids)
+            })
+
+        job = start_delete_job(employee_ids)
+        return Response(job, status=202)
+
+
+class EmployeeBulkDeleteStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        responses={200: OpenApiTypes.OBJECT, 404: OpenApiTypes.OBJECT},
+        description="Progress of a background bulk delete"
+    )
+    def get(self, request, job_id):
+        job = get_delete_job(job_id)
+        if job is None:
+            return Response({"error": "Delete job not found"}, status=404)
+        return Response(job)
 
 # ================================
 # BULK EXPORT EMPLOYEES (CSV)
 # ================================
-class EmployeeBulkExportView(APIView):
+class EmployeeBulkExportView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     @extend_schema(
-        request=EmployeeBulkActionSerializer,
-        responses={200: OpenApiTypes.BINARY},
-        description="Export selected employees as CSV"
+        request=EmployeeBulkExportSerializer,
+        responses={200: OpenApiTypes.BINARY, 400: OpenApiTypes.OBJECT},
+        description=(
+            "Stream employees as CSV or NDJSON. Select them by employee_ids "
+            "and/or the list endpoint's search and filters; with neither, "
+            "every employee visible to the caller is exported."
+        )
     )
     def post(self, request):
-        employee_ids = request.data.get("employee_ids", [])
-
-        if not employee_ids:
-            return Response(
-                {"error": "employee_ids is required"},
-                status=400
-            )
+        serializer = EmployeeBulkExportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
 
-        employees = Employee.objects.filter(id__in=employee_ids)
+        qs = filter_employees(self.scope_employees(Employee.objects.all()), data)
+        if data.get("employee_ids"):
+            qs = qs.filter(id__in=data["employee_ids"])
+        qs = qs.order_by("employee_code")
 
-        response = HttpResponse(content_type="text/csv")
+        output = data["output"]
+        response = StreamingHttpResponse(
+            STREAMERS[output](qs, data["columns"]),
+            content_type=EXPORT_FORMATS[output]
+        )
         response["Content-Disposition"] = (
-            "attachment; filename=selected_employees.csv"
+            f"attachment; filename=selected_employees.{output}"
         )
-
-        writer = csv.writer(response)
-        writer.writerow([
-            "ID",
-            "Employee Code",
-            "First Name",
-            "Last Name",
-            "Email",
-            "Department",
-            "Designation",
-            "Location",
-            "Status",
-        ])
-
-        for emp in employees:
-            writer.writerow([
-                emp.id,
-                emp.employee_code,
-                emp.first_name,
-                emp.last_name,
-                emp.email,
-                emp.department,
-                emp.designation,
-                emp.location,
-                emp.status,
-            ])
-
         return response
 
 
-class EmployeeSalarySlipDownloadView(APIView):
+class EmployeeSalarySlipDownloadView(EmployeeScopeMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     @extend_schema(
@@ -1037,6 +1616,8 @@ class EmployeeSalarySlipDownloadView(APIView):
         description="Download employee salary slip as PDF"
     )
     def get(self, request, id):
+        if not self.in_scope(id):
+            return Response({"error": "Employee not found"}, status=404)
         try:
             employee = Employee.objects.get(pk=id)
         except Employee.DoesNotExist:
@@ -1076,7 +1657,7 @@ class EmployeeSalarySlipDownloadView(APIView):
         y -= 18
         p.drawString(50, y, f"Designation: {employee.designation}")
         y -= 18
-        p.drawString(50, y, f"Department: {employee.department}")
+        p.drawString(50, y, f"Department: {departments.name(employee.department_id)}")
         y -= 30
 
         # ---- SALARY DETAILS ----
@@ -1099,3 +1680,1008 @@ class EmployeeSalarySlipDownloadView(APIView):
         p.showPage()
         p.save()
         return response
+
+
+# =================================================
+# ORG CHART (REPORTEE SUBTREE + CHAIN UP)
+# =================================================
+from .hierarchy import build_org_chart
+
+ORG_CHART_CACHE_TIMEOUT = 60 * 10
+
+
+class EmployeeOrgChartView(EmployeeScopeMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    DEFAULT_DEPTH = 3
+    MAX_DEPTH = 10
+    DEFAULT_BREADTH = 50
+    MAX_BREADTH = 200
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="depth",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Levels of reportees to return (default 3, max 10)"
+            ),
+            OpenApiParameter(
+                name="breadth",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Direct reportees returned per manager (default 50, max 200)"
+            ),
+        ],
+        responses={200: OpenApiTypes.OBJECT},
+        tags=["Employee"],
+        description="Reportee subtree, management chain and subtree headcounts"
+    )
+    def get(self, request, pk):
+        if not self.in_scope(pk):
+            return Response({"error": "Employee not found"}, status=404)
+
+        try:
+            depth = int(request.query_params.get("depth", self.DEFAULT_DEPTH))
+            breadth = int(request.query_params.get("breadth", self.DEFAULT_BREADTH))
+        except ValueError:
+            return Response(
+                {"error": "depth and breadth must be integers"},
+                status=400
+            )
+
+        depth = max(0, min(depth, self.MAX_DEPTH))
+        breadth = max(1, min(breadth, self.MAX_BREADTH))
+
+        cache_key = versioned_key(HIERARCHY, "org-chart", pk, depth, breadth)
+        data = cache.get(cache_key)
+
+        if data is None:
+            data = build_org_chart(pk, depth, breadth)
+            if data is None:
+                return Response({"error": "Employee not found"}, status=404)
+            cache.set(cache_key, data, ORG_CHART_CACHE_TIMEOUT)
+
+        return Response(data)
+
+
+# =================================================
+# PAYROLL RUNS
+# =================================================
+from .models import PayrollRun
+from .payroll import run_payroll
+from .serializers import (
+    PayrollRunCreateSerializer,
+    PayrollRunSerializer,
+    PayrollResultSerializer,
+)
+
+
+class PayrollResultPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class PayrollRunListCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        responses=PayrollRunSerializer(many=True),
+        tags=["Payroll"],
+        description="Payroll runs, latest first"
+    )
+    def get(self, request):
+        if get_manager_scope(request.user) is not UNRESTRICTED:
+            return Response({"error": "Access denied"}, status=403)
+
+        runs = PayrollRun.objects.order_by("-started_at", "-id")
+        return Response(PayrollRunSerializer(runs, many=True).data)
+
+    @extend_schema(
+        request=PayrollRunCreateSerializer,
+        responses={201: PayrollRunSerializer, 400: OpenApiTypes.OBJECT, 403: OpenApiTypes.OBJECT},
+        tags=["Payroll"],
+        description=(
+            "Run payroll for a month. Employees unchanged since the last "
+            "completed run keep their figures, the rest are recomputed."
+        )
+    )
+    def post(self, request):
+        if get_manager_scope(request.user) is not UNRESTRICTED:
+            return Response({"error": "Access denied"}, status=403)
+
+        serializer = PayrollRunCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        run = run_payroll(serializer.validated_data["period"])
+        return Response(PayrollRunSerializer(run).data, status=201)
+
+
+class PayrollRunDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        responses={200: PayrollRunSerializer, 404: OpenApiTypes.OBJECT},
+        tags=["Payroll"],
+        description="Payroll run summary"
+    )
+    def get(self, request, pk):
+        if get_manager_scope(request.user) is not UNRESTRICTED:
+            return Response({"error": "Access denied"}, status=403)
+
+        run = PayrollRun.objects.filter(pk=pk).first()
+        if run is None:
+            return Response({"error": "Payroll run not found"}, status=404)
+
+        return Response(PayrollRunSerializer(run).data)
+
+
+class PayrollRunResultsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("page", OpenApiTypes.INT, OpenApiParameter.QUERY),
+            OpenApiParameter("page_size", OpenApiTypes.INT, OpenApiParameter.QUERY),
+        ],
+        responses=PayrollResultSerializer(many=True),
+        tags=["Payroll"],
+        description="Per-employee figures of a payroll run"
+    )
+    def get(self, request, pk):
+        if get_manager_scope(request.user) is not UNRESTRICTED:
+            return Response({"error": "Access denied"}, status=403)
+
+        run = PayrollRun.objects.filter(pk=pk).first()
+        if run is None:
+            return Response({"error": "Payroll run not found"}, status=404)
+
+        qs = (
+            run.results
+            .select_related("employee")
+            .order_by("employee_id")
+        )
+
+        paginator = PayrollResultPagination()
+        page = paginator.paginate_queryset(qs, request, view=self)
+        return paginator.get_paginated_response(
+            PayrollResultSerializer(page, many=True).data
+        )
+
+
+# =================================================
+# EMPLOYEE CHANGE FEED (INCREMENTAL SYNC)
+# =================================================
+from .changefeed import (
+    DEFAULT_PAGE_SIZE as CHANGE_FEED_PAGE_SIZE,
+    MAX_PAGE_SIZE as CHANGE_FEED_MAX_PAGE_SIZE,
+    InvalidCursor,
+    employee_changes,
+)
+
+
+class EmployeeChangeFeedView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "cursor", OpenApiTypes.STR, OpenApiParameter.QUERY,
+                description="next_cursor of the previous page, omit for a full sync"
+            ),
+            OpenApiParameter(
+                "limit", OpenApiTypes.INT, OpenApiParameter.QUERY,
+                description="Max upserts and max deletes per page (default 500, max 5000)"
+            ),
+        ],
+        responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT, 403: OpenApiTypes.OBJECT},
+        tags=["Employee"],
+        description=(
+            "Employees created or updated and employees deleted since the "
+            "cursor. Keep calling with next_cursor while has_more is true."
+        )
+    )
+    def get(self, request):
+        if get_manager_scope(request.user) is not UNRESTRICTED:
+            return Response({"error": "Access denied"}, status=403)
+
+        try:
+            limit = int(request.query_params.get("limit", CHANGE_FEED_PAGE_SIZE))
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=400)
+        limit = max(1, min(limit, CHANGE_FEED_MAX_PAGE_SIZE))
+
+        try:
+            employees, tombstones, next_cursor, has_more = employee_changes(
+                request.query_params.get("cursor"),
+                limit,
+                Employee.objects.select_related("reporting_manager"),
+            )
+        except InvalidCursor as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        return Response({
+            "upserts": EmployeeSerializer(employees, many=True).data,
+            "deletes": [
+                {
+                    "id": t.employee_id,
+                    "employee_code": t.employee_code,
+                    "deleted_at": t.deleted_at,
+                }
+                for t in tombstones
+            ],
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+        })
+
+
+# =================================================
+# LIVE EMPLOYEE EVENTS (SERVER-SENT EVENTS, ASGI)
+# =================================================
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+from .events import event_stream
+
+
+def _event_stream_user(request):
+    """
+    JWT from the Authorization header, or from ?token= since browsers'
+    EventSource cannot send headers. Returns (user, error response).
+    """
+    auth = JWTAuthentication()
+    raw_token = request.GET.get("token")
+    try:
+        if raw_token:
+            validated = auth.get_validated_token(raw_token.encode())
+            user = auth.get_user(validated)
+        else:
+            result = auth.authenticate(request)
+            if result is None:
+                return None, JsonResponse(
+                    {"error": "Authentication credentials were not provided"},
+                    status=401
+                )
+            user = result[0]
+    except (InvalidToken, AuthenticationFailed):
+        return None, JsonResponse({"error": "Invalid or expired token"}, status=401)
+
+    if get_manager_scope(user) is not UNRESTRICTED:
+        return None, JsonResponse({"error": "Access denied"}, status=403)
+    return user, None
+
+
+@require_GET
+async def employee_events_view(request):
+    _, error = await sync_to_async(_event_stream_user)(request)
+    if error:
+        return error
+
+    response = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+# =================================================
+# EMPLOYEE PROFILE (ALL TABS IN ONE RESPONSE)
+# =================================================
+from django.core.exceptions import ObjectDoesNotExist
+
+
+class EmployeeProfileView(EmployeeScopeMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    SECTIONS = ["employee", "overview", "job", "salary", "documents", "offboarding"]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "include", OpenApiTypes.STR, OpenApiParameter.QUERY,
+                description=(
+                    "Comma separated sections: employee, overview, job, salary, "
+                    "documents, offboarding (default: all)"
+                )
+            ),
+        ],
+        responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT, 404: OpenApiTypes.OBJECT},
+        tags=["Employee"],
+        description="Employee record and profile tabs in one response, at most three queries"
+    )
+    def get(self, request, pk):
+        if not self.in_scope(pk):
+            return Response({"error": "Employee not found"}, status=404)
+
+        include = request.query_params.get("include")
+        if include:
+            sections = [s.strip() for s in include.split(",") if s.strip()]
+            unknown = [s for s in sections if s not in self.SECTIONS]
+            if unknown:
+                return Response(
+                    {"error": f"Unknown include: {', '.join(unknown)}. "
+                              f"Allowed: {', '.join(self.SECTIONS)}"},
+                    status=400
+                )
+        else:
+            sections = self.SECTIONS
+
+        # 1️⃣ employee (+ manager, + offboarding) in one joined query
+        qs = Employee.objects.all()
+        if "employee" in sections or "job" in sections:
+            qs = qs.select_related("reporting_manager")
+        if "offboarding" in sections:
+            qs = qs.select_related("offboarding").prefetch_related("offboarding__checklist")
+        # 2️⃣ / 3️⃣ documents and checklist, one query each
+        if "documents" in sections:
+            qs = qs.prefetch_related("documents")
+
+        employee = qs.filter(pk=pk).first()
+        if employee is None:
+            return Response({"error": "Employee not found"}, status=404)
+
+        data = {"id": employee.pk}
+        if "employee" in sections:
+            data["employee"] = EmployeeSerializer(employee).data
+        if "overview" in sections:
+            data["overview"] = EmployeeOverviewSerializer(employee).data
+        if "job" in sections:
+            data["job"] = EmployeeJobSerializer(employee).data
+        if "salary" in sections:
+            data["salary"] = EmployeeSalarySerializer(employee).data
+        if "documents" in sections:
+            data["documents"] = EmployeeDocumentSerializer(
+                employee.documents.all(), many=True
+            ).data
+        if "offboarding" in sections:
+            try:
+                offboarding = employee.offboarding
+            except ObjectDoesNotExist:
+                offboarding = None
+            data["offboarding"] = (
+                EmployeeOffboardingSerializer(offboarding).data if offboarding else None
+            )
+
+        return Response(data)
+
+
+# =================================================
+# EMPLOYEE BULK PATCH (REORGANIZATIONS)
+# =================================================
+from collections import defaultdict
+from django.utils import timezone
+from .events import combine_stats, stats_delta
+from .hierarchy import HierarchyCycleError, cycle_members, refresh_subtrees
+from .serializers import (
+    CYCLE_ERROR,
+    EmployeeChangesSerializer,
+    EmployeeBulkPatchSerializer,
+    EmployeeBulkPatchItemSerializer,
+)
+from .signals import (
+    HEADCOUNT_FIELDS, ORG_CHART_FIELDS, SALARY_FIELDS, SETTLEMENT_FIELDS, STATS_FIELDS,
+)
+
+# ids per published event, keeps NOTIFY payloads well under 8000 bytes
+BULK_EVENT_CHUNK_SIZE = 500
+
+
+def _name_key(name):
+    parts = " ".join(name.split()).lower().split(" ", 1)
+    return parts[0], parts[1] if len(parts) > 1 else None
+
+
+def resolve_managers(names):
+    """
+    Match full names the way the single-employee update does (first name,
+    plus last name when given, case-insensitive, lowest id wins) with one
+    query. Returns {name: employee id} for the names that matched.
+    """
+    keys = {name: _name_key(name) for name in names}
+    condition = Q()
+    for first, last in set(keys.values()):
+        q = Q(iexact("first_name", first))
+        if last:
+            q &= iexact("last_name", last)
+        condition |= q
+    if not condition:
+        return {}
+
+    matches = {}
+    for emp_id, first, last in (
+        Employee.objects.filter(condition)
+        .order_by("id")
+        .values_list("id", "first_name", "last_name")
+    ):
+        first, last = first.lower(), (last or "").lower()
+        for key in ((first, last), (first, None)):
+            matches.setdefault(key, emp_id)
+    return {name: matches[key] for name, key in keys.items() if key in matches}
+
+
+# dimension id columns reported under their API names
+DIMENSION_COLUMNS = {"department_id": "department", "location_id": "location"}
+
+
+class EmployeeBulkPatchView(EmployeeScopeMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        request=EmployeeBulkPatchSerializer,
+        responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
+        tags=["Employee"],
+        description=(
+            "Change job fields or the reporting manager of many employees at "
+            "once. All items are applied or none."
+        )
+    )
+    def patch(self, request):
+        items = request.data.get("items") if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({"error": "items list is required"}, status=400)
+
+        # 1️⃣ Validate shapes and choice values, no queries
+        results, valid, seen = [], [], set()
+        for item in items:
+            serializer = EmployeeBulkPatchItemSerializer(data=item if isinstance(item, dict) else {})
+            if not serializer.is_valid():
+                results.append({"status": "error", "errors": serializer.errors})
+                continue
+            data = serializer.validated_data
+            if data["id"] in seen:
+                results.append({
+                    "id": data["id"],
+                    "status": "error",
+                    "errors": {"id": ["Duplicate employee in this batch"]},
+                })
+                continue
+            seen.add(data["id"])
+            results.append({"id": data["id"], "status": "valid"})
+            valid.append((results[-1], data["id"], dict(data["changes"])))
+
+        # 2️⃣ One query for the employees, one for every manager name
+        employees = {
+            emp.id: emp
+            for emp in self.scope_employees(Employee.objects.filter(id__in=seen))
+            .only("id", *EmployeeChangesSerializer.Meta.fields)
+        }
+        managers = resolve_managers({
+            changes["reporting_manager"]
+            for _, _, changes in valid
+            if changes.get("reporting_manager")
+        })
+
+        for result, emp_id, changes in valid:
+            if emp_id not in employees:
+                result.update(status="error", errors={"id": ["Employee not found"]})
+                continue
+            if "reporting_manager" not in changes:
+                continue
+            name = changes.pop("reporting_manager")
+            if not name:
+                changes["reporting_manager_id"] = None
+            elif name not in managers:
+                result.update(status="error", errors={"reporting_manager": ["Reporting manager not found"]})
+            elif managers[name] == emp_id:
+                result.update(status="error", errors={"reporting_manager": [CYCLE_ERROR]})
+            else:
+                changes["reporting_manager_id"] = managers[name]
+
+        if any(result["status"] == "error" for result in results):
+            return Response({"updated": 0, "results": results}, status=400)
+
+        # 3️⃣ Apply in memory, group rows by the set of columns they change
+        now = timezone.now()
+        groups = defaultdict(list)
+        moved, changed_columns, deltas = [], set(), []
+        for result, emp_id, changes in valid:
+            employee = employees[emp_id]
+            before = {field: getattr(employee, field) for field in STATS_FIELDS}
+            changed = {
+                column for column, value in changes.items()
+                if getattr(employee, column) != value
+            }
+            for column, value in changes.items():
+                setattr(employee, column, value)
+            employee.updated_at = now
+
+            if "reporting_manager_id" in changed:
+                moved.append(emp_id)
+            changed_columns |= changed
+            deltas.append((emp_id, changed, before, employee))
+            groups[tuple(sorted(changes)) + ("updated_at", "change_seq")].append(employee)
+            result.update(
+                status="updated",
+                changed=sorted(DIMENSION_COLUMNS.get(column, column) for column in changes),
+            )
+
+        # 4️⃣ One UPDATE per column set; a manager loop rolls everything back
+        try:
+            with transaction.atomic():
+                seq = next_change_seq()
+                for _, emp_id, changes in valid:
+                    create_missing_dimensions(changes)
+                    for column in DIMENSION_COLUMNS.keys() & changes.keys():
+                        setattr(employees[emp_id], column, changes[column])
+                for columns, rows in groups.items():
+                    for employee in rows:
+                        employee.change_seq = seq
+                    Employee.objects.bulk_update(rows, columns)
+                refresh_subtrees(moved)
+        except HierarchyCycleError:
+            # blame the items whose new manager closes the loop
+            cycle = cycle_members({
+                emp_id: employees[emp_id].reporting_manager_id for emp_id in moved
+            })
+            for result in results:
+                result.pop("changed", None)
+                if result["id"] in cycle:
+                    result.update(status="error", errors={"reporting_manager": [CYCLE_ERROR]})
+                else:
+                    result["status"] = "valid"
+            if not cycle:
+                return Response(
+                    {"updated": 0, "error": CYCLE_ERROR, "results": results}, status=400
+                )
+            return Response({"updated": 0, "results": results}, status=400)
+
+        # bulk_update sends no signals
+        if changed_columns & ORG_CHART_FIELDS:
+            bump_version(HIERARCHY)
+        if changed_columns & SETTLEMENT_FIELDS:
+            bump_version(SETTLEMENT)
+        if changed_columns & HEADCOUNT_FIELDS:
+            invalidate_headcount()
+        if changed_columns & SALARY_FIELDS:
+            invalidate_salaries()
+        invalidate_employees([emp_id for emp_id, changed, _, _ in deltas if changed])
+
+        for start in range(0, len(deltas), BULK_EVENT_CHUNK_SIZE):
+            chunk = [d for d in deltas[start:start + BULK_EVENT_CHUNK_SIZE] if d[1]]
+            if not chunk:
+                continue
+            publish_event({
+                "type": "employee",
+                "action": "bulk_updated",
+                "ids": [emp_id for emp_id, _, _, _ in chunk],
+                "changed": sorted(set().union(*(changed for _, changed, _, _ in chunk))),
+                "stats": combine_stats(
+                    stats_delta(before, {f: getattr(employee, f) for f in STATS_FIELDS})
+                    for _, _, before, employee in chunk
+                ),
+            })
+
+        return Response({"updated": len(valid), "results": results})
+
+
+# =================================================
+# MASS SALARY REVISIONS (APPRAISALS)
+# =================================================
+from .models import SalaryRevision
+from .revisions import apply_revision, preview_revision, revision_queryset
+from .serializers import (
+    SalaryRevisionRequestSerializer,
+    SalaryRevisionSerializer,
+    SalaryRevisionEntrySerializer,
+)
+
+
+def _revision_request(request):
+    """Validated request plus the queryset it targets, or an error Response."""
+    if get_manager_scope(request.user) is not UNRESTRICTED:
+        return None, None, Response({"error": "Access denied"}, status=403)
+
+    serializer = SalaryRevisionRequestSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+
+    filters = data["filters"]
+    qs = filter_employees(Employee.objects.all(), filters)
+    if filters.get("employee_ids"):
+        qs = qs.filter(id__in=filters["employee_ids"])
+
+    qs = revision_queryset(qs, data["rules"], data.get("default_percent"))
+    return data, qs, None
+
+
+class SalaryRevisionPreviewView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        request=SalaryRevisionRequestSerializer,
+        responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT, 403: OpenApiTypes.OBJECT},
+        tags=["Payroll"],
+        description="Dry run: impacted headcount and payroll delta of a salary revision"
+    )
+    def post(self, request):
+        data, qs, error = _revision_request(request)
+        if error:
+            return error
+        return Response(preview_revision(qs, data["fields"]))
+
+
+class SalaryRevisionListCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        responses=SalaryRevisionSerializer(many=True),
+        tags=["Payroll"],
+        description="Applied salary revisions, latest first"
+    )
+    def get(self, request):
+        if get_manager_scope(request.user) is not UNRESTRICTED:
+            return Response({"error": "Access denied"}, status=403)
+
+        revisions = SalaryRevision.objects.order_by("-created_at", "-id")
+        return Response(SalaryRevisionSerializer(revisions, many=True).data)
+
+    @extend_schema(
+        request=SalaryRevisionRequestSerializer,
+        responses={201: SalaryRevisionSerializer, 400: OpenApiTypes.OBJECT, 403: OpenApiTypes.OBJECT},
+        tags=["Payroll"],
+        description=(
+            "Apply a salary revision: one INSERT ... SELECT into the revision "
+            "history and one UPDATE of every impacted employee"
+        )
+    )
+    def post(self, request):
+        data, qs, error = _revision_request(request)
+        if error:
+            return error
+
+        revision = apply_revision(
+            qs,
+            data["fields"],
+            user=request.user,
+            # stored as sent, JSONField cannot hold Decimals
+            criteria=request.data.get("filters") or {},
+            rules={
+                "rules": request.data.get("rules") or [],
+                "default_percent": request.data.get("default_percent"),
+            },
+        )
+
+        # the UPDATE sends no signals
+        bump_version(SETTLEMENT)
+        invalidate_all_employees()
+        invalidate_salaries()
+        publish_event({
+            "type": "employee",
+            "action": "bulk_updated",
+            "revision": revision.id,
+            "count": revision.employee_count,
+            "changed": sorted(data["fields"]),
+        })
+
+        return Response(SalaryRevisionSerializer(revision).data, status=201)
+
+
+class SalaryRevisionEntriesView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("page", OpenApiTypes.INT, OpenApiParameter.QUERY),
+            OpenApiParameter("page_size", OpenApiTypes.INT, OpenApiParameter.QUERY),
+        ],
+        responses=SalaryRevisionEntrySerializer(many=True),
+        tags=["Payroll"],
+        description="Before / after salaries of every employee in a revision"
+    )
+    def get(self, request, pk):
+        if get_manager_scope(request.user) is not UNRESTRICTED:
+            return Response({"error": "Access denied"}, status=403)
+
+        revision = SalaryRevision.objects.filter(pk=pk).first()
+        if revision is None:
+            return Response({"error": "Salary revision not found"}, status=404)
+
+        qs = revision.entries.select_related("employee").order_by("employee_id")
+        paginator = PayrollResultPagination()
+        page = paginator.paginate_queryset(qs, request, view=self)
+        return paginator.get_paginated_response(
+            SalaryRevisionEntrySerializer(page, many=True).data
+        )
+
+
+# =================================================
+# EMPLOYEE CACHE METRICS
+# =================================================
+from django.conf import settings
+from .caching import bus, cache_metrics
+
+
+class EmployeeCacheMetricsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        responses=OpenApiTypes.OBJECT,
+        description=(
+            "Hit / miss counters of the per-employee cache, per view, and "
+            "invalidation bus state and lag for the worker that answers"
+        )
+    )
+    def get(self, request):
+        if get_manager_scope(request.user) is not UNRESTRICTED:
+            return Response({"error": "Access denied"}, status=403)
+
+        return Response({
+            "backend": settings.CACHES["default"]["BACKEND"].rsplit(".", 1)[-1],
+            "views": cache_metrics(),
+            "invalidation": bus.metrics(),
+        })
+
+
+# =================================================
+# EMPLOYEE ANALYTICS
+# =================================================
+import hashlib
+import json
+
+from .analytics import CUBE_DIMENSIONS, CUBE_MEASURES, CUBE_TOTALS, employee_cube
+from .caching import EMPLOYEE_TABLE
+
+ANALYTICS_CACHE_TIMEOUT = 60 * 60
+ANALYTICS_FILTERS = ["search", *EMPLOYEE_FILTER_FIELDS]
+
+
+def parse_names(params, param, allowed, default):
+    """
+    Read a comma separated ?param= list, `default` when absent.
+    Returns (names, None) or (None, error message).
+    """
+    names = [name.strip() for name in params.get(param, "").split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        return None, f"Unknown {param}: {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+    return list(dict.fromkeys(names)) or default, None
+
+
+def analytics_key(name, scope, *parts):
+    """Cache key for a whole-table result, request parts hashed to stay key safe."""
+    digest = hashlib.sha1(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+    return versioned_key(EMPLOYEE_TABLE, name, scope, digest)
+
+
+class EmployeeCubeView(EmployeeScopeMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    DEFAULT_DIMENSIONS = ["department"]
+    DEFAULT_MEASURES = ["headcount", "annual_ctc_sum"]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "dimensions", OpenApiTypes.STR, OpenApiParameter.QUERY,
+                description=f"Comma separated, any of {', '.join(CUBE_DIMENSIONS)} (default department)"
+            ),
+            OpenApiParameter(
+                "measures", OpenApiTypes.STR, OpenApiParameter.QUERY,
+                description=(
+                    "Comma separated, headcount or <salary field>_<sum|avg|min|max> "
+                    "(default headcount,annual_ctc_sum)"
+                )
+            ),
+            OpenApiParameter(
+                "totals", OpenApiTypes.STR, OpenApiParameter.QUERY, enum=list(CUBE_TOTALS),
+                description="; ".join(f"{name}: {text}" for name, text in CUBE_TOTALS.items())
+            ),
+            OpenApiParameter("search", OpenApiTypes.STR, OpenApiParameter.QUERY),
+            OpenApiParameter("department", OpenApiTypes.STR, OpenApiParameter.QUERY),
+            OpenApiParameter("status", OpenApiTypes.STR, OpenApiParameter.QUERY),
+            OpenApiParameter("location", OpenApiTypes.STR, OpenApiParameter.QUERY),
+        ],
+        responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
+        tags=["Analytics"],
+        description=(
+            "Headcount and salary aggregates across any combination of dimensions, "
+            "with subtotals. A dimension missing from a cell means all of its values."
+        )
+    )
+    def get(self, request):
+        params = request.query_params
+
+        dimensions, error = parse_names(params, "dimensions", CUBE_DIMENSIONS, self.DEFAULT_DIMENSIONS)
+        if error:
+            return Response({"error": error}, status=400)
+        measures, error = parse_names(params, "measures", CUBE_MEASURES, self.DEFAULT_MEASURES)
+        if error:
+            return Response({"error": error}, status=400)
+        totals = params.get("totals", "cube")
+        if totals not in CUBE_TOTALS:
+            return Response({"error": f"totals must be one of {', '.join(CUBE_TOTALS)}"}, status=400)
+
+        filters = {name: params[name] for name in ANALYTICS_FILTERS if params.get(name)}
+        scope = get_manager_scope(request.user)
+        cache_key = analytics_key("cube", scope, dimensions, measures, totals, filters)
+        data = cache.get(cache_key)
+
+        if data is None:
+            qs = filter_employees(self.scope_employees(Employee.objects.all()), filters)
+            data = {
+                "dimensions": dimensions,
+                "measures": measures,
+                "totals": totals,
+                "filters": filters,
+                "cells": employee_cube(qs, dimensions, measures, totals),
+            }
+            cache.set(cache_key, data, ANALYTICS_CACHE_TIMEOUT)
+
+        return Response(data)
+
+
+from .analytics import (
+    INTERVALS, headcount_series, period_start, period_starts, previous_period, series_payload,
+)
+from .caching import HEADCOUNT
+
+# memoized closed periods, dropped when an edit reaches back into them
+HEADCOUNT_MEMO_TIMEOUT = 60 * 60 * 24 * 7
+
+
+class EmployeeHeadcountSeriesView(EmployeeScopeMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    DEFAULT_PERIODS = 12
+    MAX_PERIODS = 260
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "interval", OpenApiTypes.STR, OpenApiParameter.QUERY, enum=list(INTERVALS),
+                description="month (default) or week (Monday to Sunday)"
+            ),
+            OpenApiParameter(
+                "start", OpenApiTypes.DATE, OpenApiParameter.QUERY,
+                description="Any day of the first period (default: 12 periods back from end)"
+            ),
+            OpenApiParameter(
+                "end", OpenApiTypes.DATE, OpenApiParameter.QUERY,
+                description="Any day of the last period (default: today)"
+            ),
+        ],
+        responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
+        tags=["Analytics"],
+        description=(
+            "Closing headcount, joiners and leavers per period, in total and per "
+            "department, from join dates and offboarding last working dates"
+        )
+    )
+    def get(self, request):
+        params = request.query_params
+
+        interval = params.get("interval", "month")
+        if interval not in INTERVALS:
+            return Response({"error": f"interval must be one of {', '.join(INTERVALS)}"}, status=400)
+
+        today = date.today()
+        try:
+            end = date.fromisoformat(params["end"]) if params.get("end") else today
+            start = date.fromisoformat(params["start"]) if params.get("start") else None
+        except ValueError:
+            return Response({"error": "start and end must be dates (YYYY-MM-DD)"}, status=400)
+
+        if start is None:
+            start = period_start(end, interval)
+            for _ in range(self.DEFAULT_PERIODS - 1):
+                start = previous_period(start, interval)
+        if start > end:
+            return Response({"error": "start must not be after end"}, status=400)
+
+        starts = period_starts(start, end, interval)
+        if len(starts) > self.MAX_PERIODS:
+            return Response(
+                {"error": f"At most {self.MAX_PERIODS} periods per request"},
+                status=400
+            )
+
+        memo_key = versioned_key(HEADCOUNT, "series", get_manager_scope(request.user), interval)
+        memo = cache.get(memo_key) or {}
+        memoized = len(memo)
+
+        figures = headcount_series(
+            self.scope_employees(Employee.objects.all()),
+            self.scope_employees(EmployeeOffboarding.objects.all(), prefix="employee__"),
+            starts, interval, memo, today,
+        )
+        if len(memo) != memoized:
+            cache.set(memo_key, memo, HEADCOUNT_MEMO_TIMEOUT)
+
+        return Response(series_payload(starts, interval, figures, today))
+
+
+from .analytics import DEFAULT_PERCENTILES, SALARY_COLUMNS, salary_distribution
+from .caching import SALARY
+
+# bumped by every change the result depends on, the timeout only frees memory
+SALARY_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class EmployeeSalaryDistributionView(EmployeeScopeMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    DEFAULT_GROUP_BY = ["department", "designation"]
+    DEFAULT_BINS = 20
+    MAX_BINS = 200
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "field", OpenApiTypes.STR, OpenApiParameter.QUERY, enum=SALARY_COLUMNS,
+                description="Salary column (default annual_ctc)"
+            ),
+            OpenApiParameter(
+                "group_by", OpenApiTypes.STR, OpenApiParameter.QUERY,
+                description=(
+                    f"Comma separated, any of {', '.join(CUBE_DIMENSIONS)} "
+                    "(default department,designation)"
+                )
+            ),
+            OpenApiParameter(
+                "percentiles", OpenApiTypes.STR, OpenApiParameter.QUERY,
+                description=(
+                    "Comma separated numbers from 0 to 100 "
+                    f"(default {','.join(map(str, DEFAULT_PERCENTILES))})"
+                )
+            ),
+            OpenApiParameter(
+                "bins", OpenApiTypes.INT, OpenApiParameter.QUERY,
+                description=f"Histogram bins, 1 to {MAX_BINS} (default {DEFAULT_BINS})"
+            ),
+            OpenApiParameter("department", OpenApiTypes.STR, OpenApiParameter.QUERY),
+            OpenApiParameter("status", OpenApiTypes.STR, OpenApiParameter.QUERY),
+            OpenApiParameter("location", OpenApiTypes.STR, OpenApiParameter.QUERY),
+        ],
+        responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
+        tags=["Analytics"],
+        description=(
+            "Salary percentiles, median and histogram in total and per group. "
+            "Every histogram uses the same bin_edges."
+        )
+    )
+    def get(self, request):
+        params = request.query_params
+
+        field = params.get("field", "annual_ctc")
+        if field not in SALARY_COLUMNS:
+            return Response({"error": f"field must be one of {', '.join(SALARY_COLUMNS)}"}, status=400)
+        group_by, error = parse_names(params, "group_by", CUBE_DIMENSIONS, self.DEFAULT_GROUP_BY)
+        if error:
+            return Response({"error": error}, status=400)
+
+        try:
+            percentiles = [
+                float(p) for p in params.get("percentiles", "").split(",") if p.strip()
+            ] or DEFAULT_PERCENTILES
+            bins = int(params.get("bins", self.DEFAULT_BINS))
+        except ValueError:
+            return Response({"error": "percentiles and bins must be numbers"}, status=400)
+        if not all(0 <= p <= 100 for p in percentiles):
+            return Response({"error": "percentiles must be between 0 and 100"}, status=400)
+        if not 1 <= bins <= self.MAX_BINS:
+            return Response({"error": f"bins must be between 1 and {self.MAX_BINS}"}, status=400)
+
+        # search is left out: names and emails do not bump SALARY
+        filters = {name: params[name] for name in EMPLOYEE_FILTER_FIELDS if params.get(name)}
+        scope = get_manager_scope(request.user)
+        digest = hashlib.sha1(
+            json.dumps([field, group_by, percentiles, bins, filters], sort_keys=True).encode()
+        ).hexdigest()
+        cache_key = versioned_key(SALARY, "distribution", scope, digest)
+        data = cache.get(cache_key)
+
+        if data is None:
+            qs = filter_employees(self.scope_employees(Employee.objects.all()), filters)
+            data = {
+                "field": field,
+                "group_by": group_by,
+                "percentiles": percentiles,
+                "bins": bins,
+                "filters": filters,
+                **salary_distribution(qs, field, group_by, percentiles, bins),
+            }
+            cache.set(cache_key, data, SALARY_CACHE_TIMEOUT)
+
+        return Response(data)
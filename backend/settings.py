@@ -47,6 +47,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",  # FIRST for CORS
     "django.middleware.security.SecurityMiddleware",
+    "accounts.middleware.CompressionMiddleware",  # gzip / brotli
     "whitenoise.middleware.WhiteNoiseMiddleware",  # static files
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -94,6 +95,59 @@ DATABASES = {
     )
 }
 
+# LISTEN needs a session of its own, which a transaction pooler (pgbouncer,
+# Neon's "-pooler" hosts) does not keep. The change event stream and the
+# cache invalidation bus listen on this direct endpoint, by default the
+# Neon host without "-pooler". Empty, or still a pooler, turns LISTEN off:
+# change events then only reach the worker that made the change and the
+# invalidation bus falls back to polling.
+DATABASE_LISTEN_URL = os.environ.get(
+    "DATABASE_LISTEN_URL", DATABASE_URL.replace("-pooler.", ".", 1)
+)
+
+# ---------------------------------------------------------
+# CACHE
+# ---------------------------------------------------------
+# CACHE_BACKEND: locmem (per process, the default), file (shared by the
+# workers of one machine) or memcached (shared by every machine).
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "memcached": "django.core.cache.backends.memcached.PyMemcacheCache",
+}
+CACHE_DEFAULT_LOCATIONS = {
+    "locmem": "hrms",
+    "file": os.path.join(BASE_DIR, ".cache"),
+    "memcached": "127.0.0.1:11211",
+}
+
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "locmem")
+CACHE_LOCATION = os.environ.get("CACHE_LOCATION") or CACHE_DEFAULT_LOCATIONS[CACHE_BACKEND]
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": [
+            server.strip() for server in CACHE_LOCATION.split(",")
+        ] if CACHE_BACKEND == "memcached" else CACHE_LOCATION,
+        "TIMEOUT": int(os.environ.get("CACHE_TIMEOUT", 300)),
+    }
+}
+if CACHE_BACKEND != "memcached":
+    # room for one entry per employee and view, plus the version keys
+    CACHES["default"]["OPTIONS"] = {
+        "MAX_ENTRIES": int(os.environ.get("CACHE_MAX_ENTRIES", 50000)),
+    }
+
+# Version bumps are relayed to every worker process through the database
+# (accounts.invalidation), needed whenever the cache is not shared by all
+# of them. A worker that cannot sync for CACHE_MAX_STALENESS seconds stops
+# reading from its cache.
+CACHE_INVALIDATION_BUS = os.environ.get(
+    "CACHE_INVALIDATION_BUS", str(CACHE_BACKEND != "memcached")
+) == "True"
+CACHE_MAX_STALENESS = float(os.environ.get("CACHE_MAX_STALENESS", 10))
+
 # ---------------------------------------------------------
 # PASSWORD VALIDATION
 # ---------------------------------------------------------
@@ -133,6 +187,11 @@ AUTH_USER_MODEL = "accounts.User"
 # ---------------------------------------------------------
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "accounts.renderers.ORJSONRenderer",
+        "accounts.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ],